@@ -0,0 +1,17 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_LLM_MODEL = os.getenv('GROQ_MODEL', 'llama3-8b-8192')
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = DEFAULT_LLM_MODEL):
+    """
+    Shared ChatGroq client, built on first use
+    langchain_groq is imported here rather than at module level so that code paths which
+    never call an LLM do not pay for loading it
+    """
+    from langchain_groq import ChatGroq
+    return ChatGroq(model=model, api_key=os.getenv("GROQ_API_KEY"))
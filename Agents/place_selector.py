@@ -1,18 +1,125 @@
-import requests
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
+from tools import http_client
 from tools.place import get_20_places, get_places_with_dynamic_radius
+from tools.models import Place
+from tools.detail_cache import detail_cache
+from tools.deadline import Deadline
+from tools.telemetry import get_logger, span, increment
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 OTM_KEY = os.getenv('OPEN_TRIPMAP_API')
 
+# Detail fetch tuning: parallel requests, per-request timeout and overall deadline (seconds)
+DETAIL_FETCH_WORKERS = int(os.getenv('OTM_DETAIL_WORKERS', 8))
+DETAIL_REQUEST_TIMEOUT = float(os.getenv('OTM_DETAIL_TIMEOUT', 5))
+DETAIL_FETCH_DEADLINE = float(os.getenv('OTM_DETAIL_DEADLINE', 15))
+
 def get_top_places(destination: str, coords: tuple, duration_days: int = 1) -> list:
     """Get top places for a destination using dynamic radius"""
     return get_places_with_dynamic_radius(destination, coords, duration_days, 25)
 
-def get_detailed_places_for_trip_planning(destination: str, coords: tuple, duration: str, budget: str) -> list:
-    """Get detailed places with additional information for trip planning"""
+def _fetch_place_detail(xid: str, timeout: float, retries: bool = True) -> dict:
+    """Fetch the OpenTripMap detail record for a place, or None when unavailable; cached per xid"""
+    def fetch():
+        detail_url = f"https://api.opentripmap.com/0.1/en/places/xid/{xid}?apikey={OTM_KEY}"
+        with span("otm.detail"):
+            detail_response = http_client.get(detail_url, timeout=timeout, retries=retries)
+        
+        if detail_response.status_code == 200:
+            return detail_response.json()
+        return None
+    
+    return detail_cache.get(xid, fetch)
+
+def _apply_detail(place: Place, destination: str, detail_data: dict) -> Place:
+    """Fill in a place from its detail record, falling back to a generic description"""
+    if detail_data:
+        description = detail_data.get('wikipedia_extracts', {}).get('text', '')
+        
+        if description:
+            description = description[:200] + "..." if len(description) > 200 else description
+        else:
+            description = f"Visit {place.name} in {destination}"
+        
+        is_popular = detail_data.get('rate', 0) > 3
+    else:
+        description = f"Visit {place.name} in {destination}"
+        is_popular = False
+    
+    place.description = description
+    place.is_popular = is_popular
+    return place
+
+def fetch_place_details_with_timeouts(places: list, max_workers: int = DETAIL_FETCH_WORKERS,
+                                      request_timeout: float = DETAIL_REQUEST_TIMEOUT,
+                                      deadline: float = DETAIL_FETCH_DEADLINE) -> tuple:
+    """
+    Fetch detail records for places concurrently
+    Returns (details, timed_out, failed): one entry per place in the same order, None where
+    the place has no xid, the request failed or the overall deadline passed before it
+    completed, the set of indices that were cut off by the deadline and the set of indices
+    whose request raised. A deadline of None waits for every request; otherwise each request
+    is attempted once, as retries would run past it.
+    """
+    details = [None] * len(places)
+    failed = set()
+    pending = {}
+    
+    if deadline is not None and deadline <= 0:
+        timed_out = {i for i, place in enumerate(places) if place.get('xid')}
+        if timed_out:
+            increment('fallbacks', len(timed_out), kind='generic_description')
+            logger.warning("No time left for place details, using generic descriptions", extra={'places': len(timed_out)})
+        return details, timed_out, failed
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        with span("fetch_place_details", places=len(places)) as attributes:
+            for i, place in enumerate(places):
+                if place.get('xid'):
+                    timeout = request_timeout if deadline is None else min(request_timeout, deadline)
+                    pending[executor.submit(_fetch_place_detail, place['xid'], timeout, deadline is None)] = i
+            
+            done, not_done = wait(pending, timeout=deadline)
+            timed_out = {pending[future] for future in not_done}
+            attributes['timed_out'] = len(timed_out)
+            if not_done:
+                increment('fallbacks', len(not_done), kind='generic_description')
+                logger.warning("Detail deadline reached, using generic descriptions", extra={'places': len(not_done)})
+            
+            for future in done:
+                i = pending[future]
+                try:
+                    details[i] = future.result()
+                except Exception as e:
+                    failed.add(i)
+                    logger.error("Error getting place details", extra={'place': places[i].get('name', 'Unknown'), 'error': str(e)})
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return details, timed_out, failed
+
+def fetch_place_details(places: list, max_workers: int = DETAIL_FETCH_WORKERS,
+                        request_timeout: float = DETAIL_REQUEST_TIMEOUT,
+                        deadline: float = DETAIL_FETCH_DEADLINE) -> list:
+    """Fetch detail records for places concurrently; see fetch_place_details_with_timeouts"""
+    return fetch_place_details_with_timeouts(places, max_workers, request_timeout, deadline)[0]
+
+def get_detailed_places_for_trip_planning(destination: str, coords: tuple, duration: str, budget: str,
+                                          max_workers: int = DETAIL_FETCH_WORKERS,
+                                          request_timeout: float = DETAIL_REQUEST_TIMEOUT,
+                                          deadline: float = DETAIL_FETCH_DEADLINE) -> list:
+    """
+    Get detailed places with additional information for trip planning
+    The deadline (seconds, None for no limit) covers the radius query and the detail fetches.
+    Places whose detail fetch was cut off by the deadline get a generic description and are
+    marked degraded; places whose detail request raised are left out
+    """
     try:
         # Convert duration to days for radius calculation
         duration_days = int(duration) if duration.isdigit() else 1
@@ -20,57 +127,27 @@ def get_detailed_places_for_trip_planning(destination: str, coords: tuple, durat
         # Get more places for longer trips
         max_places = min(duration_days * 3, 40)  # More places for longer trips
         
-        places = get_places_with_dynamic_radius(destination, coords, duration_days, max_places)
-        detailed_places = []
+        stage_deadline = None if deadline is None else Deadline(deadline, reserve=0)
+        places = get_places_with_dynamic_radius(destination, coords, duration_days, max_places, stage_deadline)
+        if stage_deadline is not None:
+            deadline = stage_deadline.remaining()
         
-        print(f"🎯 Selecting best {len(places)} places for {duration_days} day trip in {destination}")
+        logger.info("Selecting best places", extra={'destination': destination, 'places': len(places), 'days': duration_days})
         
-        for place in places:
-            try:
-                if place.get('xid'):
-                    detail_url = f"https://api.opentripmap.com/0.1/en/places/xid/{place['xid']}?apikey={OTM_KEY}"
-                    detail_response = requests.get(detail_url)
-                    
-                    if detail_response.status_code == 200:
-                        detail_data = detail_response.json()
-                        description = detail_data.get('wikipedia_extracts', {}).get('text', '')
-                        
-                        if description:
-                            description = description[:200] + "..." if len(description) > 200 else description
-                        else:
-                            description = f"Visit {place['name']} in {destination}"
-                        
-                        is_popular = detail_data.get('rate', 0) > 3
-                    else:
-                        description = f"Visit {place['name']} in {destination}"
-                        is_popular = False
-                else:
-                    description = f"Visit {place['name']} in {destination}"
-                    is_popular = False
-                
-                detailed_place = {
-                    "name": place['name'],
-                    "point": place.get('point', {}),
-                    "kinds": place.get('kinds', ''),
-                    "visit_duration": place.get('visit_duration', '2-3 hours'),
-                    "best_time": place.get('best_time', 'morning'),
-                    "description": description,
-                    "rating": place.get('rate', 0),
-                    "is_popular": is_popular,
-                    "distance_from_center": place.get('distance_from_center', 0),
-                    "kinds": place.get('kinds', '')
-                }
-                detailed_places.append(detailed_place)
-                
-            except Exception as e:
-                print(f"Error getting details for {place.get('name', 'Unknown')}: {e}")
+        details, timed_out, failed = fetch_place_details_with_timeouts(places, max_workers, request_timeout, deadline)
+        detailed_places = []
+        for i, (place, detail_data) in enumerate(zip(places, details)):
+            if i in failed:
                 continue
+            detailed_place = _apply_detail(place, destination, detail_data)
+            detailed_place.degraded = i in timed_out
+            detailed_places.append(detailed_place)
         
         # Sort by popularity and distance for better selection
-        detailed_places.sort(key=lambda x: (-x.get('rating', 0), x.get('distance_from_center', 0)))
+        detailed_places.sort(key=lambda x: (-x.rating, x.distance_from_center))
         
-        print(f"✅ Found {len(detailed_places)} detailed places for {destination}")
+        logger.info("Found detailed places", extra={'destination': destination, 'places': len(detailed_places)})
         return detailed_places
     except Exception as e:
-        print(f"Error getting detailed places for {destination}: {e}")
-        return []
\ No newline at end of file
+        logger.error("Error getting detailed places", extra={'destination': destination, 'error': str(e)})
+        return []
@@ -1,42 +1,47 @@
-from tools.routes import get_route
-from tools.trip_mapper import optimize_route, get_detailed_route_info, create_trip_summary, analyze_route_efficiency
-from langchain_groq import ChatGroq
-from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
-from ddgs import DDGS
-import os
+from tools.routes import get_route_legs, calculate_distance_between_places
+from tools.trip_mapper import optimize_route_with_stats, optimize_route_by_zone, iter_detailed_route_info, route_leg, create_trip_summary, analyze_route_efficiency
+from Agents.llm import get_llm
+from tools.telemetry import get_logger
+from tools.deadline import Deadline
+from tools.models import Place
+from tools.classifier import classify_place
+from tools.scheduler import schedule_days, parse_visit_hours, format_clock, DAY_HOURS
+from langchain_core.tools import StructuredTool
+from functools import lru_cache
+import asyncio
 from dotenv import load_dotenv
 
 load_dotenv()
 
-@tool
-def web_search_place_info(query: str) -> str:
+logger = get_logger(__name__)
+
+def search_place_info(query: str) -> str:
     """Search the web for information about tourist places, best times to visit, and visit duration."""
     try:
+        from ddgs import DDGS
         with DDGS() as ddgs:
             results = list(ddgs.text(query, max_results=3))
             return " ".join([result['body'] for result in results])
     except Exception as e:
         return f"Search error: {str(e)}"
 
-@tool
-def get_places_route(input_data: str):
-    """Get the route for the places with timing and weather considerations."""
+async def asearch_place_info(query: str) -> str:
+    """Async variant of search_place_info; the DDGS client is blocking, so it runs on a worker thread"""
+    return await asyncio.to_thread(search_place_info, query)
+
+def _parse_route_input(input_data: str) -> tuple:
     import json
     
     data = json.loads(input_data)
     places = data["places"]
     coords = eval(data["starting_coords"])
-    destination = data["destination"]
-    weather = data["weather"]
-    
-    trip_locations = []
-    current_coords = coords
+    # The route starts at the given coordinates and visits the places in order
+    waypoints = [coords] + [(place["point"]["lat"], place["point"]["lon"]) for place in places]
+    return places, waypoints
 
-    for place in places:
-        destination_coords = (place["point"]["lat"], place["point"]["lon"])
-        route = get_route(current_coords, destination_coords)
-        trip_locations.append({
+def _route_locations(places: list, routes: list) -> list:
+    return [
+        {
             "name": place["name"],
             "route": route,
             "info": place["wikipedia_extracts"],
@@ -44,12 +49,25 @@ def get_places_route(input_data: str):
             "best_time": place.get("best_time", "morning"),
             "special_requirements": place.get("special_requirements", "None"),
             "description": place.get("description", "")
-        })
-        current_coords = destination_coords
-    return trip_locations
+        }
+        for place, route in zip(places, routes)
+    ]
+
+def places_route(input_data: str):
+    """Get the route for the places with timing and weather considerations."""
+    places, waypoints = _parse_route_input(input_data)
+    return _route_locations(places, get_route_legs(waypoints))
+
+async def aplaces_route(input_data: str):
+    """
+    Async variant of places_route
+    All legs go out as one batched directions request; the HTTP client is blocking, so that
+    request runs on a single worker thread
+    """
+    places, waypoints = _parse_route_input(input_data)
+    return _route_locations(places, await asyncio.to_thread(get_route_legs, waypoints))
 
-@tool
-def create_optimized_itinerary(input_data: str):
+def optimized_itinerary(input_data: str):
     """Create a simple itinerary considering weather, timing, and budget constraints."""
     import json
     
@@ -66,44 +84,29 @@ def create_optimized_itinerary(input_data: str):
         current_coords = coords
         total_time = 0
         
-        duration_hours = int(duration) * 8
+        duration_hours = int(duration) * DAY_HOURS
         optimal_places = min(len(places), int(duration) * 2)
         selected_places = places[:optimal_places]
         
-        print(f"Selected {len(selected_places)} places from {len(places)} available places")
+        logger.info("Selected places", extra={'selected': len(selected_places), 'available': len(places)})
         
-        for i, place in enumerate(selected_places):
+        for place in selected_places:
             destination_coords = (place["point"]["lat"], place["point"]["lon"])
             
             visit_duration = place.get("visit_duration", "2-3 hours")
-            if "2-3" in visit_duration:
-                visit_hours = 2.5
-            elif "1-2" in visit_duration:
-                visit_hours = 1.5
-            elif "3-4" in visit_duration:
-                visit_hours = 3.5
-            else:
-                visit_hours = 2.0
-            
-            time_slots = ["morning", "afternoon", "evening"]
-            best_time = time_slots[i % 3]
+            visit_hours = parse_visit_hours(visit_duration)
+            best_time = place.get("best_time", "morning")
             
-            place_name = place["name"].lower()
-            if any(word in place_name for word in ["museum", "gallery", "palace", "castle"]):
-                special_requirements = "May require tickets"
-                estimated_cost = "$10-20"
-            else:
-                special_requirements = "None"
-                estimated_cost = "Free"
+            traits = classify_place(place["name"], place.get("kinds", ""))
             
             if total_time + visit_hours <= duration_hours:
                 trip_locations.append({
                     "name": place["name"],
                     "visit_duration": visit_duration,
                     "best_time": best_time,
-                    "special_requirements": special_requirements,
+                    "special_requirements": traits.special_requirements,
                     "description": place.get("description", ""),
-                    "estimated_cost": estimated_cost
+                    "estimated_cost": traits.estimated_cost
                 })
                 total_time += visit_hours
                 current_coords = destination_coords
@@ -129,27 +132,67 @@ def create_optimized_itinerary(input_data: str):
             "places_visited": 0
         }
 
+async def aoptimized_itinerary(input_data: str):
+    """Async variant of optimized_itinerary; it makes no upstream calls, so it runs inline"""
+    return optimized_itinerary(input_data)
+
+# Each tool has a sync and an async implementation, so agents driven through ainvoke/astream
+# can await tool calls concurrently; blocking upstream calls run on worker threads
+web_search_place_info = StructuredTool.from_function(
+    func=search_place_info, coroutine=asearch_place_info, name="web_search_place_info",
+    description=search_place_info.__doc__
+)
+get_places_route = StructuredTool.from_function(
+    func=places_route, coroutine=aplaces_route, name="get_places_route",
+    description=places_route.__doc__
+)
+create_optimized_itinerary = StructuredTool.from_function(
+    func=optimized_itinerary, coroutine=aoptimized_itinerary, name="create_optimized_itinerary",
+    description=optimized_itinerary.__doc__
+)
+
 def create_trip_planner_agent():
     """Create and return the trip planner agent using LangGraph ReAct agent."""
+    from langgraph.prebuilt import create_react_agent
     tools = [web_search_place_info, get_places_route, create_optimized_itinerary]
-    llm = ChatGroq(model="llama3-8b-8192", api_key=os.getenv("GROQ_API_KEY"))
-    agent = create_react_agent(model=llm, tools=tools, verbose=True)
+    agent = create_react_agent(model=get_llm(), tools=tools, verbose=True)
     return agent
 
-def plan_trip_with_place_selector(destination: str, starting_coords: tuple, weather: dict, budget: str = "Medium", duration: str = "1", existing_places: list[dict] = None):
-    """Simple trip planning workflow with dynamic radius"""
-    from Agents.place_selector import get_detailed_places_for_trip_planning
+@lru_cache(maxsize=None)
+def get_trip_planner_agent():
+    """Shared trip planner agent, created on first use"""
+    return create_trip_planner_agent()
+
+def iter_trip_plan(destination: str, starting_coords: tuple, weather: dict, budget: str = "Medium", duration: str = "1", existing_places: list[Place] = None, deadline: Deadline = None):
+    """
+    Trip planning workflow that yields progress events as results become available
+    Events are dicts with a "stage" key:
+    - candidates: the selected places, before routing
+    - optimized_order: the visiting order and optimizer stats
+    - stop: one itinerary entry (a Place), once its route to the next place is known
+    - complete: the full trip plan (an {"error": ...} dict when no places were found)
+    Upstream calls share one latency budget (PLAN_LATENCY_BUDGET unless a Deadline is given);
+    when it runs out, detail fetches and route legs fall back to generic descriptions and
+    straight-line estimates and the plan is marked degraded
+    """
+    from Agents.place_selector import get_detailed_places_for_trip_planning, DETAIL_FETCH_DEADLINE
     from tools.place import calculate_dynamic_radius
     
+    if deadline is None:
+        deadline = Deadline()
+    
     if existing_places:
         detailed_places = existing_places
-        print(f"Using {len(detailed_places)} existing places for {destination}")
+        logger.info("Using existing places", extra={'destination': destination, 'places': len(detailed_places)})
     else:
-        detailed_places = get_detailed_places_for_trip_planning(destination, starting_coords, duration, budget)
-        print(f"Fetched {len(detailed_places)} places for {destination}")
+        detailed_places = get_detailed_places_for_trip_planning(
+            destination, starting_coords, duration, budget, deadline=deadline.cap(DETAIL_FETCH_DEADLINE)
+        )
+        logger.info("Fetched places", extra={'destination': destination, 'places': len(detailed_places)})
     
     if not detailed_places:
-        return {"error": "No places found for trip planning"}
+        yield {"stage": "complete", "trip_plan": {"error": "No places found for trip planning"}}
+        return
     
     # Calculate dynamic radius for this trip
     duration_days = int(duration) if duration.isdigit() else 1
@@ -157,58 +200,89 @@ def plan_trip_with_place_selector(destination: str, starting_coords: tuple, weat
     
     trip_locations = []
     total_time = 0
-    duration_hours = int(duration) * 8
+    duration_hours = int(duration) * DAY_HOURS
     
     # Select optimal number of places based on duration
     optimal_places = min(len(detailed_places), int(duration) * 2)
     selected_places = detailed_places[:optimal_places]
     
     # Sort by popularity and distance for better selection
-    selected_places.sort(key=lambda x: (-x.get('rating', 0), x.get('distance_from_center', 0)))
+    selected_places.sort(key=lambda x: (-x.rating, x.distance_from_center))
     
-    optimized_places = optimize_route(selected_places)
-    enhanced_places = get_detailed_route_info(optimized_places)
+    yield {"stage": "candidates", "places": selected_places, "places_explored": len(detailed_places)}
     
-    for i, place in enumerate(enhanced_places):
-        visit_duration = place.get("visit_duration", "2-3 hours")
-        if "2-3" in visit_duration:
-            visit_hours = 2.5
-        elif "1-2" in visit_duration:
-            visit_hours = 1.5
-        elif "3-4" in visit_duration:
-            visit_hours = 3.5
-        else:
-            visit_hours = 2.0
-        
-        time_slots = ["morning", "afternoon", "evening"]
-        best_time = time_slots[i % 3]
+    # Multi-day trips are clustered into one compact zone per day, each routed on its own.
+    # A zone may take as many visit hours as a day holds, so zones can follow the geography
+    if duration_days > 1 and len(selected_places) > duration_days:
+        optimized_places, zones, optimization_stats = optimize_route_by_zone(
+            selected_places, duration_days, starting_coords, zone_hours=DAY_HOURS
+        )
+    else:
+        optimized_places, optimization_stats = optimize_route_with_stats(selected_places)
+        zones = [optimized_places]
+    yield {"stage": "optimized_order", "places": optimized_places, "optimization": optimization_stats}
+    
+    # A zone gets one day's hours; without zones the whole trip shares its hours
+    zone_of = {id(place): z for z, zone in enumerate(zones) for place in zone}
+    zone_budget = DAY_HOURS if len(zones) > 1 else duration_hours
+    planned_time = [0] * len(zones)
+    
+    # Route legs are requested lazily, so each stop is emitted as soon as the leg to the stop
+    # after it is final. Stops are the selected Place objects themselves, annotated with their
+    # cost; they keep their preferred best_time, and create_daily_breakdown assigns the slots
+    routed_to = {id(place): optimized_places[i + 1] for i, place in enumerate(optimized_places[:-1])}
+    for place in iter_detailed_route_info(optimized_places, deadline):
+        zone = zone_of[id(place)]
+        visit_hours = parse_visit_hours(place.visit_duration)
+        previous = trip_locations[-1] if trip_locations else None
+        # The previous stop's leg leads to a place that did not fit, so it is routed again
+        rerouted = previous is not None and routed_to.get(id(previous)) is not place
         
-        place_name = place["name"].lower()
-        if any(word in place_name for word in ["museum", "gallery", "palace", "castle"]):
-            estimated_cost = "$10-20"
-        else:
-            estimated_cost = "Free"
+        # Travel from the previous stop in the same zone counts against its hours as well. A
+        # rerouted place is checked against the straight-line estimate and only routed once it fits
+        same_zone = previous is not None and zone_of[id(previous)] == zone
+        travel_hours = 0
+        if same_zone and rerouted:
+            if previous.coords is not None and place.coords is not None:
+                travel_hours = calculate_distance_between_places(previous.coords, place.coords)['travel_time_minutes'] / 60
+        elif same_zone and previous.route_to_next is not None:
+            travel_hours = previous.route_to_next.travel_time_minutes / 60
         
-        if total_time + visit_hours <= duration_hours:
-            trip_locations.append({
-                "name": place["name"],
-                "visit_duration": visit_duration,
-                "best_time": best_time,
-                "special_requirements": place.get("special_requirements", "None"),
-                "description": place.get("description", ""),
-                "estimated_cost": estimated_cost,
-                "point": place.get("point", {}),
-                "route_to_next": place.get("route_to_next", {}),
-                "kinds": place.get("kinds", ""),
-                "distance_from_center": place.get("distance_from_center", 0),
-                "rating": place.get("rating", 0)
-            })
+        if planned_time[zone] + travel_hours + visit_hours <= zone_budget:
+            if previous is not None:
+                if rerouted:
+                    previous.route_to_next = route_leg(previous, place, deadline)
+                    if same_zone and previous.route_to_next is not None:
+                        travel_hours = previous.route_to_next.travel_time_minutes / 60
+                yield {"stage": "stop", "index": len(trip_locations) - 1, "place": previous}
+            place.estimated_cost = classify_place(place.name, place.kinds).estimated_cost
+            trip_locations.append(place)
             total_time += visit_hours
-        else:
+            planned_time[zone] += travel_hours + visit_hours
+        elif zone == len(zones) - 1:
             break
     
-    daily_breakdown = create_daily_breakdown(trip_locations, int(duration))
-    trip_summary = create_trip_summary(trip_locations)
+    if trip_locations:
+        # The last stop's leg leads to a place that was left out, if any
+        trip_locations[-1].route_to_next = None
+        yield {"stage": "stop", "index": len(trip_locations) - 1, "place": trip_locations[-1]}
+    
+    # Stages that fell back to estimates because the latency budget ran out
+    degraded_stages = []
+    if any(place.degraded for place in selected_places):
+        degraded_stages.append("place_details")
+    if any(location.route_to_next is not None and location.route_to_next.degraded for location in trip_locations):
+        degraded_stages.append("route_legs")
+    if degraded_stages:
+        logger.warning("Latency budget exhausted, plan uses estimates", extra={
+            'destination': destination, 'stages': ",".join(degraded_stages), 'elapsed_s': round(deadline.elapsed(), 2)
+        })
+    
+    day_zones = None
+    if len(zones) > 1:
+        day_zones = [[place for place in trip_locations if zone_of[id(place)] == z] for z in range(len(zones))]
+    daily_breakdown = create_daily_breakdown(trip_locations, int(duration), day_zones)
+    trip_summary = create_trip_summary(trip_locations, optimization_stats)
     route_analysis = analyze_route_efficiency(trip_locations)
     
     # Add exploration radius information
@@ -219,7 +293,7 @@ def plan_trip_with_place_selector(destination: str, starting_coords: tuple, weat
         "exploration_area": f"{dynamic_radius_km:.1f}km radius around {destination}"
     }
     
-    return {
+    yield {"stage": "complete", "trip_plan": {
         "destination": destination,
         "duration": f"{duration} days",
         "weather": weather,
@@ -233,32 +307,54 @@ def plan_trip_with_place_selector(destination: str, starting_coords: tuple, weat
         "trip_summary": trip_summary,
         "route_analysis": route_analysis,
         "exploration_info": exploration_info,
-        "optimal_places_for_duration": len(trip_locations)
-    }
+        "optimal_places_for_duration": len(trip_locations),
+        "degraded": bool(degraded_stages),
+        "degraded_stages": degraded_stages
+    }}
 
-def create_daily_breakdown(places, days):
-    """Create a simple daily breakdown of the trip"""
-    daily_plans = []
-    places_per_day = max(1, len(places) // days)
+def mark_degraded(trip_plan: dict, stage: str) -> dict:
+    """Record a stage that fell back to a default outside the planner, such as missing weather"""
+    if isinstance(trip_plan, dict) and not trip_plan.get('error'):
+        trip_plan['degraded'] = True
+        trip_plan['degraded_stages'] = [*trip_plan.get('degraded_stages', []), stage]
+    return trip_plan
+
+def plan_trip_with_place_selector(destination: str, starting_coords: tuple, weather: dict, budget: str = "Medium", duration: str = "1", existing_places: list[Place] = None, deadline: Deadline = None):
+    """Simple trip planning workflow with dynamic radius, bounded by a latency budget (see iter_trip_plan)"""
+    trip_plan = {}
+    for event in iter_trip_plan(destination, starting_coords, weather, budget, duration, existing_places, deadline):
+        if event["stage"] == "complete":
+            trip_plan = event["trip_plan"]
+    return trip_plan
+
+def create_daily_breakdown(places, days, zones=None):
+    """
+    Split the itinerary into days with the day scheduler (see tools.scheduler)
+    When the places were clustered into daily zones, each non-empty zone is one day and the
+    scheduler only times its visits. Every place is scheduled; best_time is the slot the
+    visit actually starts in
+    """
+    groups = [zone for zone in zones if zone] if zones else [places]
+    group_days = 1 if zones else days
     
-    for day in range(1, days + 1):
-        start_idx = (day - 1) * places_per_day
-        end_idx = min(start_idx + places_per_day, len(places))
-        
-        if start_idx < len(places):
-            day_places = places[start_idx:end_idx]
-            daily_plans.append({
-                f"Day {day}": [
-                    {
-                        "place": place["name"],
-                        "duration": place["visit_duration"],
-                        "best_time": place["best_time"],
-                        "description": place["description"][:100] + "..." if len(place["description"]) > 100 else place["description"],
-                        "kinds": place.get("kinds", "")
-                    }
-                    for place in day_places
-                ]
-            })
+    daily_plans = []
+    for group in groups:
+        schedule, stats = schedule_days(group, group_days)
+        if stats:
+            logger.info("Scheduled itinerary", extra=stats)
+        for visits in schedule:
+            day_places = []
+            for visit in visits:
+                place = group[visit["index"]]
+                day_places.append({
+                    "place": place["name"],
+                    "duration": place["visit_duration"],
+                    "best_time": visit["slot"],
+                    "start_time": format_clock(visit["start_minutes"]),
+                    "description": place["description"][:100] + "..." if len(place["description"]) > 100 else place["description"],
+                    "kinds": place.get("kinds", "")
+                })
+            daily_plans.append({f"Day {len(daily_plans) + 1}": day_places})
     
     return daily_plans
 
@@ -1,13 +1,19 @@
 import streamlit as st
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 from tools.routes import get_coords
-from tools.weather import get_weather
+from tools.weather import get_weather_with_age
 from tools.export import get_place_icon, export_trip_plan
 from tools.trip_mapper import generate_route_map_data, find_nearby_places
-from Agents.place_selector import get_detailed_places_for_trip_planning
-from Agents.trip_planner import plan_trip_with_place_selector
+from tools.deadline import Deadline
+from tools.models import to_plain
+from tools.scheduler import parse_visit_hours
+from Agents.place_selector import get_detailed_places_for_trip_planning, DETAIL_FETCH_DEADLINE
+from Agents.trip_planner import iter_trip_plan, mark_degraded
+from config import CACHE_TTL, CACHE_MAX_ENTRIES
 
 load_dotenv()
 
@@ -428,6 +434,99 @@ def create_sidebar():
             - Try different budget levels to see various options
             """)
 
+def run_timed(timings, stage, func, *args, **kwargs):
+    """Call func and record its wall-clock time in milliseconds under timings[stage]"""
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+
+class UncachedResult(Exception):
+    """Raised inside a cached stage to return a value without caching it (st.cache_data skips exceptions)"""
+
+    def __init__(self, value):
+        super().__init__("result not cached")
+        self.value = value
+
+def call_cached(func, *args, **kwargs):
+    """Call a cached stage, unwrapping results it declined to cache"""
+    try:
+        return func(*args, **kwargs)
+    except UncachedResult as e:
+        return e.value
+
+@st.cache_data(ttl=CACHE_TTL["geocode"], max_entries=CACHE_MAX_ENTRIES["geocode"], show_spinner=False)
+def cached_coords(destination, _deadline=None):
+    """Geocode a destination; failed lookups are not cached"""
+    coords = get_coords(destination, _deadline)
+    if not coords:
+        raise UncachedResult(coords)
+    return coords
+
+@st.cache_data(ttl=CACHE_TTL["places"], max_entries=CACHE_MAX_ENTRIES["places"], show_spinner=False)
+def cached_places(destination, coords, duration, _detail_deadline=DETAIL_FETCH_DEADLINE):
+    """
+    Detailed places for a trip; empty results and places degraded by the deadline are not cached
+    The budget does not change which places are found, so it is not part of the key
+    """
+    places = get_detailed_places_for_trip_planning(destination, coords, duration, None, deadline=_detail_deadline)
+    if not places or any(place.get('degraded') for place in places):
+        raise UncachedResult(places)
+    return places
+
+@st.cache_data(ttl=CACHE_TTL["plan"], max_entries=CACHE_MAX_ENTRIES["plan"], show_spinner=False)
+def cached_trip_plan(destination, coords, weather, budget, duration, place_keys, _trip_plan=None):
+    """
+    Trip plan for fixed inputs. Plans are streamed by stream_trip_plan, so this only stores them:
+    called without _trip_plan it is a lookup (None on a miss), called with a plan it caches it.
+    place_keys identifies the selected places (see plan_place_keys) because planning updates
+    the place objects themselves, which would change the key between lookup and store.
+    _trip_plan is not part of the cache key; plans that report an error or are degraded are not cached
+    """
+    if not isinstance(_trip_plan, dict) or _trip_plan.get('error') or _trip_plan.get('degraded'):
+        raise UncachedResult(_trip_plan)
+    return _trip_plan
+
+def plan_place_keys(places):
+    """(xid, name) of each selected place, in order; unchanged by planning"""
+    return tuple((place.get('xid'), place.get('name')) for place in places)
+
+def stream_trip_plan(events, progress_bar, status_text, timings, destination, show_popular_places=True, show_map_links=True, show_place_icons=True):
+    """
+    Render planner events as they arrive and return the final trip plan
+    Candidates and the optimized order are shown before any routing request, then each
+    itinerary card is added once its route leg is known. Everything is drawn into one
+    placeholder that the caller clears before showing the full plan.
+    """
+    started = time.perf_counter()
+    stream_area = st.empty()
+    trip_plan = {}
+    candidate_count = 1
+    
+    with stream_area.container():
+        for event in events:
+            stage = event["stage"]
+            if "first_content" not in timings and stage in ("candidates", "stop"):
+                timings["first_content"] = round((time.perf_counter() - started) * 1000, 1)
+            
+            if stage == "candidates":
+                names = ", ".join(place['name'] for place in event["places"])
+                st.info(f"📍 Selected {len(event['places'])} of {event['places_explored']} places: {names}")
+                st.markdown("### 🗺️ Detailed Itinerary")
+                candidate_count = max(1, len(event["places"]))
+            elif stage == "optimized_order":
+                optimization = event["optimization"]
+                status_text.text(f"🗺️ Route optimized ({optimization.get('distance_saved_km', 0)} km saved), fetching directions...")
+            elif stage == "stop":
+                render_place_card(event["index"] + 1, event["place"], destination, show_popular_places, show_map_links, show_place_icons)
+                progress_bar.progress(min(95, 75 + int(20 * (event["index"] + 1) / candidate_count)))
+            elif stage == "complete":
+                trip_plan = event["trip_plan"]
+    
+    timings["trip_plan"] = round((time.perf_counter() - started) * 1000, 1)
+    return trip_plan, stream_area
+
 def show_planning_progress():
     """Show enhanced progress indicators"""
     progress_bar = st.progress(0)
@@ -443,7 +542,60 @@ def show_planning_progress():
     
     return progress_bar, status_text, progress_steps
 
-def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather, include_weather=True, thoughts_container=None, show_popular_places=True, show_map_links=True, show_daily_breakdown=True, show_place_icons=True, show_route_optimization=True):
+def render_place_card(i, place, destination, show_popular_places=True, show_map_links=True, show_place_icons=True):
+    """Render one itinerary entry as a card"""
+    with st.container():
+        st.markdown(f'<div class="place-card">', unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            place_name = place['name']
+            if show_popular_places and place.get('is_popular', False):
+                place_name += " ⭐"
+            
+            if show_place_icons:
+                kinds = place.get('kinds', '')
+                icon = get_place_icon(place_name, kinds)
+                st.markdown(f"**{i}. {icon} {place_name}**")
+            else:
+                st.markdown(f"**{i}. {place_name}**")
+            
+            if place.get('description'):
+                st.markdown(f"*{place['description'][:100]}...*")
+            
+            if show_map_links:
+                coords = place.get('point', {})
+                if coords and 'lat' in coords and 'lon' in coords:
+                    map_url = f"https://www.google.com/maps?q={coords['lat']},{coords['lon']}"
+                    st.markdown(f'<a href="{map_url}" target="_blank" class="map-link">🗺️ View on Map</a>', unsafe_allow_html=True)
+                else:
+                    # Fallback: create map link using place name
+                    place_name_encoded = place['name'].replace(' ', '+')
+                    map_url = f"https://www.google.com/maps/search/{place_name_encoded}+{destination}"
+                    st.markdown(f'<a href="{map_url}" target="_blank" class="map-link">🗺️ View on Map</a>', unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"⏰ **{place.get('visit_duration', 'N/A')}**")
+            st.markdown(f"🌅 **{place.get('best_time', 'N/A')}**")
+            st.markdown(f"💰 **{place.get('estimated_cost', 'N/A')}**")
+            
+            # Show distance from center if available
+            if place.get('distance_from_center'):
+                distance_km = place['distance_from_center']
+                st.markdown(f"📍 **{distance_km} km** from center")
+            
+            if place.get('route_to_next'):
+                route_info = place['route_to_next']
+                st.markdown(f"🚗 **{route_info['distance_km']} km** to {route_info['next_place']}")
+                st.markdown(f"⏱️ **{route_info['travel_time_formatted']}** travel time")
+            elif place.get('distance_to_next'):
+                distance_info = place['distance_to_next']
+                st.markdown(f"🚗 **{distance_info['distance_km']} km** to next")
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather, include_weather=True, thoughts_container=None, show_popular_places=True, show_map_links=True, show_daily_breakdown=True, show_place_icons=True, show_route_optimization=True, weather_age=None):
     """Display the trip plan with enhanced UI"""
     
     st.markdown('<h2 class="sub-header">🎉 Your Trip Plan is Ready!</h2>', unsafe_allow_html=True)
@@ -502,9 +654,15 @@ def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather
                     st.metric("Temperature", f"{weather['temp']:.1f}°C")
                 with col2:
                     st.metric("Conditions", weather['weather'])
+            if weather_age is not None:
+                minutes = int(weather_age // 60)
+                st.caption("🕒 Updated just now" if minutes < 1 else f"🕒 Updated {minutes} min ago")
             st.markdown('</div>', unsafe_allow_html=True)
     
     if isinstance(trip_plan, dict):
+        if trip_plan.get('degraded'):
+            st.warning("⏱️ Some services were slow, so part of this plan uses estimated travel times, generic descriptions or no weather. Plan again for full details.")
+        
         # Trip statistics with exploration info
         col1, col2, col3, col4 = st.columns(4)
         
@@ -563,7 +721,15 @@ def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather
             
             with col4:
                 st.metric("🏁 End Location", trip_summary.get('end_location', 'N/A'))
-            
+
+            optimization = trip_summary.get('optimization')
+            if optimization:
+                st.caption(
+                    f"Route optimizer saved {optimization.get('distance_saved_km', 0)} km "
+                    f"in {optimization.get('iterations', 0)} improvement steps "
+                    f"({optimization.get('elapsed_ms', 0)} ms)"
+                )
+
             if route_analysis:
                 st.info(f"**Route Analysis:** {route_analysis.get('efficiency', 'N/A')}")
                 st.info(f"**Average Distance:** {route_analysis.get('average_distance', 'N/A')}")
@@ -578,56 +744,7 @@ def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather
             st.markdown("### 🗺️ Detailed Itinerary")
             
             for i, place in enumerate(trip_plan['itinerary'], 1):
-                with st.container():
-                    st.markdown(f'<div class="place-card">', unsafe_allow_html=True)
-                    
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        place_name = place['name']
-                        if show_popular_places and place.get('is_popular', False):
-                            place_name += " ⭐"
-                        
-                        if show_place_icons:
-                            kinds = place.get('kinds', '')
-                            icon = get_place_icon(place_name, kinds)
-                            st.markdown(f"**{i}. {icon} {place_name}**")
-                        else:
-                            st.markdown(f"**{i}. {place_name}**")
-                        
-                        if place.get('description'):
-                            st.markdown(f"*{place['description'][:100]}...*")
-                        
-                        if show_map_links:
-                            coords = place.get('point', {})
-                            if coords and 'lat' in coords and 'lon' in coords:
-                                map_url = f"https://www.google.com/maps?q={coords['lat']},{coords['lon']}"
-                                st.markdown(f'<a href="{map_url}" target="_blank" class="map-link">🗺️ View on Map</a>', unsafe_allow_html=True)
-                            else:
-                                # Fallback: create map link using place name
-                                place_name_encoded = place['name'].replace(' ', '+')
-                                map_url = f"https://www.google.com/maps/search/{place_name_encoded}+{destination}"
-                                st.markdown(f'<a href="{map_url}" target="_blank" class="map-link">🗺️ View on Map</a>', unsafe_allow_html=True)
-                    
-                    with col2:
-                        st.markdown(f"⏰ **{place.get('visit_duration', 'N/A')}**")
-                        st.markdown(f"🌅 **{place.get('best_time', 'N/A')}**")
-                        st.markdown(f"💰 **{place.get('estimated_cost', 'N/A')}**")
-                        
-                        # Show distance from center if available
-                        if place.get('distance_from_center'):
-                            distance_km = place['distance_from_center']
-                            st.markdown(f"📍 **{distance_km} km** from center")
-                        
-                        if place.get('route_to_next'):
-                            route_info = place['route_to_next']
-                            st.markdown(f"🚗 **{route_info['distance_km']} km** to {route_info['next_place']}")
-                            st.markdown(f"⏱️ **{route_info['travel_time_formatted']}** travel time")
-                        elif place.get('distance_to_next'):
-                            distance_info = place['distance_to_next']
-                            st.markdown(f"🚗 **{distance_info['distance_km']} km** to next")
-                    
-                    st.markdown('</div>', unsafe_allow_html=True)
+                render_place_card(i, place, destination, show_popular_places, show_map_links, show_place_icons)
         
         # Daily breakdown
         if show_daily_breakdown and 'daily_breakdown' in trip_plan and trip_plan['daily_breakdown']:
@@ -635,17 +752,7 @@ def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather
             
             for day_plan in trip_plan['daily_breakdown']:
                 for day, places in day_plan.items():
-                    total_hours = 0
-                    for place in places:
-                        duration = place['duration']
-                        if '1-2' in duration:
-                            total_hours += 1.5
-                        elif '2-3' in duration:
-                            total_hours += 2.5
-                        elif '3-4' in duration:
-                            total_hours += 3.5
-                        else:
-                            total_hours += 2.0
+                    total_hours = sum(parse_visit_hours(place['duration']) for place in places)
                     
                     if total_hours <= 4:
                         intensity = "🟢 Light Day"
@@ -660,12 +767,16 @@ def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather
                         if show_popular_places and "⭐" in place_name:
                             place_name += " ⭐"
                         
+                        timing = place['best_time']
+                        if place.get('start_time'):
+                            timing += f" from {place['start_time']}"
+                        
                         if show_place_icons:
                             kinds = place.get('kinds', '')
                             icon = get_place_icon(place_name, kinds)
-                            st.markdown(f"  • **{icon} {place_name}** ({place['duration']}) - {place['best_time']}")
+                            st.markdown(f"  • **{icon} {place_name}** ({place['duration']}) - {timing}")
                         else:
-                            st.markdown(f"  • **{place_name}** ({place['duration']}) - {place['best_time']}")
+                            st.markdown(f"  • **{place_name}** ({place['duration']}) - {timing}")
                         
                         # Add map link for daily breakdown
                         if show_map_links:
@@ -768,7 +879,7 @@ def display_enhanced_trip_plan(trip_plan, destination, budget, duration, weather
             )
         
         with col3:
-            trip_json = json.dumps(trip_plan, indent=2)
+            trip_json = json.dumps(to_plain(trip_plan), indent=2)
             st.download_button(
                 label="📊 JSON Data",
                 data=trip_json,
@@ -810,31 +921,51 @@ def main():
     if plan_button and destination:
         with st.spinner("🔍 Planning your perfect trip..."):
             try:
-                # Get coordinates
-                coords = get_coords(destination)
-                if not coords:
-                    st.error(f"❌ Could not find coordinates for {destination}. Please check the destination name.")
-                    return
-                
-                # Show progress
-                progress_bar, status_text, progress_steps = show_planning_progress()
-                
-                # Step 1: Find places
-                status_text.text(progress_steps[0][0])
-                progress_bar.progress(progress_steps[0][1])
-                
-                places = get_detailed_places_for_trip_planning(destination, coords, str(duration), budget)
-                if not places:
-                    st.error(f"❌ No places found for {destination}")
-                    return
-                
-                # Step 2: Get weather
-                status_text.text(progress_steps[1][0])
-                progress_bar.progress(progress_steps[1][1])
-                
-                weather = {}
-                if include_weather:
-                    weather = get_weather(destination)
+                stage_timings = {}
+                # Latency budget for the whole plan; past it the plan falls back to estimates
+                deadline = Deadline()
+                weather_late = False
+                executor = ThreadPoolExecutor(max_workers=1)
+                try:
+                    # Weather only needs the destination name, so fetch it while geocoding and place lookup run
+                    weather_future = None
+                    if include_weather:
+                        weather_future = executor.submit(run_timed, stage_timings, "weather", get_weather_with_age, destination)
+                    
+                    # Get coordinates
+                    coords = run_timed(stage_timings, "geocode", call_cached, cached_coords, destination, deadline)
+                    if not coords:
+                        st.error(f"❌ Could not find coordinates for {destination}. Please check the destination name.")
+                        return
+                    
+                    # Show progress
+                    progress_bar, status_text, progress_steps = show_planning_progress()
+                    
+                    # Step 1: Find places
+                    status_text.text(progress_steps[0][0])
+                    progress_bar.progress(progress_steps[0][1])
+                    
+                    places = run_timed(
+                        stage_timings, "places", call_cached, cached_places,
+                        destination, coords, str(duration), deadline.cap(DETAIL_FETCH_DEADLINE)
+                    )
+                    if not places:
+                        st.error(f"❌ No places found for {destination}")
+                        return
+                    
+                    # Step 2: Get weather (usually finished by now)
+                    status_text.text(progress_steps[1][0])
+                    progress_bar.progress(progress_steps[1][1])
+                    
+                    weather, weather_age = {}, None
+                    if weather_future is not None:
+                        try:
+                            weather, weather_age = weather_future.result(timeout=deadline.wait_timeout())
+                        except FutureTimeoutError:
+                            weather_late = True
+                finally:
+                    # Weather still running past the latency budget finishes in the background
+                    executor.shutdown(wait=False)
                 
                 # Step 3: Create trip plan
                 status_text.text(progress_steps[2][0])
@@ -848,9 +979,24 @@ def main():
                         thoughts_placeholder = st.empty()
                         thoughts_placeholder.info("🤔 AI is analyzing places and planning your trip...")
                 
-                trip_plan = plan_trip_with_place_selector(
-                    destination, coords, weather, budget, str(duration), existing_places=places
-                )
+                plan_inputs = (destination, coords, weather, budget, str(duration))
+                # Taken before planning, which fills in routes and costs on the places
+                place_keys = plan_place_keys(places)
+                trip_plan = call_cached(cached_trip_plan, *plan_inputs, place_keys)
+                if trip_plan is None:
+                    trip_plan, stream_area = stream_trip_plan(
+                        iter_trip_plan(*plan_inputs, existing_places=places, deadline=deadline),
+                        progress_bar, status_text, stage_timings, destination,
+                        show_popular_places, show_map_links, show_place_icons
+                    )
+                    call_cached(cached_trip_plan, *plan_inputs, place_keys, _trip_plan=trip_plan)
+                    # The full plan below replaces the streamed cards
+                    stream_area.empty()
+                if isinstance(trip_plan, dict):
+                    if weather_late:
+                        # A copy, so the plan cached for planning without weather stays unmarked
+                        trip_plan = mark_degraded(dict(trip_plan), "weather")
+                    trip_plan['stage_timings'] = stage_timings
                 
                 # Step 4: Complete
                 status_text.text(progress_steps[3][0])
@@ -864,7 +1010,7 @@ def main():
                     trip_plan, destination, budget, duration, weather, 
                     include_weather, thoughts_container, show_popular_places, 
                     show_map_links, show_daily_breakdown, show_place_icons, 
-                    show_route_optimization
+                    show_route_optimization, weather_age
                 )
                 
             except Exception as e:
@@ -0,0 +1,225 @@
+"""
+Batch trip planning
+
+Plans many (destination, budget, duration) jobs from a CSV or JSONL file on a thread pool.
+All workers share the process-wide geocode, POI, place detail and weather caches, so popular destinations
+are only fetched once. Every finished job is appended to the output file as one JSON line
+produced by export_trip_plan(..., "jsonl"); that file doubles as the checkpoint, so a rerun
+with the same output skips jobs that already succeeded and retries the ones that failed.
+Before a rerun the file is compacted to the successful records, so it always holds exactly
+one line per job id.
+
+Job files:
+    CSV   with a header row: destination,budget,duration[,id]
+    JSONL one object per line with the same keys
+
+Usage:
+    python main.py --batch jobs.csv --output plans.jsonl --workers 8
+"""
+
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+import numpy as np
+from tools.routes import get_coords
+from tools.weather import get_weather
+from tools.export import export_trip_plan
+from Agents.place_selector import get_detailed_places_for_trip_planning
+from Agents.trip_planner import plan_trip_with_place_selector
+from tools.deadline import Deadline
+from tools.telemetry import get_logger
+
+BUDGET_LEVELS = ['low', 'medium', 'high']
+LATENCY_PERCENTILES = (50, 95, 99)
+PROGRESS_EVERY = 25
+# Jobs submitted per worker ahead of the results being written
+JOBS_IN_FLIGHT_PER_WORKER = 2
+
+logger = get_logger(__name__)
+
+def load_jobs(path: str) -> list:
+    """Read jobs from a CSV or JSONL file; each job gets a stable id (its own or its line number)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    jobs = []
+    for line_number, row in enumerate(rows, 1):
+        job = {key.strip().lower(): value for key, value in row.items() if key}
+        job_id = job.get('id')
+        job['id'] = str(line_number if job_id is None or job_id == '' else job_id)
+        jobs.append(job)
+    return jobs
+
+def validate_job(job: dict) -> tuple:
+    """Return (destination, budget, duration) or raise ValueError, using the CLI input rules"""
+    destination = str(job.get('destination') or '').strip()
+    if not destination:
+        raise ValueError("Missing destination")
+    budget = str(job.get('budget') or 'Medium').strip()
+    if budget.lower() not in BUDGET_LEVELS:
+        raise ValueError(f"Invalid budget {budget!r}; choose Low, Medium or High")
+    try:
+        duration = int(job.get('duration') or 1)
+    except (TypeError, ValueError):
+        raise ValueError(f"Duration must be a number, got {job.get('duration')!r}")
+    if duration <= 0:
+        raise ValueError("Duration must be a positive number")
+    return destination, budget.capitalize(), str(duration)
+
+def compact_checkpoint(output_path: str) -> set:
+    """
+    Ids of jobs already planned successfully in an existing output file
+    The file is rewritten to hold only the last successful record of each job, so failed jobs
+    that are retried and lines cut short by a crash leave nothing behind
+    """
+    done = {}
+    if not os.path.exists(output_path):
+        return set()
+
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            job = record.get('batch_job', {})
+            if job.get('status') == 'ok':
+                done[str(job.get('id'))] = line if line.endswith('\n') else line + '\n'
+
+    compacted = output_path + '.tmp'
+    with open(compacted, 'w', encoding='utf-8') as f:
+        f.writelines(done.values())
+    os.replace(compacted, output_path)
+    return set(done)
+
+def plan_job(job: dict) -> dict:
+    """Plan a single job; returns the record to write, with per-stage timings in ms"""
+    timings = {}
+
+    def timed(stage, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    try:
+        destination, budget, duration = validate_job(job)
+        coords = timed("geocode", get_coords, destination)
+        if not coords:
+            raise ValueError(f"Could not find coordinates for {destination}")
+        # Batch output is not rendered live, so neither stage is degraded to meet a page latency budget
+        places = timed("places", get_detailed_places_for_trip_planning, destination, coords, duration, budget, deadline=None)
+        if not places:
+            raise ValueError(f"No places found for {destination}")
+        weather = timed("weather", get_weather, destination)
+        trip_plan = timed(
+            "trip_plan", plan_trip_with_place_selector,
+            destination, coords, weather, budget, duration, existing_places=places, deadline=Deadline(None)
+        )
+        if trip_plan.get('error'):
+            raise ValueError(trip_plan['error'])
+        status, error = 'ok', None
+    except Exception as e:
+        trip_plan = {"destination": job.get('destination'), "error": str(e)}
+        status, error = 'error', str(e)
+    timings["total"] = (time.perf_counter() - started) * 1000
+
+    trip_plan["batch_job"] = {
+        "id": job['id'],
+        "status": status,
+        "error": error,
+        "input": {key: job.get(key) for key in ('destination', 'budget', 'duration')},
+        "timings_ms": {stage: round(elapsed, 1) for stage, elapsed in timings.items()}
+    }
+    return trip_plan
+
+def iter_job_results(executor: ThreadPoolExecutor, jobs: list, in_flight: int):
+    """
+    Plan jobs on the executor and yield their records as they finish
+    At most in_flight jobs are submitted at a time, so finished plans are released once the
+    caller has handled them instead of being held until the whole batch is done
+    """
+    jobs = iter(jobs)
+    running = {executor.submit(plan_job, job) for job in islice(jobs, in_flight)}
+    while running:
+        finished, running = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            yield future.result()
+            running.update(executor.submit(plan_job, job) for job in islice(jobs, 1))
+
+def latency_report(timings: dict) -> dict:
+    """Per-stage latency percentiles in ms"""
+    return {
+        stage: {
+            **{f"p{p}": round(float(np.percentile(values, p)), 1) for p in LATENCY_PERCENTILES},
+            "count": len(values)
+        }
+        for stage, values in timings.items() if values
+    }
+
+def run_batch(jobs_path: str, output_path: str, max_workers: int = 8, resume: bool = True) -> dict:
+    """Plan every job in jobs_path, appending results to output_path; returns the run summary"""
+    jobs = load_jobs(jobs_path)
+    done = compact_checkpoint(output_path) if resume else set()
+    pending = [job for job in jobs if job['id'] not in done]
+    logger.info("Starting batch", extra={
+        'jobs': len(jobs), 'done': len(jobs) - len(pending), 'pending': len(pending), 'workers': max_workers
+    })
+
+    timings = defaultdict(list)
+    counts = {"ok": 0, "error": 0}
+    started = time.perf_counter()
+
+    with open(output_path, 'a' if resume else 'w', encoding='utf-8') as output, \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch") as executor:
+        in_flight = max(1, max_workers) * JOBS_IN_FLIGHT_PER_WORKER
+        for finished, record in enumerate(iter_job_results(executor, pending, in_flight), 1):
+            job = record["batch_job"]
+            line = export_trip_plan(record, "jsonl")["content"]
+            # Results are written from this thread only, one flushed line per job
+            output.write(line)
+            output.flush()
+            counts[job["status"]] += 1
+            for stage, elapsed in job["timings_ms"].items():
+                timings[stage].append(elapsed)
+            if job["status"] != 'ok':
+                logger.error("Job failed", extra={'job_id': job['id'], 'error': job['error']})
+            if finished % PROGRESS_EVERY == 0:
+                rate = finished / (time.perf_counter() - started)
+                logger.info("Batch progress", extra={
+                    'finished': finished, 'total': len(pending), 'jobs_per_sec': round(rate, 2)
+                })
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "jobs": len(jobs),
+        "skipped": len(jobs) - len(pending),
+        "succeeded": counts["ok"],
+        "failed": counts["error"],
+        "elapsed_s": round(elapsed, 2),
+        "jobs_per_sec": round(len(pending) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": latency_report(timings)
+    }
+    print_summary(summary)
+    return summary
+
+def print_summary(summary: dict) -> None:
+    print("\n" + "=" * 60)
+    print("📊 BATCH SUMMARY")
+    print("=" * 60)
+    print(f"Jobs: {summary['jobs']} (skipped {summary['skipped']}, succeeded {summary['succeeded']}, failed {summary['failed']})")
+    print(f"Elapsed: {summary['elapsed_s']} s, throughput: {summary['jobs_per_sec']} jobs/sec")
+    if summary["latency_ms"]:
+        print(f"\n{'stage':<12}" + "".join(f"{f'p{p} ms':>12}" for p in LATENCY_PERCENTILES) + f"{'count':>8}")
+        for stage, stats in summary["latency_ms"].items():
+            print(f"{stage:<12}" + "".join(f"{stats[f'p{p}']:>12.1f}" for p in LATENCY_PERCENTILES) + f"{stats['count']:>8}")
+    print("=" * 60)
@@ -0,0 +1,112 @@
+"""
+Throughput benchmark for the place classifier
+
+Classifies synthetic OpenTripMap records with the keyword chains the pipeline used before
+tools.classifier (one lowercase-and-scan per attribute: duration, best time, cost, icon) and
+with classify_place: once per place without the cache, and memoized for a plan's worth of
+lookups (selection, then the icon for the card and each export format).
+
+    python -m benchmarks.classifier
+    python -m benchmarks.classifier --places 20000 --lookups 6
+"""
+
+import argparse
+import random
+import time
+from benchmarks.make_fixtures import CITY_CENTERS, generate_places
+from tools.classifier import PLACE_ICONS, classify_place
+
+def legacy_duration(place_name: str, place_type: str) -> str:
+    place_name_lower = place_name.lower()
+    place_type_lower = place_type.lower()
+    if any(word in place_name_lower for word in ['museum', 'gallery', 'palace', 'castle']):
+        return "3-4 hours"
+    elif any(word in place_name_lower for word in ['park', 'garden', 'beach']):
+        return "2-3 hours"
+    elif any(word in place_name_lower for word in ['temple', 'church', 'mosque']):
+        return "1-2 hours"
+    elif any(word in place_type_lower for word in ['historic', 'cultural']):
+        return "2-3 hours"
+    return "1-2 hours"
+
+def legacy_best_time(place_name: str, place_type: str) -> str:
+    place_name_lower = place_name.lower()
+    if any(word in place_name_lower for word in ['beach', 'park', 'garden']):
+        return "morning"
+    elif any(word in place_name_lower for word in ['museum', 'gallery', 'palace']):
+        return "afternoon"
+    return "morning"
+
+def legacy_cost(place_name: str) -> str:
+    place_name = place_name.lower()
+    return "$10-20" if any(word in place_name for word in ["museum", "gallery", "palace", "castle"]) else "Free"
+
+def legacy_icon(place_name: str, kinds: str) -> str:
+    name_lower = place_name.lower()
+    kinds_lower = kinds.lower()
+    for keyword, icon in PLACE_ICONS.items():
+        if keyword in name_lower or keyword in kinds_lower:
+            return icon
+    return PLACE_ICONS['default']
+
+def legacy_once(records: list) -> None:
+    for record in records:
+        legacy_duration(record['name'], record['kinds'])
+        legacy_best_time(record['name'], record['kinds'])
+        legacy_cost(record['name'])
+        legacy_icon(record['name'], record['kinds'])
+
+def compiled_once(records: list) -> None:
+    for record in records:
+        classify_place.__wrapped__(record['name'], record['kinds'])
+
+def legacy_plan(records: list, lookups: int) -> None:
+    """Attributes once at selection, then the icon again for every rendering"""
+    for record in records:
+        legacy_duration(record['name'], record['kinds'])
+        legacy_best_time(record['name'], record['kinds'])
+        legacy_cost(record['name'])
+        for _ in range(lookups):
+            legacy_icon(record['name'], record['kinds'])
+
+def memoized_plan(records: list, lookups: int) -> None:
+    classify_place.cache_clear()
+    for record in records:
+        for _ in range(lookups + 1):
+            classify_place(record['name'], record['kinds'])
+
+def best_seconds(run, *args, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run(*args)
+        durations.append(time.perf_counter() - started)
+    return min(durations)
+
+def print_table(title: str, results: dict, places: int) -> None:
+    print(f"\n{title}")
+    print(f"{'classifier':<22}{'places/s':>14}{'µs/place':>12}{'speedup':>10}")
+    baseline = next(iter(results.values()))
+    for name, seconds in results.items():
+        print(f"{name:<22}{places / seconds:>14,.0f}{seconds / places * 1e6:>12.1f}{baseline / seconds:>9.1f}x")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Place classifier throughput")
+    parser.add_argument('--places', type=int, default=5000)
+    parser.add_argument('--lookups', type=int, default=4, help="renderings per place after selection")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    records = generate_places(CITY_CENTERS['Paris'], args.places, random.Random(args.seed))
+    print_table("All attributes of each place, once", {
+        'keyword chains': best_seconds(legacy_once, records, runs=args.runs),
+        'classify_place': best_seconds(compiled_once, records, runs=args.runs)
+    }, args.places)
+    print_table(f"A plan's lookups: selection plus {args.lookups} renderings per place", {
+        'keyword chains': best_seconds(legacy_plan, records, args.lookups, runs=args.runs),
+        'classify_place + memo': best_seconds(memoized_plan, records, args.lookups, runs=args.runs)
+    }, args.places)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for the distance kernels
+
+Times the haversine kernels in tools.geo against the "degrees × 111" formulas they replaced,
+for the shapes the planner uses: single pairs (route fallbacks, distance from center),
+one-to-many (POI cache filtering) and full matrices (route optimization). Also reports the
+worst error of the old formula against haversine.
+
+    python -m benchmarks.geo_kernels
+    python -m benchmarks.geo_kernels --sizes 40 500 2000 --repeat 20
+"""
+
+import argparse
+import math
+import timeit
+import numpy as np
+from tools.geo import haversine_km, haversine_from, haversine_matrix, within_radius
+
+LEGACY_KM_PER_DEGREE = 111
+
+def legacy_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    return math.sqrt((lat2 - lat1) ** 2 + (lon2 - lon1) ** 2) * LEGACY_KM_PER_DEGREE
+
+def legacy_from(origin, coords: np.ndarray) -> np.ndarray:
+    diff = coords - np.asarray(origin, dtype=float)
+    return np.sqrt((diff ** 2).sum(axis=1)) * LEGACY_KM_PER_DEGREE
+
+def legacy_matrix(coords: np.ndarray) -> np.ndarray:
+    diff = coords[:, np.newaxis, :] - coords[np.newaxis, :, :]
+    return np.sqrt((diff ** 2).sum(axis=2)) * LEGACY_KM_PER_DEGREE
+
+def city_points(n: int, center: tuple, spread_km: float, rng: np.random.Generator) -> np.ndarray:
+    lat0, lon0 = center
+    lat = lat0 + rng.normal(0, spread_km / 111, n)
+    lon = lon0 + rng.normal(0, spread_km / (111 * math.cos(math.radians(lat0))), n)
+    return np.column_stack((lat, lon))
+
+def best_us(statement, repeat: int, number: int) -> float:
+    return min(timeit.repeat(statement, repeat=repeat, number=number)) / number * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Distance kernel micro-benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[40, 500, 2000])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--lat', type=float, default=48.8566, help="latitude of the synthetic city")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    center = (args.lat, 2.3522)
+    rows = []
+
+    pairs = [tuple(point) for point in city_points(2, center, 10, rng)]
+    (lat1, lon1), (lat2, lon2) = pairs
+    number = 20000
+    rows.append(("pair", "legacy", best_us(lambda: legacy_km(lat1, lon1, lat2, lon2), args.repeat, number)))
+    rows.append(("pair", "haversine", best_us(lambda: haversine_km(lat1, lon1, lat2, lon2), args.repeat, number)))
+
+    for size in args.sizes:
+        coords = city_points(size, center, 10, rng)
+        number = max(1, 200000 // size)
+        rows.append((f"from x{size}", "legacy", best_us(lambda: legacy_from(center, coords), args.repeat, number)))
+        rows.append((f"from x{size}", "haversine", best_us(lambda: haversine_from(center, coords), args.repeat, number)))
+        rows.append((f"within 5km x{size}", "legacy", best_us(lambda: legacy_from(center, coords) <= 5, args.repeat, number)))
+        rows.append((f"within 5km x{size}", "within_radius", best_us(lambda: within_radius(center, coords, 5), args.repeat, number)))
+
+        number = max(1, 2000000 // size ** 2)
+        rows.append((f"matrix {size}x{size}", "legacy", best_us(lambda: legacy_matrix(coords), args.repeat, number)))
+        rows.append((f"matrix {size}x{size}", "haversine", best_us(lambda: haversine_matrix(coords), args.repeat, number)))
+
+    print(f"\n{'kernel':<22}{'implementation':<18}{'µs/call':>12}")
+    for shape, implementation, micros in rows:
+        print(f"{shape:<22}{implementation:<18}{micros:>12.2f}")
+
+    coords = city_points(5000, center, 30, rng)
+    exact = haversine_from(center, coords)
+    legacy_error = np.abs(legacy_from(center, coords) - exact) / exact
+    print(f"\nWorst relative error vs haversine within ~100 km of latitude {args.lat}:")
+    print(f"  legacy degrees × 111: {legacy_error.max():.2%}")
+
+if __name__ == '__main__':
+    main()
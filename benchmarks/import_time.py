@@ -0,0 +1,101 @@
+"""
+Cold-start import benchmark
+
+Imports each module in a fresh interpreter several times and reports the median wall-clock
+time, plus the slowest imports reported by `python -X importtime`. Pass --ref to measure a
+git revision of the same tree side by side, e.g. the commit before lazy LLM construction:
+
+    python benchmarks/import_time.py --ref HEAD~1
+    python benchmarks/import_time.py --modules app main Agents.trip_planner --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import io
+import tarfile
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["app", "main", "Agents.trip_planner"]
+
+def _env(cwd: str) -> dict:
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [cwd, os.environ.get("PYTHONPATH")]))}
+
+def time_import(module: str, cwd: str) -> float:
+    """Seconds taken to import module in a new interpreter, or None if the import fails"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+        env={**_env(cwd), "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        print(f"  ! import {module} failed in {cwd}: {result.stderr.strip().splitlines()[-1:]}")
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def slowest_imports(module: str, cwd: str, top: int) -> list:
+    """(cumulative microseconds, package) for the slowest imports reported by -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=cwd,
+        capture_output=True, text=True, env=_env(cwd)
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or "cumulative" in line:
+            continue
+        # Nested imports are indented under their parent; keep the top level only
+        package = parts[2]
+        if len(package) - len(package.lstrip()) == 1:
+            rows.append((int(parts[1].strip()), package.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def export_ref(ref: str, target: str) -> None:
+    """Write the tree at a git revision into target"""
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT_DIR, capture_output=True, check=True)
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(target)
+
+def measure(cwd: str, modules: list, runs: int) -> dict:
+    """Median import time in milliseconds per module"""
+    results = {}
+    for module in modules:
+        samples = [time_import(module, cwd) for _ in range(runs)]
+        samples = [sample for sample in samples if sample is not None]
+        results[module] = statistics.median(samples) * 1000 if samples else None
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the app modules")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="git revision to measure alongside the working tree")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list per module")
+    args = parser.parse_args()
+
+    columns = [("working tree", measure(ROOT_DIR, args.modules, args.runs))]
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_ref(args.ref, tmp)
+            columns.append((args.ref, measure(tmp, args.modules, args.runs)))
+
+    print(f"\nMedian import time over {args.runs} runs (ms)")
+    print(f"{'module':<25}" + "".join(f"{label:>18}" for label, _ in columns))
+    for module in args.modules:
+        cells = [results[module] for _, results in columns]
+        print(f"{module:<25}" + "".join(f"{cell:>18.1f}" if cell is not None else f"{'failed':>18}" for cell in cells))
+
+    for module in args.modules:
+        print(f"\nSlowest imports under {module} (cumulative ms)")
+        for cumulative, package in slowest_imports(module, ROOT_DIR, args.top):
+            print(f"  {cumulative / 1000:>10.1f}  {package}")
+
+if __name__ == "__main__":
+    main()
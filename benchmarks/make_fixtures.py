@@ -0,0 +1,110 @@
+"""
+Generate the synthetic fixture set used by the offline benchmarks
+
+The responses follow the shapes of the live OpenRouteService geocoding, OpenTripMap radius and
+detail, and OpenWeather endpoints, with a deterministic city of POIs around the given center.
+Names include near-duplicates so the deduplication path does real work. Re-run after changing
+the generator; record live responses instead with `python -m benchmarks.run --record`.
+
+    python -m benchmarks.make_fixtures --city Paris --places 400
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+CITY_CENTERS = {
+    'Paris': (48.8566, 2.3522),
+    'Tokyo': (35.6762, 139.6503),
+    'Jaipur': (26.9124, 75.7873)
+}
+NAME_PREFIXES = ['Musée', 'Jardin', 'Église', 'Palais', 'Tour', 'Pont', 'Place', 'Fontaine', 'Galerie',
+                 'Théâtre', 'Château', 'Parc', 'Cathédrale', 'Marché', 'Monument', 'Temple', 'Fort']
+NAME_WORDS = ['Saint', 'Royal', 'National', 'Grand', 'Petit', 'Vieux', 'Nouveau', 'Victor', 'Marie',
+              'Louis', 'Rivoli', 'Bastille', 'Opéra', 'Lumière', 'Étoile', 'Orsay', 'Rodin', 'Monceau']
+KINDS = ['museums,cultural,interesting_places', 'gardens_and_parks,natural,interesting_places',
+         'churches,religion,interesting_places', 'palaces,architecture,interesting_places',
+         'towers,architecture,interesting_places', 'bridges,architecture,interesting_places',
+         'theatres_and_entertainments,cultural,interesting_places', 'monuments,historic,interesting_places',
+         'fortifications,historic,interesting_places', 'marketplaces,foods,shops']
+LOREM = ("Built in the {century}th century, {name} is one of the most visited landmarks of the city. "
+         "Its collections and architecture attract visitors throughout the year, and guided tours run "
+         "daily. The surrounding district is known for its cafés, small galleries and markets.")
+
+def generate_places(center: tuple, count: int, rng: random.Random) -> list:
+    lat0, lon0 = center
+    places = []
+    for i in range(count):
+        # Denser near the center, like real attractions
+        distance_km = 25 * rng.random() ** 2
+        bearing = rng.uniform(0, 2 * math.pi)
+        lat = lat0 + distance_km * math.cos(bearing) / 111
+        lon = lon0 + distance_km * math.sin(bearing) / (111 * math.cos(math.radians(lat0)))
+        name = f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)}"
+        if places and rng.random() < 0.15:
+            # Near-duplicate of an earlier entry (different casing / suffix)
+            name = rng.choice(places)['name'].upper() if rng.random() < 0.5 else rng.choice(places)['name'] + " (Entrée)"
+        places.append({
+            'xid': f"N{100000 + i}",
+            'name': name,
+            'dist': round(distance_km * 1000, 1),
+            'rate': rng.choice([1, 1, 2, 2, 3, 3, 3, 7]),
+            'osm': f"node/{200000 + i}",
+            'kinds': rng.choice(KINDS),
+            'point': {'lon': round(lon, 6), 'lat': round(lat, 6)}
+        })
+    return places
+
+def generate_fixtures(city: str, count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    center = CITY_CENTERS[city]
+    places = generate_places(center, count, rng)
+    responses = [
+        {
+            'method': 'GET', 'host': 'api.openrouteservice.org', 'path': '/geocode/search',
+            'match': {'text': city}, 'status': 200,
+            'body': {'features': [{'geometry': {'type': 'Point', 'coordinates': [center[1], center[0]]},
+                                   'properties': {'label': city}}]}
+        },
+        {
+            'method': 'GET', 'host': 'api.opentripmap.com', 'path': '/0.1/en/places/radius',
+            'match': {}, 'status': 200, 'body': places
+        },
+        {
+            'method': 'GET', 'host': 'api.openweathermap.org', 'path': '/data/2.5/weather',
+            'match': {'q': city}, 'status': 200,
+            'body': {'main': {'temp': 18.4, 'humidity': 62}, 'weather': [{'main': 'Clouds', 'description': 'scattered clouds'}],
+                     'wind': {'speed': 3.6}, 'name': city}
+        }
+    ]
+    for place in places:
+        responses.append({
+            'method': 'GET', 'host': 'api.opentripmap.com', 'path': f"/0.1/en/places/xid/{place['xid']}",
+            'match': {}, 'status': 200,
+            'body': {
+                'xid': place['xid'], 'name': place['name'], 'kinds': place['kinds'], 'rate': place['rate'],
+                'point': place['point'],
+                'wikipedia_extracts': {'text': LOREM.format(century=rng.randint(12, 19), name=place['name'])}
+            }
+        })
+    return {'city': city, 'center': list(center), 'responses': responses}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark fixtures")
+    parser.add_argument('--city', default='Paris', choices=sorted(CITY_CENTERS))
+    parser.add_argument('--places', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = os.path.join(FIXTURES_DIR, f"{args.city.lower()}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(generate_fixtures(args.city, args.places, args.seed), f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Wrote {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Memory benchmark for the place model
+
+Builds a large candidate pool from synthetic OpenTripMap records and compares the retained
+memory and build time of the Place/RouteLeg objects with the plain dicts the pipeline used
+to create: a candidate dict per place, a second dict when details were merged, and a copy
+per place when route legs were attached.
+
+    python -m benchmarks.place_memory
+    python -m benchmarks.place_memory --places 50000 --runs 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from benchmarks.make_fixtures import CITY_CENTERS, generate_places
+from tools.models import Place, RouteLeg, point_coords
+
+def build_dicts(records: list) -> list:
+    """Candidate -> detailed -> routed dicts, as the pipeline built them before the Place model"""
+    candidates = [
+        {
+            "name": record['name'],
+            "xid": record.get('xid'),
+            "point": record.get('point', {}),
+            "kinds": record.get('kinds', ''),
+            "visit_duration": "2-3 hours",
+            "best_time": "morning",
+            "distance_from_center": record['dist'] / 1000
+        }
+        for record in records
+    ]
+    detailed = [
+        {
+            "name": place['name'],
+            "point": place.get('point', {}),
+            "kinds": place.get('kinds', ''),
+            "visit_duration": place.get('visit_duration', '2-3 hours'),
+            "best_time": place.get('best_time', 'morning'),
+            "description": f"Visit {place['name']}",
+            "rating": place.get('rate', 0),
+            "is_popular": False,
+            "distance_from_center": place.get('distance_from_center', 0)
+        }
+        for place in candidates
+    ]
+    routed = []
+    for place in detailed:
+        enhanced_place = place.copy()
+        enhanced_place['route_to_next'] = {
+            'distance_km': 1.0, 'travel_time_minutes': 5.0, 'travel_time_formatted': "5 min",
+            'route_steps': [], 'next_place': place['name']
+        }
+        routed.append(enhanced_place)
+    return routed
+
+def build_places(records: list) -> list:
+    """The same stages with one Place per record, enriched in place"""
+    places = [
+        Place(
+            name=record['name'],
+            coords=point_coords(record.get('point', {})),
+            xid=record.get('xid'),
+            kinds=record.get('kinds', ''),
+            distance_from_center=record['dist'] / 1000
+        )
+        for record in records
+    ]
+    for place in places:
+        place.description = f"Visit {place.name}"
+        place.route_to_next = RouteLeg(1.0, 5.0, "5 min", next_place=place.name)
+    return places
+
+def measure(build, records: list, runs: int) -> dict:
+    """Median build time, and retained/peak memory of one traced build"""
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        build(records)
+        durations.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    result = build(records)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        'build_ms': round(statistics.median(durations), 1),
+        'retained_kib': round(retained / 1024, 1),
+        'peak_kib': round(peak / 1024, 1),
+        'bytes_per_place': round(retained / len(records))
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Retained memory of dict vs Place candidate pools")
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    records = generate_places(CITY_CENTERS['Paris'], args.places, random.Random(args.seed))
+    results = {
+        'dicts': measure(build_dicts, records, args.runs),
+        'Place': measure(build_places, records, args.runs)
+    }
+
+    columns = ['build_ms', 'retained_kib', 'peak_kib', 'bytes_per_place']
+    print(f"\n{args.places} places")
+    print(f"{'model':<10}" + "".join(f"{column:>17}" for column in columns))
+    for name, metrics in results.items():
+        print(f"{name:<10}" + "".join(f"{metrics[column]:>17}" for column in columns))
+    saved = 1 - results['Place']['retained_kib'] / results['dicts']['retained_kib']
+    print(f"\nPlace objects retain {saved:.0%} less memory than the dict pipeline")
+
+if __name__ == '__main__':
+    main()
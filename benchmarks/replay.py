@@ -0,0 +1,165 @@
+"""
+Replay transport for offline benchmarks
+
+ReplayAdapter is a requests transport adapter that answers upstream calls from a fixture
+file instead of the network, after an injected per-host latency. It is mounted on the shared
+tools.http_client session, so every tool in the pipeline is exercised unchanged.
+
+Fixtures are JSON: {"responses": [{"method", "host", "path", "match", "status", "body"}]}.
+"match" pins the identifying query parameters (e.g. {"text": "Paris"}); API keys and other
+parameters are ignored, and an entry with an empty match answers any query on its path (the
+generated fixtures use this so every radius returns the same city). ORS directions requests
+carry arbitrary waypoints, so they are never recorded and are always synthesized from straight
+line distances at a constant speed.
+
+RecordingAdapter wraps the real HTTPAdapter and writes what it sees in the same format, so a
+fixture file can be refreshed from live APIs with real keys:
+
+    python -m benchmarks.run --record benchmarks/fixtures/paris.json
+"""
+
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit, parse_qs
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from tools import http_client
+from tools.geo import haversine_km
+
+DIRECTIONS_PATH_PREFIX = '/v2/directions/'
+SYNTHETIC_SPEED_KMH = 30
+# Query parameters that identify a response; everything else (keys, formats) is ignored
+RECORDED_PARAMS = ('text', 'q', 'lat', 'lon', 'radius')
+
+class ReplayAdapter(BaseAdapter):
+    """Serve requests from recorded fixtures with injected latency"""
+
+    def __init__(self, responses: List[Dict], latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 host_latency_ms: Dict[str, float] = None, seed: int = 0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.host_latency_ms = host_latency_ms or {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.misses = []
+        for entry in responses:
+            match = tuple(sorted(entry.get('match', {}).items()))
+            self._entries[(entry['method'].upper(), entry['host'], entry['path'], match)] = entry
+
+    @classmethod
+    def from_file(cls, path: str, **options) -> 'ReplayAdapter':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['responses'], **options)
+
+    def _delay(self, host: str) -> None:
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay_ms = max(0.0, self.host_latency_ms.get(host, self.latency_ms) + jitter)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+    def _lookup(self, method: str, url: str) -> Dict:
+        parts = urlsplit(url)
+        key = (method, parts.netloc, parts.path)
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        match = tuple(sorted((name, query[name]) for name in RECORDED_PARAMS if name in query))
+        # Most specific first: all identifying parameters, then one at a time, then the path alone
+        for candidate in [match] + [(item,) for item in match] + [()]:
+            entry = self._entries.get(key + (candidate,))
+            if entry is not None:
+                return entry
+        return None
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parts = urlsplit(request.url)
+        self._delay(parts.netloc)
+
+        if parts.path.startswith(DIRECTIONS_PATH_PREFIX):
+            status, body = 200, synthesize_directions(json.loads(request.body or b'{}'))
+        elif (entry := self._lookup(request.method, request.url)) is None:
+            with self._lock:
+                self.misses.append(f"{request.method} {parts.netloc}{parts.path}?{parts.query}")
+            status, body = 404, {"error": "no fixture for request"}
+        else:
+            status, body = entry['status'], entry['body']
+        return build_response(request, status, body)
+
+    def close(self):
+        pass
+
+def build_response(request, status: int, body) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode('utf-8')
+    response.headers['Content-Type'] = 'application/json'
+    response.encoding = 'utf-8'
+    response.url = request.url
+    response.request = request
+    return response
+
+def _straight_line_km(a: List[float], b: List[float]) -> float:
+    """Great-circle distance between two [lon, lat] points"""
+    return haversine_km(a[1], a[0], b[1], b[0])
+
+def synthesize_directions(payload: Dict) -> Dict:
+    """An ORS JSON directions response with one segment per consecutive waypoint pair"""
+    coordinates = payload.get('coordinates', [])
+    segments = []
+    for a, b in zip(coordinates, coordinates[1:]):
+        # Roads are longer than the straight line; 1.3 is a typical urban detour factor
+        distance_m = _straight_line_km(a, b) * 1300
+        segments.append({
+            'distance': round(distance_m, 1),
+            'duration': round(distance_m / (SYNTHETIC_SPEED_KMH / 3.6), 1),
+            'steps': []
+        })
+    return {'routes': [{'segments': segments}]}
+
+class RecordingAdapter(HTTPAdapter):
+    """Pass requests to the network and keep each JSON response in fixture format"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self.responses = []
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        parts = urlsplit(request.url)
+        if parts.path.startswith(DIRECTIONS_PATH_PREFIX):
+            return response
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        try:
+            body = response.json()
+        except ValueError:
+            return response
+        with self._lock:
+            self.responses.append({
+                'method': request.method,
+                'host': parts.netloc,
+                'path': parts.path,
+                'match': {name: query[name] for name in RECORDED_PARAMS if name in query},
+                'status': response.status_code,
+                'body': body
+            })
+        return response
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'responses': self.responses}, f, indent=1, ensure_ascii=False)
+
+@contextmanager
+def mounted(adapter: BaseAdapter, prefixes: Tuple[str, ...] = ('https://', 'http://')):
+    """Mount an adapter on the shared http_client session for the duration of the block"""
+    previous = {prefix: http_client.mount_adapter(prefix, adapter) for prefix in prefixes}
+    try:
+        yield adapter
+    finally:
+        for prefix, old in previous.items():
+            http_client.mount_adapter(prefix, old)
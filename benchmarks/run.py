@@ -0,0 +1,185 @@
+"""
+Offline benchmark runner
+
+Replays recorded upstream responses through the shared HTTP session with injected latency,
+runs each scenario, and reports throughput, p50/p95/p99 latency and memory allocations. With
+--baseline the results are compared to a stored run and the process exits non-zero when a
+scenario regresses beyond the tolerance.
+
+A baseline holds absolute timings and only applies to the machine that recorded it. Before
+comparing on other hardware, save a baseline there from the commit you compare against.
+
+    python -m benchmarks.run                                   # all scenarios, 20 ms upstream latency
+    python -m benchmarks.run --scenarios plan_trip --iterations 50 --latency-ms 80 --jitter-ms 20
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.25
+    python -m benchmarks.run --record benchmarks/fixtures/paris.json   # live APIs, real keys needed
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+# Scenarios clear the caches between iterations; keep the developer's on-disk geocode cache out of it
+os.environ['GEOCODE_CACHE_PATH'] = ':memory:'
+# Pipeline logs go to stderr; only warnings and errors are interesting next to the results table
+# (run with LOG_LEVEL=INFO to see everything)
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(BENCHMARKS_DIR, 'fixtures', 'paris.json')
+PERCENTILES = (50, 95, 99)
+# Metrics compared against the baseline, with the smallest absolute change treated as real
+COMPARED_METRICS = {'p50_ms': 1.0, 'p95_ms': 2.0, 'peak_kib': 256.0}
+
+def measure(scenario, inputs, iterations: int, warmup: int) -> dict:
+    """Time a scenario and measure the allocations of one extra traced call"""
+    for _ in range(warmup):
+        scenario(inputs)
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        scenario(inputs)
+        samples.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    # Tracing slows every allocation down, so memory is measured separately from latency
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    scenario(inputs)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+
+    return {
+        'iterations': iterations,
+        'throughput_per_s': round(iterations / elapsed, 2),
+        **{f'p{p}_ms': round(float(np.percentile(samples, p)), 2) for p in PERCENTILES},
+        'peak_kib': round(peak / 1024, 1),
+        'retained_kib': round(allocated / 1024, 1)
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of results against baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, floor in COMPARED_METRICS.items():
+            if metric not in previous:
+                continue
+            limit = previous[metric] * (1 + tolerance)
+            if current[metric] > limit and current[metric] - previous[metric] > floor:
+                regressions.append(
+                    f"{name}.{metric}: {current[metric]} vs baseline {previous[metric]} "
+                    f"(+{(current[metric] / previous[metric] - 1) * 100 if previous[metric] else float('inf'):.0f}%)"
+                )
+    return regressions
+
+def print_table(results: dict, baseline: dict = None) -> None:
+    columns = ['throughput_per_s'] + [f'p{p}_ms' for p in PERCENTILES] + ['peak_kib', 'retained_kib']
+    print(f"\n{'scenario':<24}" + "".join(f"{column:>17}" for column in columns))
+    for name, metrics in results.items():
+        print(f"{name:<24}" + "".join(f"{metrics[column]:>17}" for column in columns))
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = []
+            for column in columns:
+                if previous.get(column):
+                    deltas.append(f"{(metrics[column] / previous[column] - 1) * 100:>+16.0f}%")
+                else:
+                    deltas.append(f"{'':>17}")
+            print(f"{'  vs baseline':<24}" + "".join(deltas))
+
+def record(fixtures_path: str, scenario_names: list, city: str) -> None:
+    """Run each scenario once against the live APIs and save the responses as fixtures"""
+    from benchmarks.replay import RecordingAdapter, mounted
+    from benchmarks.scenarios import SCENARIOS_BY_NAME, build_context
+
+    adapter = RecordingAdapter()
+    with mounted(adapter):
+        context = build_context(city)
+        for name in scenario_names:
+            scenario = SCENARIOS_BY_NAME[name]
+            scenario(scenario.setup(context))
+    adapter.save(fixtures_path)
+    print(f"Recorded {len(adapter.responses)} responses to {fixtures_path}")
+
+def main() -> int:
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks for the planning pipeline",
+        epilog="Baselines hold absolute timings and only apply to the machine that recorded them."
+    )
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    parser.add_argument('--scenarios', nargs='+', default=[scenario.name for scenario in SCENARIOS],
+                        choices=[scenario.name for scenario in SCENARIOS])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="injected latency per upstream request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="uniform +/- jitter on the injected latency")
+    parser.add_argument('--baseline', help="compare against this results file (recorded on this machine) and fail on regressions")
+    parser.add_argument('--save-baseline', help="write the results to this file")
+    parser.add_argument('--tolerance', type=float, default=0.30, help="allowed relative slowdown before failing")
+    parser.add_argument('--record', metavar='FIXTURES', help="record live responses to this file instead of benchmarking")
+    args = parser.parse_args()
+
+    with open(args.fixtures, encoding='utf-8') as f:
+        city = json.load(f).get('city', 'Paris')
+
+    if args.record:
+        record(args.record, args.scenarios, city)
+        return 0
+
+    from benchmarks.replay import ReplayAdapter, mounted
+    from benchmarks.scenarios import SCENARIOS_BY_NAME, build_context
+
+    adapter = ReplayAdapter.from_file(args.fixtures, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    results = {}
+    with mounted(adapter):
+        context = build_context(city)
+        for name in args.scenarios:
+            scenario = SCENARIOS_BY_NAME[name]
+            print(f"▶ {name}", file=sys.stderr)
+            results[name] = measure(scenario, scenario.setup(context), args.iterations, args.warmup)
+
+    if adapter.misses:
+        print(f"⚠️  {len(adapter.misses)} requests had no fixture, e.g. {adapter.misses[0]}", file=sys.stderr)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    print(f"\nCity: {city}, upstream latency {args.latency_ms} ms ± {args.jitter_ms} ms, {args.iterations} iterations")
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'settings': {'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'iterations': args.iterations},
+                'results': results
+            }, f, indent=2)
+        print(f"\nSaved results to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark scenarios for the planning pipeline
+
+Each scenario has a setup, run once against the replay transport, that prepares its inputs,
+and a body that is timed. Caches are cleared before every timed call so each iteration pays
+for its upstream requests, as a first plan for a city would.
+"""
+
+from typing import Callable, Dict
+from tools.geocode_cache import geocode_cache
+from tools.poi_cache import poi_cache
+from tools.detail_cache import detail_cache
+from tools.weather_cache import weather_cache
+from tools.routes import get_coords
+from tools.weather import get_weather
+from tools.place import get_places_with_dynamic_radius
+from tools.trip_mapper import optimize_route, get_detailed_route_info
+from tools.export import export_trip_plan
+from Agents.place_selector import get_detailed_places_for_trip_planning
+from Agents.trip_planner import plan_trip_with_place_selector
+
+TRIP_DAYS = "3"
+LONG_TRIP_DAYS = "14"
+EXPORT_FORMATS = ("mobile", "html", "json")
+
+def clear_caches() -> None:
+    """Forget every cached upstream response"""
+    geocode_cache.clear()
+    poi_cache.clear()
+    detail_cache.clear()
+    weather_cache.clear()
+
+class Scenario:
+    """A named benchmark: setup(context) returns the inputs passed to body(inputs) on every iteration"""
+
+    def __init__(self, name: str, body: Callable, setup: Callable = None, cold: bool = True):
+        self.name = name
+        self.body = body
+        self.setup = setup or (lambda context: None)
+        self.cold = cold
+
+    def __call__(self, inputs):
+        if self.cold:
+            clear_caches()
+        return self.body(inputs)
+
+def build_context(city: str) -> Dict:
+    """Inputs shared by several scenarios, computed once through the replay transport"""
+    clear_caches()
+    coords = get_coords(city)
+    weather = get_weather(city)
+    long_trip_places = get_detailed_places_for_trip_planning(city, coords, LONG_TRIP_DAYS, "Medium")
+    optimized = optimize_route(long_trip_places)
+    plan = plan_trip_with_place_selector(city, coords, weather, "Medium", TRIP_DAYS)
+    return {
+        "city": city,
+        "coords": coords,
+        "weather": weather,
+        "long_trip_places": long_trip_places,
+        "optimized_places": optimized,
+        "plan": plan
+    }
+
+SCENARIOS = [
+    Scenario(
+        "places_dynamic_radius",
+        lambda c: get_places_with_dynamic_radius(c["city"], c["coords"], int(TRIP_DAYS)),
+        setup=lambda context: context
+    ),
+    Scenario(
+        "detailed_places",
+        lambda c: get_detailed_places_for_trip_planning(c["city"], c["coords"], TRIP_DAYS, "Medium"),
+        setup=lambda context: context
+    ),
+    Scenario(
+        "optimize_route",
+        lambda places: optimize_route(places),
+        setup=lambda context: context["long_trip_places"],
+        cold=False
+    ),
+    Scenario(
+        "detailed_route_info",
+        lambda places: get_detailed_route_info(places),
+        setup=lambda context: context["optimized_places"],
+        cold=False
+    ),
+    Scenario(
+        "plan_trip",
+        lambda c: plan_trip_with_place_selector(c["city"], c["coords"], c["weather"], "Medium", TRIP_DAYS),
+        setup=lambda context: context
+    ),
+    Scenario(
+        "export",
+        lambda plan: [export_trip_plan(plan, export_format) for export_format in EXPORT_FORMATS],
+        setup=lambda context: context["plan"],
+        cold=False
+    )
+]
+
+SCENARIOS_BY_NAME = {scenario.name: scenario for scenario in SCENARIOS}
@@ -47,6 +47,24 @@ DEFAULT_FEATURES = {
     "show_route_optimization": True
 }
 
+# Planning Cache (st.cache_data, shared across sessions)
+# Each pipeline stage is cached on its own inputs: geocode on the destination, places on the
+# destination, coordinates and duration (not the budget, which does not change them), and the
+# plan on all of them. Below the places stage, OpenTripMap radius queries and per-xid detail
+# records are cached process-wide by tools.poi_cache and tools.detail_cache, so changing only
+# the duration reuses the detail records already fetched. Weather is not cached here:
+# tools.weather keeps its own cache and reports the age of the data it returns.
+CACHE_TTL = {
+    "geocode": int(os.getenv("APP_CACHE_GEOCODE_TTL", 24 * 3600)),
+    "places": int(os.getenv("APP_CACHE_PLACES_TTL", 6 * 3600)),
+    "plan": int(os.getenv("APP_CACHE_PLAN_TTL", 3600))
+}
+CACHE_MAX_ENTRIES = {
+    "geocode": 1000,
+    "places": 200,
+    "plan": 200
+}
+
 # Progress Steps
 PROGRESS_STEPS = [
     ("🔍 Finding the best places to visit...", 25),
@@ -92,29 +110,7 @@ FEATURE_ICONS = {
     "export_ready": "📱"
 }
 
-# Place Type Icons
-PLACE_ICONS = {
-    "museum": "🏛️",
-    "temple": "🛕",
-    "park": "🌳",
-    "restaurant": "🍽️",
-    "hotel": "🏨",
-    "shopping": "🛍️",
-    "entertainment": "🎭",
-    "historical": "🏛️",
-    "nature": "🌲",
-    "beach": "🏖️",
-    "mountain": "⛰️",
-    "castle": "🏰",
-    "church": "⛪",
-    "mosque": "🕌",
-    "synagogue": "🕍",
-    "monument": "🗽",
-    "tower": "🗼",
-    "bridge": "🌉",
-    "square": "🏛️",
-    "garden": "🌺"
-}
+# Place type icons are matched by tools.classifier (PLACE_ICONS and EXTRA_PLACE_ICONS)
 
 # Help Messages
 HELP_MESSAGES = {
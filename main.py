@@ -1,9 +1,9 @@
 from langgraph.graph import StateGraph, START, END
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from typing import TypedDict, Optional
-from langchain.agents import tool, AgentExecutor, create_openai_tools_agent
+from langchain_core.tools import tool
+from typing import TypedDict, Optional, Annotated
 import os
+import time
+from functools import wraps, lru_cache
 from dotenv import load_dotenv
 import json
 
@@ -15,19 +15,39 @@ from tools.weather import get_weather
 from Agents.place_selector import get_detailed_places_for_trip_planning
 from Agents.trip_planner import plan_trip_with_place_selector
 from tools.place import get_20_places
+from tools.models import to_plain
+from Agents.llm import get_llm
+
+def merge_timings(left: dict, right: dict) -> dict:
+    """Reducer for stage timings so parallel nodes can report them in the same step"""
+    return {**(left or {}), **(right or {})}
 
 # Define State
 class AgentState(TypedDict):
     user_input: dict
     places: list[dict]
+    places_text: str
     weather: dict
     trip_plan: dict
+    timings: Annotated[dict, merge_timings]
+
+def timed_node(stage: str):
+    """
+    Record a node's wall-clock time in state["timings"]
+    Nodes return only the keys they update, so get_places and get_weather can run in the
+    same step without writing to each other's state
+    """
+    def decorator(node):
+        @wraps(node)
+        def wrapper(state: AgentState) -> dict:
+            started = time.perf_counter()
+            update = node(state)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            return {**update, "timings": {stage: elapsed_ms}}
+        return wrapper
+    return decorator
 
-# Groq LLM setup
-llm = ChatGroq(model="llama3-8b-8192", api_key=os.getenv("GROQ_API_KEY"))
-prompt = ChatPromptTemplate.from_messages([
-    ("system", 
-     """
+SYSTEM_PROMPT = """
 You are a smart travel planner assistant. 
 Your job is to help the user plan a travel trip based on 4 key things:
 - Find the best places to visit in the destination using detailed place research
@@ -47,14 +67,11 @@ You must ensure that:
 - The route and distance are shown clearly with timing considerations
 - Places to visit are well-researched with visit duration and requirements
 - Weather conditions are considered for optimal timing
-"""),
-    MessagesPlaceholder(variable_name="agent_scratchpad"),
-    ("human", "{input}")
-])
+"""
 
 # Tools definition
 @tool
-def get_detailed_places_tool(destination: str) -> str:
+def get_detailed_places_tool(destination: str, budget: str = "Medium", duration: str = "1") -> str:
     """Fetches detailed must-visit places for a destination with visit duration, timing, and requirements."""
     coords = get_coords(destination)
     if not coords:
@@ -62,7 +79,7 @@ def get_detailed_places_tool(destination: str) -> str:
     
     try:
         # Use the direct place selector function
-        detailed_places = get_detailed_places_for_trip_planning(destination, coords)
+        detailed_places = get_detailed_places_for_trip_planning(destination, coords, duration, budget)
         if detailed_places:
             places_info = []
             for place in detailed_places:
@@ -91,13 +108,39 @@ def create_comprehensive_trip_plan(destination: str, budget: str, duration: str)
     try:
         # Use the integrated trip planning function
         trip_plan = plan_trip_with_place_selector(destination, coords, weather, budget, duration)
-        return trip_plan
+        return to_plain(trip_plan)
     except Exception as e:
         return {"error": f"Error creating trip plan: {str(e)}"}
 
 tools = [get_detailed_places_tool, get_weather_tool, create_comprehensive_trip_plan]
-agent = create_openai_tools_agent(llm, tools, prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+
+@lru_cache(maxsize=None)
+def get_agent_executor():
+    """
+    Build the tool-calling agent on first use
+    The graph below never calls it, so importing this module does not load the Groq client
+    or the langchain agent stack
+    """
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from langchain.agents import AgentExecutor, create_openai_tools_agent
+    
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ("human", "{input}")
+    ])
+    agent = create_openai_tools_agent(get_llm(), tools, prompt)
+    return AgentExecutor(agent=agent, tools=tools, verbose=True)
+
+def __getattr__(name: str):
+    # Keep main.llm / main.agent_executor working for existing callers without building them at import
+    if name == "llm":
+        return get_llm()
+    if name == "agent_executor":
+        return get_agent_executor()
+    if name == "agent":
+        return get_agent_executor().agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def print_welcome():
     """Display welcome message and instructions"""
@@ -156,7 +199,14 @@ def print_trip_summary(state: AgentState):
                     for day, places in day_plan.items():
                         print(f"\n{day}:")
                         for place in places:
-                            print(f"  • {place['place']} ({place['duration']}) - {place['best_time']}")
+                            timing = f"{place['best_time']} from {place['start_time']}" if place.get('start_time') else place['best_time']
+                            print(f"  • {place['place']} ({place['duration']}) - {timing}")
+    
+    if state.get("timings"):
+        print("\n⏱️  STAGE TIMINGS:")
+        print("-" * 40)
+        for stage, elapsed_ms in state["timings"].items():
+            print(f"  • {stage}: {elapsed_ms:.0f} ms")
     
     print("=" * 60)
     print("Happy Traveling! ✈️")
@@ -218,15 +268,18 @@ def user_input_node(state: AgentState) -> AgentState:
             continue
 
 # Node 2 - Get detailed places from place selector
+@timed_node("get_places")
 def agent_places_node(state: AgentState) -> AgentState:
     print("\n🔍 Finding the best places to visit...")
     destination = state["user_input"]["destination"]["name"]
     coords = state["user_input"]["destination"]["coords"]
+    budget = state["user_input"]["budget"]
+    duration = state["user_input"]["duration"]
     
     try:
         # Get places directly instead of using agent tool
         from Agents.place_selector import get_detailed_places_for_trip_planning
-        places = get_detailed_places_for_trip_planning(destination, coords)
+        places = get_detailed_places_for_trip_planning(destination, coords, duration, budget)
         
         if places:
             places_info = []
@@ -238,12 +291,13 @@ def agent_places_node(state: AgentState) -> AgentState:
             result_text = f"No places found for {destination}"
         
         print("✅ Places found successfully!")
-        return {**state, "places": places, "places_text": result_text}
+        return {"places": places, "places_text": result_text}
     except Exception as e:
         print(f"❌ Error finding places: {str(e)}")
-        return {**state, "places": [], "places_text": f"Error getting places for {destination}: {str(e)}"}
+        return {"places": [], "places_text": f"Error getting places for {destination}: {str(e)}"}
 
-# Node 3 - Get weather information
+# Node 3 - Get weather information (runs in parallel with Node 2)
+@timed_node("get_weather")
 def agent_weather_node(state: AgentState) -> AgentState:
     print("🌤️  Getting weather information...")
     destination = state["user_input"]["destination"]["name"]
@@ -253,12 +307,13 @@ def agent_weather_node(state: AgentState) -> AgentState:
         from tools.weather import get_weather
         weather = get_weather(destination)
         print("✅ Weather information retrieved!")
-        return {**state, "weather": weather}
+        return {"weather": weather}
     except Exception as e:
         print(f"❌ Error getting weather: {str(e)}")
-        return {**state, "weather": {}}
+        return {"weather": {}}
 
-# Node 4 - Create comprehensive trip plan
+# Node 4 - Create comprehensive trip plan once places and weather have both arrived
+@timed_node("create_trip_plan")
 def agent_trip_plan_node(state: AgentState) -> AgentState:
     print("🗺️  Creating your comprehensive trip plan...")
     destination = state["user_input"]["destination"]["name"]
@@ -273,10 +328,10 @@ def agent_trip_plan_node(state: AgentState) -> AgentState:
         from Agents.trip_planner import plan_trip_with_place_selector
         trip_plan = plan_trip_with_place_selector(destination, coords, weather, budget, duration, existing_places=places)
         print("✅ Trip plan created successfully!")
-        return {**state, "trip_plan": trip_plan}
+        return {"trip_plan": trip_plan}
     except Exception as e:
         print(f"❌ Error creating trip plan: {str(e)}")
-        return {**state, "trip_plan": {}}
+        return {"trip_plan": {}}
 
 # Node 5 - Display results
 def display_results_node(state: AgentState) -> AgentState:
@@ -292,14 +347,28 @@ graph.add_node("create_trip_plan", agent_trip_plan_node)
 graph.add_node("display_results", display_results_node)
 
 graph.add_edge(START, "user_input")
+# Places and weather only depend on the user input: fan out, then join before planning
 graph.add_edge("user_input", "get_places")
-graph.add_edge("get_places", "get_weather")
-graph.add_edge("get_weather", "create_trip_plan")
+graph.add_edge("user_input", "get_weather")
+graph.add_edge(["get_places", "get_weather"], "create_trip_plan")
 graph.add_edge("create_trip_plan", "display_results")
 graph.add_edge("display_results", END)
 
 # Compile and Run
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Travel Agent - plan one trip interactively or many from a file")
+    parser.add_argument("--batch", metavar="JOBS", help="CSV or JSONL file of destination/budget/duration jobs")
+    parser.add_argument("--output", default="trip_plans.jsonl", help="JSONL output for --batch, also used to resume")
+    parser.add_argument("--workers", type=int, default=8, help="worker threads for --batch")
+    parser.add_argument("--restart", action="store_true", help="ignore existing --batch output instead of resuming")
+    args = parser.parse_args()
+    
+    if args.batch:
+        from batch_planner import run_batch
+        run_batch(args.batch, args.output, max_workers=args.workers, resume=not args.restart)
+        raise SystemExit(0)
+    
     try:
         app = graph.compile()
         app.invoke({})
@@ -0,0 +1,240 @@
+"""
+Headless HTTP/JSON planning service
+
+A plain ASGI application around the same functions the Streamlit app uses, so planning can be
+load-tested, called from other services and scaled behind a load balancer. Run with:
+
+    uvicorn service:app --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints:
+    GET  /health
+    GET  /metrics  span timings (p50/p95/max) and counters for upstream calls, cache hits and fallbacks
+    GET  /weather?city=Paris
+    GET  /places?destination=Paris&duration=3&budget=Medium
+    POST /plan     {"destination": "Paris", "budget": "Medium", "duration": 3, "include_weather": true}
+    POST /export   {"trip_plan": {...}, "format": "mobile" | "html" | "json"}
+
+The planning functions are blocking, so each request runs them on a shared thread pool and
+the event loop stays free for other requests. Every request is bounded by a deadline; when it
+passes the client gets a 504 (the worker thread finishes in the background and still warms
+the geocode, POI, place detail and weather caches).
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+from dotenv import load_dotenv
+from tools.routes import get_coords
+from tools.weather import get_weather_with_age
+from tools.export import export_trip_plan
+from tools.telemetry import get_logger, get_metrics
+from tools.deadline import Deadline
+from tools.models import to_plain
+from Agents.place_selector import get_detailed_places_for_trip_planning, DETAIL_FETCH_DEADLINE
+from Agents.trip_planner import plan_trip_with_place_selector, mark_degraded
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+SERVICE_REQUEST_DEADLINE = float(os.getenv('SERVICE_REQUEST_DEADLINE', 60))
+SERVICE_WORKERS = int(os.getenv('SERVICE_WORKERS', 16))
+SERVICE_MAX_BODY_BYTES = int(os.getenv('SERVICE_MAX_BODY_BYTES', 1024 * 1024))
+
+BUDGET_LEVELS = ['low', 'medium', 'high']
+
+_executor = ThreadPoolExecutor(max_workers=SERVICE_WORKERS, thread_name_prefix="planner")
+
+class HTTPError(Exception):
+    """Error with an HTTP status, returned to the client as {"error": message}"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the planner pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: func(*args, **kwargs))
+
+def _require(params: dict, name: str) -> str:
+    value = params.get(name)
+    if value is None or not str(value).strip():
+        raise HTTPError(400, f"Missing required parameter: {name}")
+    return str(value).strip()
+
+def _parse_trip_params(params: dict) -> tuple:
+    """Validate destination/budget/duration the same way main.user_input_node does"""
+    destination = _require(params, 'destination')
+    budget = str(params.get('budget', 'Medium')).strip()
+    if budget.lower() not in BUDGET_LEVELS:
+        raise HTTPError(400, "Invalid budget! Please choose: Low, Medium, or High")
+    try:
+        duration = int(params.get('duration', 1))
+    except (TypeError, ValueError):
+        raise HTTPError(400, "Duration must be a number!")
+    if duration <= 0:
+        raise HTTPError(400, "Duration must be a positive number!")
+    return destination, budget.capitalize(), str(duration)
+
+async def _geocode(destination: str, deadline: Deadline = None) -> tuple:
+    coords = await run_blocking(get_coords, destination, deadline)
+    if not coords:
+        raise HTTPError(404, f"Could not find coordinates for {destination}")
+    return coords
+
+async def handle_health(params: dict) -> dict:
+    return {"status": "ok"}
+
+async def handle_metrics(params: dict) -> dict:
+    return get_metrics()
+
+async def handle_weather(params: dict) -> dict:
+    city = _require(params, 'city')
+    weather, age = await run_blocking(get_weather_with_age, city)
+    return {"city": city, "weather": weather, "age_seconds": None if age is None else round(age, 1)}
+
+async def handle_places(params: dict) -> dict:
+    destination, budget, duration = _parse_trip_params(params)
+    coords = await _geocode(destination)
+    places = await run_blocking(get_detailed_places_for_trip_planning, destination, coords, duration, budget)
+    return {"destination": destination, "coords": coords, "places": places}
+
+async def handle_plan(params: dict) -> dict:
+    destination, budget, duration = _parse_trip_params(params)
+    include_weather = params.get('include_weather', True) not in (False, 'false', '0')
+    stage_timings = {}
+    # One latency budget for the whole plan; past it the plan is built from estimates and marked degraded
+    deadline = Deadline()
+
+    async def timed(stage, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            stage_timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def no_weather():
+        return {}, None
+
+    # Weather only needs the destination name, so it runs alongside geocoding and place lookup
+    weather_task = asyncio.create_task(
+        timed("weather", run_blocking, get_weather_with_age, destination) if include_weather else no_weather()
+    )
+    try:
+        coords = await timed("geocode", _geocode, destination, deadline)
+        places = await timed(
+            "places", run_blocking, get_detailed_places_for_trip_planning,
+            destination, coords, duration, budget, deadline=deadline.cap(DETAIL_FETCH_DEADLINE)
+        )
+        if not places:
+            raise HTTPError(404, f"No places found for {destination}")
+        weather_late = False
+        try:
+            weather, _ = await asyncio.wait_for(weather_task, timeout=deadline.wait_timeout())
+        except asyncio.TimeoutError:
+            logger.warning("Weather not ready within the latency budget, planning without it", extra={'destination': destination})
+            weather, weather_late = {}, True
+    finally:
+        weather_task.cancel()
+
+    trip_plan = await timed(
+        "trip_plan", run_blocking, plan_trip_with_place_selector,
+        destination, coords, weather, budget, duration, existing_places=places, deadline=deadline
+    )
+    if trip_plan.get('error'):
+        raise HTTPError(502, trip_plan['error'])
+    if weather_late:
+        mark_degraded(trip_plan, "weather")
+    trip_plan['stage_timings'] = stage_timings
+    return trip_plan
+
+async def handle_export(params: dict) -> dict:
+    trip_plan = params.get('trip_plan')
+    if not isinstance(trip_plan, dict):
+        raise HTTPError(400, "Missing required parameter: trip_plan")
+    return await run_blocking(export_trip_plan, trip_plan, params.get('format', 'mobile'))
+
+ROUTES = {
+    ("GET", "/health"): handle_health,
+    ("GET", "/metrics"): handle_metrics,
+    ("GET", "/weather"): handle_weather,
+    ("GET", "/places"): handle_places,
+    ("POST", "/plan"): handle_plan,
+    ("POST", "/export"): handle_export
+}
+
+async def _read_json_body(receive) -> dict:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > SERVICE_MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        if not message.get("more_body"):
+            break
+    if not body:
+        return {}
+    try:
+        params = json.loads(body)
+    except json.JSONDecodeError:
+        raise HTTPError(400, "Request body must be valid JSON")
+    if not isinstance(params, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return params
+
+async def _send_json(send, status: int, payload) -> None:
+    body = json.dumps(to_plain(payload), default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                _executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"].rstrip("/") or "/"
+    handler = ROUTES.get((method, path))
+    try:
+        if handler is None:
+            allowed = [route_method for route_method, route_path in ROUTES if route_path == path]
+            raise HTTPError(405 if allowed else 404, f"No route for {method} {path}")
+
+        if method == "GET":
+            query = parse_qs(scope.get("query_string", b"").decode("utf-8"))
+            params = {name: values[-1] for name, values in query.items()}
+        else:
+            params = await _read_json_body(receive)
+
+        try:
+            result = await asyncio.wait_for(handler(params), timeout=SERVICE_REQUEST_DEADLINE)
+        except asyncio.TimeoutError:
+            raise HTTPError(504, f"Request exceeded the {SERVICE_REQUEST_DEADLINE:g}s deadline")
+        await _send_json(send, 200, result)
+    except HTTPError as e:
+        await _send_json(send, e.status, {"error": e.message})
+    except Exception:
+        logger.exception("Error handling request", extra={'method': method, 'path': path})
+        await _send_json(send, 500, {"error": "Internal server error"})
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv('SERVICE_HOST', '127.0.0.1'), port=int(os.getenv('SERVICE_PORT', 8000)))
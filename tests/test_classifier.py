@@ -0,0 +1,55 @@
+"""classify_place must give the same traits as the keyword chains it replaced"""
+
+import unittest
+from tools.classifier import classify_place
+
+# (name, kinds, (visit_duration, best_time, estimated_cost, special_requirements, icon)) recorded
+# from the original get_visit_duration, get_best_time, planner cost checks and get_place_icon
+BASELINE_TRAITS = [
+    ('Louvre Museum', 'museums,cultural', ('3-4 hours', 'afternoon', '$10-20', 'May require tickets', '🏛️')),
+    ('Notre-Dame Cathedral', 'religion,churches', ('1-2 hours', 'morning', 'Free', 'None', '⛪')),
+    ('Temple Bar', '', ('1-2 hours', 'morning', 'Free', 'None', '🛕')),
+    ('Bartholdi Statue', 'monuments', ('1-2 hours', 'morning', 'Free', 'None', '🗽')),
+    ('Palace of Versailles', 'palaces,historic', ('3-4 hours', 'afternoon', '$10-20', 'May require tickets', '🏰')),
+    ('Castle Hill', '', ('3-4 hours', 'morning', '$10-20', 'May require tickets', '🏰')),
+    ('Copacabana Beach', 'beaches', ('2-3 hours', 'morning', 'Free', 'None', '🏖️')),
+    ('Central Park Zoo', 'zoos', ('2-3 hours', 'morning', 'Free', 'None', '🌳')),
+    ('Art Gallery of Ontario', '', ('3-4 hours', 'afternoon', '$10-20', 'May require tickets', '🖼️')),
+    ('Museum of Fortifications', '', ('3-4 hours', 'afternoon', '$10-20', 'May require tickets', '🏛️')),
+    ('Seaport Market', 'marketplaces', ('1-2 hours', 'morning', 'Free', 'None', '🛒')),
+    ('Les Invalides', 'historic,architecture', ('2-3 hours', 'morning', 'Free', 'None', '📍')),
+    ('Unnamed', 'cultural,museums', ('2-3 hours', 'morning', 'Free', 'None', '🏛️')),
+    ('Lake View Garden', '', ('2-3 hours', 'morning', 'Free', 'None', '🌺')),
+    ('Blue Mosque', 'mosques', ('1-2 hours', 'morning', 'Free', 'None', '🕌')),
+    ('Kings Cross Station', '', ('1-2 hours', 'morning', 'Free', 'None', '🚉')),
+    ('Le Procope', 'restaurants,foods', ('1-2 hours', 'morning', 'Free', 'None', '🍽️')),
+    ('Place Vendome', '', ('1-2 hours', 'morning', 'Free', 'None', '📍')),
+]
+
+# Places the original export table gave the default icon, now matched by EXTRA_PLACE_ICONS
+EXTRA_ICONS = [
+    ('Eiffel Tower', 'towers', '🗼'),
+    ('Pont Neuf Bridge', '', '🌉'),
+    ('Grand Synagogue', 'religion', '🕍'),
+]
+
+class ClassifyPlaceTest(unittest.TestCase):
+
+    def test_matches_baseline_traits(self):
+        for name, kinds, expected in BASELINE_TRAITS:
+            with self.subTest(name=name):
+                traits = classify_place(name, kinds)
+                self.assertEqual((traits.visit_duration, traits.best_time, traits.estimated_cost,
+                                  traits.special_requirements, traits.icon), expected)
+
+    def test_extra_icons(self):
+        for name, kinds, icon in EXTRA_ICONS:
+            with self.subTest(name=name):
+                self.assertEqual(classify_place(name, kinds).icon, icon)
+
+    def test_missing_fields(self):
+        traits = classify_place(None, None)
+        self.assertEqual((traits.visit_duration, traits.icon), ('1-2 hours', '📍'))
+
+if __name__ == "__main__":
+    unittest.main()
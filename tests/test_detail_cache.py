@@ -0,0 +1,34 @@
+"""DetailCache must reuse records per xid and never remember a missing one"""
+
+import unittest
+from tools.detail_cache import DetailCache
+
+def failing_fetch():
+    raise RuntimeError("boom")
+
+class DetailCacheTest(unittest.TestCase):
+
+    def test_reuses_record_per_xid(self):
+        cache = DetailCache()
+        calls = []
+        fetch = lambda: calls.append(1) or {'rate': 7}
+        self.assertEqual(cache.get('N1', fetch), {'rate': 7})
+        self.assertEqual(cache.get('N1', fetch), {'rate': 7})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_missing_records_are_fetched_again(self):
+        cache = DetailCache()
+        self.assertIsNone(cache.get('N1', lambda: None))
+        self.assertEqual(cache.get('N1', lambda: {'rate': 2}), {'rate': 2})
+        with self.assertRaises(RuntimeError):
+            cache.get('N2', failing_fetch)
+        self.assertEqual(cache.stats()['size'], 1)
+
+    def test_expired_records_are_fetched_again(self):
+        cache = DetailCache(ttl=-1)
+        cache.get('N1', lambda: {'rate': 1})
+        self.assertEqual(cache.get('N1', lambda: {'rate': 5}), {'rate': 5})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""The short-distance fast paths must agree with the exact haversine kernels"""
+
+import unittest
+import numpy as np
+from tools.geo import SHORT_DISTANCE_KM, haversine_km, haversine_from, within_radius
+
+class ShortDistanceTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.origins = [(rng.uniform(-70, 70), rng.uniform(-180, 180)) for _ in range(50)]
+        self.offsets = rng.normal(0, 0.2, (50, 200, 2))
+
+    def test_pair_matches_haversine(self):
+        for origin, offsets in zip(self.origins, self.offsets):
+            coords = np.asarray(origin) + offsets
+            exact = haversine_from(origin, coords)
+            fast = np.array([haversine_km(*origin, lat, lon) for lat, lon in coords])
+            short = exact <= SHORT_DISTANCE_KM
+            np.testing.assert_allclose(fast[short], exact[short], rtol=1e-4, atol=1e-9)
+            np.testing.assert_allclose(fast[~short], exact[~short], rtol=1e-12)
+
+    def test_within_radius_matches_haversine(self):
+        for origin, offsets in zip(self.origins, self.offsets):
+            coords = np.asarray(origin) + offsets
+            exact = haversine_from(origin, coords)
+            for radius_km in (2, 10, 30, 80):
+                mask = within_radius(origin, coords, radius_km)
+                # Only points within 1e-4 of the radius may fall on either side
+                near_edge = np.abs(exact - radius_km) <= radius_km * 1e-4
+                np.testing.assert_array_equal(mask[~near_edge], (exact <= radius_km)[~near_edge])
+
+    def test_within_radius_skips_missing_coordinates(self):
+        coords = np.array([[48.8566, 2.3522], [np.nan, np.nan]])
+        self.assertEqual(within_radius((48.8566, 2.3522), coords, 5).tolist(), [True, False])
+
+if __name__ == "__main__":
+    unittest.main()
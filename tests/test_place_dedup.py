@@ -0,0 +1,50 @@
+"""PlaceDeduplicator must accept exactly the names the pairwise are_similar_places check accepted"""
+
+import random
+import unittest
+from tools.place import PlaceDeduplicator, are_similar_places
+
+NAMES = [
+    "Eiffel Tower", "The Eiffel Tower", "Tour Eiffel", "Louvre Museum", "Musée du Louvre", "Louvre",
+    "Sri Meenakshi Temple", "Meenakshi Amman Temple", "Notre Dame", "Notre-Dame de Paris", "Sacre Coeur",
+    "Sacré-Cœur", "Arc de Triomphe", "Arc de Triomphe du Carrousel", "Jardin des Tuileries", "Tuileries Garden",
+    "Palais Garnier", "Opera Garnier", "Pont Neuf", "Pont des Arts", "Park Guell", "Parc Guell", "St Mary's Church",
+    "St Marys Church", "Fort Kochi", "Kochi Fort", "Mehrangarh", "Mehrangarh Fort"
+]
+
+# Indices into NAMES accepted by the original pairwise deduplication, per similarity threshold
+BASELINE_ACCEPTED = {
+    0.6: [0, 2, 3, 6, 8, 10, 12, 14, 15, 16, 18, 19, 20, 22, 24, 26],
+    0.8: [0, 2, 3, 6, 8, 9, 10, 11, 12, 14, 15, 16, 17, 18, 19, 20, 22, 24, 26],
+    0.95: [0, 2, 3, 6, 8, 9, 10, 11, 12, 14, 15, 16, 17, 18, 19, 20, 21, 22, 24, 26]
+}
+
+def accepted_indices(names, threshold):
+    deduplicator = PlaceDeduplicator(threshold)
+    return [i for i, name in enumerate(names) if deduplicator.add(name)]
+
+def pairwise_accepted_indices(names, threshold):
+    accepted = []
+    for i, name in enumerate(names):
+        if not any(are_similar_places(name, names[j], threshold) for j in accepted):
+            accepted.append(i)
+    return accepted
+
+class PlaceDeduplicatorTest(unittest.TestCase):
+
+    def test_matches_baseline_examples(self):
+        for threshold, expected in BASELINE_ACCEPTED.items():
+            with self.subTest(threshold=threshold):
+                self.assertEqual(accepted_indices(NAMES, threshold), expected)
+
+    def test_matches_pairwise_check_on_random_names(self):
+        rng = random.Random(7)
+        words = ["saint", "st", "park", "parc", "temple", "old", "fort", "louvre", "garnier", "tower",
+                 "lake", "grand", "palais", "mary", "marys", "a", "de", "la", "x"]
+        names = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(300)]
+        for threshold in (0.6, 0.75, 0.8, 0.9, 0.95):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(accepted_indices(names, threshold), pairwise_accepted_indices(names, threshold))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+"""Places without coordinates must still reach the routed itinerary"""
+
+import unittest
+from tools.models import Place
+from tools.trip_mapper import iter_detailed_route_info, optimize_route_with_stats
+
+LOUVRE = (48.8606, 2.3376)
+EIFFEL = (48.8584, 2.2945)
+
+class DetailedRouteInfoTest(unittest.TestCase):
+
+    def test_yields_places_next_to_unlocated_place(self):
+        places = [Place('No Coords A'), Place('Louvre', LOUVRE), Place('Eiffel Tower', EIFFEL)]
+        optimized, _ = optimize_route_with_stats(places)
+        # Two stops, as a one day trip selects
+        route = list(iter_detailed_route_info([optimized[0], optimized[-1]]))
+        self.assertEqual([place.name for place in route], ['Louvre', 'No Coords A'])
+        self.assertIsNone(route[0].route_to_next)
+
+    def test_unlocated_place_between_located_places(self):
+        places = [Place('Louvre', LOUVRE), Place('No Coords A'), Place('Eiffel Tower', EIFFEL)]
+        route = list(iter_detailed_route_info(places))
+        self.assertEqual([place.name for place in route], ['Louvre', 'No Coords A', 'Eiffel Tower'])
+        self.assertTrue(all(place.route_to_next is None for place in route))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Keyword classifier for place names and OpenTripMap kinds
+
+Every keyword-driven attribute of a place (visit duration, best time to visit, cost,
+special requirements and display icon) comes from the ordered rule tables below: each
+attribute takes the first rule whose keywords occur in the rule's field, exactly as the
+chains of `any(word in name ...)` checks this replaces. Classifying a place once costs about
+the same as those chains did; the gain is that results are memoized per (name, kinds), so
+the selection, the itinerary cards and each export format share one lookup.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CLASSIFIER_CACHE_SIZE = int(os.getenv('CLASSIFIER_CACHE_SIZE', 4096))
+
+PLACE_ICONS = {
+    'temple': '🛕', 'church': '⛪', 'mosque': '🕌', 'cathedral': '⛪', 'monastery': '🏛️', 'shrine': '🛕',
+    'museum': '🏛️', 'gallery': '🖼️', 'palace': '🏰', 'castle': '🏰', 'fort': '🏰', 'monument': '🗽', 'statue': '🗽',
+    'park': '🌳', 'garden': '🌺', 'beach': '🏖️', 'mountain': '⛰️', 'lake': '🏞️', 'river': '🏞️', 'forest': '🌲',
+    'sanctuary': '🐦', 'zoo': '🦁', 'wildlife': '🦁', 'bird': '🐦', 'nature': '🌿',
+    'theater': '🎭', 'cinema': '🎬', 'amusement': '🎡', 'aquarium': '🐠', 'circus': '🎪', 'concert': '🎵',
+    'stadium': '🏟️', 'bowling': '🎳', 'restaurant': '🍽️', 'cafe': '☕', 'market': '🛒', 'mall': '🏬',
+    'shopping': '🛍️', 'bakery': '🥖', 'pizzeria': '🍕', 'bar': '🍺', 'pub': '🍺', 'airport': '✈️',
+    'station': '🚉', 'port': '🚢', 'default': '📍'
+}
+# Icons for keywords the table above lacks, matched after it
+EXTRA_PLACE_ICONS = {
+    'hotel': '🏨', 'entertainment': '🎭', 'historical': '🏛️', 'synagogue': '🕍', 'tower': '🗼',
+    'bridge': '🌉', 'square': '🏛️'
+}
+
+# Rules per attribute, first match wins: (field searched, keywords, value)
+DURATION_RULES = (
+    ('name', ('museum', 'gallery', 'palace', 'castle'), "3-4 hours"),
+    ('name', ('park', 'garden', 'beach'), "2-3 hours"),
+    ('name', ('temple', 'church', 'mosque'), "1-2 hours"),
+    ('kinds', ('historic', 'cultural'), "2-3 hours"),
+)
+BEST_TIME_RULES = (
+    ('name', ('beach', 'park', 'garden'), "morning"),
+    ('name', ('museum', 'gallery', 'palace'), "afternoon"),
+    ('name', ('temple', 'church', 'mosque'), "morning"),
+)
+COST_RULES = (
+    ('name', ('museum', 'gallery', 'palace', 'castle'), ("$10-20", "May require tickets")),
+)
+
+DEFAULT_DURATION = "1-2 hours"
+DEFAULT_BEST_TIME = "morning"
+DEFAULT_COST = ("Free", "None")
+
+@dataclass(frozen=True, slots=True)
+class PlaceTraits:
+    """Keyword-derived attributes of a place"""
+    visit_duration: str
+    best_time: str
+    estimated_cost: str
+    special_requirements: str
+    icon: str
+
+def _icon_rules() -> Tuple:
+    """PLACE_ICONS first, then EXTRA_PLACE_ICONS"""
+    icons = {keyword: icon for keyword, icon in PLACE_ICONS.items() if keyword != 'default'}
+    for keyword, icon in EXTRA_PLACE_ICONS.items():
+        icons.setdefault(keyword, icon)
+    return tuple(('any', (keyword,), icon) for keyword, icon in icons.items())
+
+ICON_RULES = _icon_rules()
+
+# (rules, default) per attribute, in the order classify_place reads them
+_ATTRIBUTES = (
+    (DURATION_RULES, DEFAULT_DURATION),
+    (BEST_TIME_RULES, DEFAULT_BEST_TIME),
+    (COST_RULES, DEFAULT_COST),
+    (ICON_RULES, PLACE_ICONS['default'])
+)
+
+def _flatten(rules) -> Tuple:
+    """(field, keyword, value) in rule order, so the first keyword found gives the first matching rule"""
+    return tuple((field, keyword, value) for field, keywords, value in rules for keyword in keywords)
+
+_FLAT_ATTRIBUTES = tuple((_flatten(rules), default) for rules, default in _ATTRIBUTES)
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_SIZE)
+def classify_place(name: str, kinds: str = "") -> PlaceTraits:
+    """All keyword-derived attributes of a place from its name and OpenTripMap kinds"""
+    name = (name or "").lower()
+    kinds = (kinds or "").lower()
+    # Keywords contain no newline, so a keyword is in "any" exactly when it is in either field
+    fields = {'name': name, 'kinds': kinds, 'any': f"{name}\n{kinds}"}
+    values = []
+    for rules, default in _FLAT_ATTRIBUTES:
+        values.append(next((value for field, keyword, value in rules if keyword in fields[field]), default))
+    visit_duration, best_time, (estimated_cost, special_requirements), icon = values
+    return PlaceTraits(visit_duration, best_time, estimated_cost, special_requirements, icon)
@@ -0,0 +1,189 @@
+"""
+Geographic clustering of places into compact zones, one per trip day
+
+Coordinates are projected onto a local flat plane in km around their mean latitude, which
+within the 100 km exploration radius distorts distances by well under 1%. Zones come from
+k-means (k-means++ seeding, Lloyd iterations) with a per-zone capacity, so that no day gets
+more places than it can hold (a count, or hours when places are weighted by visit time).
+Each iteration assigns (place, zone) pairs in order of distance while the zone has room,
+improves that assignment by moving places into zones with room and swapping pairs of places
+between zones while either brings them closer to their centroids, then moves every centroid
+to the mean of its places. A zone left empty is reseeded at the place farthest from its
+centroid. The best of KMEANS_RESTARTS seeded runs is kept, so the same places always give
+the same zones.
+"""
+
+import os
+import math
+import numpy as np
+from typing import List, Dict, Tuple
+from dotenv import load_dotenv
+from .geo import KM_PER_DEGREE
+from .distance_matrix import place_coordinates
+
+load_dotenv()
+
+KMEANS_MAX_ITERATIONS = int(os.getenv('KMEANS_MAX_ITERATIONS', 50))
+KMEANS_RESTARTS = int(os.getenv('KMEANS_RESTARTS', 4))
+KMEANS_SEED = 0
+IMPROVEMENT_EPSILON = 1e-9
+
+def project_km(coords: np.ndarray, reference_lat: float) -> np.ndarray:
+    """(n, 2) (x, y) km on a plane tangent at reference_lat, for (n, 2) (lat, lon) degrees"""
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    x = coords[:, 1] * KM_PER_DEGREE * math.cos(math.radians(reference_lat))
+    y = coords[:, 0] * KM_PER_DEGREE
+    return np.column_stack((x, y))
+
+def _squared_distances(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return ((points[:, np.newaxis, :] - centroids[np.newaxis, :, :]) ** 2).sum(axis=2)
+
+def _seed_centroids(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++: each further centroid is drawn with probability proportional to its squared distance"""
+    centroids = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        nearest = _squared_distances(points, np.array(centroids)).min(axis=1)
+        total = nearest.sum()
+        if total <= 0:
+            centroids.append(points[rng.integers(len(points))])
+        else:
+            centroids.append(points[rng.choice(len(points), p=nearest / total)])
+    return np.array(centroids)
+
+def _assign_with_capacity(points: np.ndarray, centroids: np.ndarray, weights: np.ndarray,
+                          capacity: float) -> np.ndarray:
+    """
+    Closest pairs first, skipping zones the point would overfill
+    A point that fits nowhere joins the zone with the most room left
+    """
+    distances = _squared_distances(points, centroids)
+    labels = np.full(len(points), -1)
+    loads = np.zeros(len(centroids))
+    for flat in np.argsort(distances, axis=None, kind='stable'):
+        point, zone = divmod(int(flat), len(centroids))
+        if labels[point] < 0 and loads[zone] + weights[point] <= capacity + IMPROVEMENT_EPSILON:
+            labels[point] = zone
+            loads[zone] += weights[point]
+    for point in np.flatnonzero(labels < 0):
+        zone = int(np.argmin(loads))
+        labels[point] = zone
+        loads[zone] += weights[point]
+    return labels
+
+def _improve_assignment(distances: np.ndarray, labels: np.ndarray, weights: np.ndarray,
+                        capacity: float, max_moves: int) -> np.ndarray:
+    """
+    Apply the best single move or pairwise swap until neither lowers the total squared distance
+    Moves and swaps must keep both zones within capacity, except swaps of equal weights
+    """
+    n, k = distances.shape
+    labels = labels.copy()
+    loads = np.bincount(labels, weights=weights, minlength=k)
+    rows = np.arange(n)
+    limit = capacity + IMPROVEMENT_EPSILON
+    same_weight = weights[:, np.newaxis] == weights[np.newaxis, :]
+    for _ in range(max_moves):
+        current = distances[rows, labels]
+        move_gain = current[:, np.newaxis] - distances
+        move_gain[loads[np.newaxis, :] + weights[:, np.newaxis] > limit] = 0.0
+
+        # Swapping i and j: each takes the other's zone
+        swap_gain = (current[:, np.newaxis] + current[np.newaxis, :]
+                     - distances[:, labels] - distances[:, labels].T)
+        shift = weights[np.newaxis, :] - weights[:, np.newaxis]
+        own_loads = loads[labels]
+        fits = (own_loads[:, np.newaxis] + shift <= limit) & (own_loads[np.newaxis, :] - shift <= limit)
+        swap_gain[~(fits | same_weight)] = 0.0
+
+        best_move = np.unravel_index(np.argmax(move_gain), move_gain.shape)
+        best_swap = np.unravel_index(np.argmax(swap_gain), swap_gain.shape)
+        if max(move_gain[best_move], swap_gain[best_swap]) <= IMPROVEMENT_EPSILON:
+            break
+        if move_gain[best_move] >= swap_gain[best_swap]:
+            point, zone = best_move
+            loads[labels[point]] -= weights[point]
+            loads[zone] += weights[point]
+            labels[point] = zone
+        else:
+            i, j = best_swap
+            loads[labels[i]] += weights[j] - weights[i]
+            loads[labels[j]] += weights[i] - weights[j]
+            labels[i], labels[j] = labels[j], labels[i]
+    return labels
+
+def _kmeans_run(points: np.ndarray, k: int, weights: np.ndarray, capacity: float, max_iterations: int,
+                rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, int]:
+    centroids = _seed_centroids(points, k, rng)
+    labels = None
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        new_labels = _assign_with_capacity(points, centroids, weights, capacity)
+        distances = _squared_distances(points, centroids)
+        new_labels = _improve_assignment(distances, new_labels, weights, capacity, len(points))
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for zone in range(k):
+            members = points[labels == zone]
+            if len(members):
+                centroids[zone] = members.mean(axis=0)
+            else:
+                spread = ((points - centroids[labels]) ** 2).sum(axis=1)
+                centroids[zone] = points[int(np.argmax(spread))]
+    return labels, centroids, iterations
+
+def kmeans(points: np.ndarray, k: int, weights: np.ndarray = None, capacity: float = None,
+           max_iterations: int = KMEANS_MAX_ITERATIONS, restarts: int = KMEANS_RESTARTS,
+           seed: int = KMEANS_SEED) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Capacity-constrained k-means over (n, 2) points
+    Each point has a weight (1 by default) and a zone's weights may not add up to more than
+    capacity. capacity is raised to at least an equal share of the total weight, which is also
+    its default. Returns (labels, centroids, iterations) of the run with the lowest total
+    squared distance.
+    """
+    k = max(1, min(k, len(points)))
+    weights = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=float)
+    share = math.ceil(len(points) / k) if (weights == 1).all() else weights.sum() / k
+    capacity = max(capacity or 0, share)
+    rng = np.random.default_rng(seed)
+    best, best_inertia = None, np.inf
+    for _ in range(max(1, restarts)):
+        labels, centroids, iterations = _kmeans_run(points, k, weights, capacity, max_iterations, rng)
+        inertia = float(((points - centroids[labels]) ** 2).sum())
+        if inertia < best_inertia - IMPROVEMENT_EPSILON:
+            best, best_inertia = (labels, centroids, iterations), inertia
+    return best
+
+def cluster_places(places: List[Dict], k: int, start_location: Tuple[float, float] = None,
+                   weights: List[float] = None, capacity: float = None) -> List[List[int]]:
+    """
+    Group places into at most k compact zones of place indices, in visiting order
+    weights (one per place, 1 by default) and capacity bound what each zone takes (see
+    kmeans). Zones are chained greedily by centroid, starting with the one nearest
+    start_location (the first place when it is not given); empty zones are dropped. Places
+    without coordinates join the last zone.
+    """
+    coords = place_coordinates(places)
+    located = np.flatnonzero(np.isfinite(coords).all(axis=1))
+    missing = np.flatnonzero(~np.isfinite(coords).all(axis=1)).tolist()
+    if not len(located):
+        return [missing] if missing else []
+
+    reference_lat = float(coords[located, 0].mean())
+    points = project_km(coords[located], reference_lat)
+    located_weights = None if weights is None else np.asarray(weights, dtype=float)[located]
+    labels, centroids, _ = kmeans(points, k, located_weights, capacity)
+
+    current = project_km(start_location, reference_lat)[0] if start_location else points[0]
+    remaining = list(range(len(centroids)))
+    zones = []
+    while remaining:
+        nearest = min(remaining, key=lambda zone: float(((centroids[zone] - current) ** 2).sum()))
+        remaining.remove(nearest)
+        current = centroids[nearest]
+        if (labels == nearest).any():
+            zones.append(located[labels == nearest].tolist())
+
+    zones[-1].extend(missing)
+    return zones
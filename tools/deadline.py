@@ -0,0 +1,52 @@
+import os
+import math
+import time
+from dotenv import load_dotenv
+from .http_client import DEFAULT_TIMEOUT
+
+load_dotenv()
+
+# Total seconds a plan may spend on upstream calls before falling back to estimates
+PLAN_LATENCY_BUDGET = float(os.getenv('PLAN_LATENCY_BUDGET', 12))
+# Seconds of the budget kept back for assembling and rendering the plan
+PLAN_DEGRADE_RESERVE = float(os.getenv('PLAN_DEGRADE_RESERVE', 1))
+
+class Deadline:
+    """
+    Latency budget for one planning request, started when it is created
+    Upstream calls ask how long they may still take; once the budget minus the reserve is
+    used up, callers skip pending requests and fall back to generic descriptions and
+    straight-line estimates. A budget of None never expires.
+    """
+
+    def __init__(self, budget: float = PLAN_LATENCY_BUDGET, reserve: float = PLAN_DEGRADE_RESERVE):
+        self.budget = budget
+        self.reserve = reserve
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Seconds since the deadline was created"""
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        """Seconds left for upstream work, never negative"""
+        if self.budget is None:
+            return math.inf
+        return max(0.0, self.budget - self.reserve - self.elapsed())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def wait_timeout(self) -> float:
+        """Seconds to wait for a stage running alongside the plan; None when the budget never expires"""
+        return None if self.budget is None else self.remaining()
+
+    def cap(self, seconds: float) -> float:
+        """Limit a stage timeout to the time that is left"""
+        return min(seconds, self.remaining())
+
+    def request_timeout(self, timeout: tuple = DEFAULT_TIMEOUT) -> tuple:
+        """(connect, read) timeout for an HTTP request that must finish before the deadline"""
+        remaining = max(self.remaining(), 0.001)
+        return tuple(min(part, remaining) for part in timeout)
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Callable
+from dotenv import load_dotenv
+from .telemetry import increment
+
+load_dotenv()
+
+DETAIL_CACHE_TTL = int(os.getenv('DETAIL_CACHE_TTL', 24 * 3600))
+DETAIL_CACHE_MAX_ENTRIES = int(os.getenv('DETAIL_CACHE_MAX_ENTRIES', 4096))
+
+class DetailCache:
+    """
+    In-memory cache of OpenTripMap detail records keyed on xid
+    Detail records do not depend on the trip, so plans for the same destination with another
+    duration or budget reuse them. Missing records (failed or non-200 requests) are not
+    cached, so the next plan asks again.
+    """
+
+    def __init__(self, ttl: int = DETAIL_CACHE_TTL, max_entries: int = DETAIL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, xid: str, fetch: Callable) -> Dict:
+        """Return the detail record for xid, calling fetch() on a miss; fetch may return None or raise"""
+        with self._lock:
+            entry = self._entries.get(xid)
+            if entry is not None and time.time() - entry['fetched_at'] <= self.ttl:
+                self._entries.move_to_end(xid)
+                self._stats["hits"] += 1
+                increment('cache_hits', cache='detail')
+                return entry['detail']
+            self._stats["misses"] += 1
+        increment('cache_misses', cache='detail')
+
+        detail = fetch()
+        if detail is not None:
+            with self._lock:
+                self._entries[xid] = {'detail': detail, 'fetched_at': time.time()}
+                self._entries.move_to_end(xid)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return detail
+
+    def clear(self) -> None:
+        """Drop all cached records and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the number of cached records"""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+detail_cache = DetailCache()
@@ -0,0 +1,32 @@
+import numpy as np
+from typing import List, Dict, Tuple
+from .models import place_coords
+from .geo import haversine_from, haversine_matrix
+
+def place_coordinates(places: List[Dict]) -> np.ndarray:
+    """Return an (n, 2) array of (lat, lon) per place, NaN where the place has no point"""
+    coords = np.full((len(places), 2), np.nan)
+    for i, place in enumerate(places):
+        location = place_coords(place)
+        if location is not None:
+            coords[i] = location
+    return coords
+
+def distances_from(origin: Tuple[float, float], coords: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one location to every row of coords; inf where coordinates are missing"""
+    distances = np.round(haversine_from(origin, coords), 1)
+    return np.where(np.isnan(distances), np.inf, distances)
+
+def distance_matrix(coords: np.ndarray) -> np.ndarray:
+    """
+    Pairwise great-circle distances in km for all rows of coords, computed in one pass
+    Uses the same haversine kernel and 0.1 km rounding as calculate_distance_between_places;
+    pairs involving a missing coordinate are inf
+    """
+    distances = np.round(haversine_matrix(coords), 1)
+    return np.where(np.isnan(distances), np.inf, distances)
+
+def places_distance_matrix(places: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Build the coordinate array and pairwise distance matrix for a list of places"""
+    coords = place_coordinates(places)
+    return coords, distance_matrix(coords)
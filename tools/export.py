@@ -2,28 +2,13 @@ import json
 import os
 from datetime import datetime
 from typing import Dict, List, Any
-
-PLACE_ICONS = {
-    'temple': '🛕', 'church': '⛪', 'mosque': '🕌', 'cathedral': '⛪', 'monastery': '🏛️', 'shrine': '🛕',
-    'museum': '🏛️', 'gallery': '🖼️', 'palace': '🏰', 'castle': '🏰', 'fort': '🏰', 'monument': '🗽', 'statue': '🗽',
-    'park': '🌳', 'garden': '🌺', 'beach': '🏖️', 'mountain': '⛰️', 'lake': '🏞️', 'river': '🏞️', 'forest': '🌲',
-    'sanctuary': '🐦', 'zoo': '🦁', 'wildlife': '🦁', 'bird': '🐦', 'nature': '🌿',
-    'theater': '🎭', 'cinema': '🎬', 'amusement': '🎡', 'aquarium': '🐠', 'circus': '🎪', 'concert': '🎵',
-    'stadium': '🏟️', 'bowling': '🎳', 'restaurant': '🍽️', 'cafe': '☕', 'market': '🛒', 'mall': '🏬',
-    'shopping': '🛍️', 'bakery': '🥖', 'pizzeria': '🍕', 'bar': '🍺', 'pub': '🍺', 'airport': '✈️',
-    'station': '🚉', 'port': '🚢', 'default': '📍'
-}
+from .telemetry import span
+from .models import to_plain
+from .classifier import classify_place
 
 def get_place_icon(place_name: str, kinds: str = "") -> str:
     """Get appropriate emoji icon for a place based on name and types"""
-    name_lower = place_name.lower()
-    kinds_lower = kinds.lower()
-    
-    for keyword, icon in PLACE_ICONS.items():
-        if keyword in name_lower or keyword in kinds_lower:
-            return icon
-    
-    return PLACE_ICONS['default']
+    return classify_place(place_name, kinds).icon
 
 def generate_mobile_friendly_trip(trip_data: Dict[str, Any]) -> str:
     """Generate a mobile-friendly text version of the trip plan"""
@@ -250,13 +235,16 @@ def export_trip_plan(trip_data: Dict[str, Any], export_format: str = "mobile") -
     export_options = {
         "mobile": generate_mobile_friendly_trip,
         "html": generate_simple_html,
-        "json": lambda data: json.dumps(data, indent=2)
+        "json": lambda data: json.dumps(to_plain(data), indent=2),
+        # One compact line per plan, for appending to batch output files
+        "jsonl": lambda data: json.dumps(to_plain(data), ensure_ascii=False, default=str) + "\n"
     }
     
     if export_format not in export_options:
         export_format = "mobile"
     
-    content = export_options[export_format](trip_data)
+    with span("export", format=export_format):
+        content = export_options[export_format](trip_data)
     
     destination = trip_data.get('destination', 'trip')
     timestamp = datetime.now().strftime('%Y%m%d_%H%M')
@@ -267,6 +255,9 @@ def export_trip_plan(trip_data: Dict[str, Any], export_format: str = "mobile") -
     elif export_format == "html":
         filename = f"trip_plan_{destination}_{timestamp}.html"
         mime_type = "text/html"
+    elif export_format == "jsonl":
+        filename = f"trip_plan_{destination}_{timestamp}.jsonl"
+        mime_type = "application/x-ndjson"
     else:
         filename = f"trip_plan_{destination}_{timestamp}.json"
         mime_type = "application/json"
@@ -0,0 +1,74 @@
+"""
+Distance kernels shared by every distance computation in the planner
+
+All distances are great-circle (haversine) distances on a sphere of mean Earth radius. Against
+the WGS84 ellipsoid the error is at most 0.5% (typically under 0.3%), far below the difference
+between road and straight-line distance. The "degrees × 111" formula they replace ignored the
+shrinking of longitude degrees away from the equator and overestimated east-west distances by
+about 50% at the latitude of Paris and several times over near the poles.
+
+The vectorized kernels accept (n, 2) arrays of (lat, lon) in degrees; rows containing NaN
+produce NaN.
+
+Up to SHORT_DISTANCE_KM, haversine_km and within_radius use the equirectangular projection at
+the midpoint latitude, which agrees with haversine to about 1e-5 at that range and needs one
+cosine instead of four trigonometric calls. Single pairs stay within about 0.1 µs of the old
+formula and radius filters are faster than it from a few hundred rows up. For a few dozen rows
+within_radius and haversine_from still cost a few µs more, which is NumPy call overhead and
+small next to the upstream request each of them follows.
+"""
+
+import math
+import numpy as np
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+# Length of one degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Distances up to this use the equirectangular fast path
+SHORT_DISTANCE_KM = 50.0
+# Turns a sum of two latitudes in degrees into their mean in radians
+_MEAN_LATITUDE_RADIANS = math.pi / 360
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km between two points given in degrees"""
+    distance = KM_PER_DEGREE * math.hypot(
+        lat2 - lat1, (lon2 - lon1) * math.cos((lat1 + lat2) * _MEAN_LATITUDE_RADIANS)
+    )
+    if distance <= SHORT_DISTANCE_KM:
+        return distance
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, h)))
+
+def haversine_from(origin: Tuple[float, float], coords: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to every row of coords"""
+    coords = np.radians(np.asarray(coords, dtype=float).reshape(-1, 2))
+    lat0, lon0 = math.radians(origin[0]), math.radians(origin[1])
+    lat, lon = coords[:, 0], coords[:, 1]
+    h = np.sin((lat - lat0) / 2) ** 2 + math.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+def haversine_matrix(coords: np.ndarray) -> np.ndarray:
+    """
+    Pairwise great-circle distances in km between all rows of coords
+    Works on unit vectors: half the squared chord between two of them is the haversine term,
+    so the whole matrix is one matrix product plus an arcsine per pair
+    """
+    coords = np.radians(np.asarray(coords, dtype=float).reshape(-1, 2))
+    cos_lat = np.cos(coords[:, 0])
+    vectors = np.column_stack((cos_lat * np.cos(coords[:, 1]), cos_lat * np.sin(coords[:, 1]), np.sin(coords[:, 0])))
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip((1 - vectors @ vectors.T) / 2, 0.0, 1.0)))
+    # Exact zeros on the diagonal rather than rounding noise
+    np.fill_diagonal(distances, np.where(np.isnan(distances.diagonal()), np.nan, 0.0))
+    return distances
+
+def within_radius(origin: Tuple[float, float], coords: np.ndarray, radius_km: float) -> np.ndarray:
+    """Boolean mask of the rows of coords within radius_km of origin; False for missing coordinates"""
+    if radius_km > SHORT_DISTANCE_KM:
+        return haversine_from(origin, coords) <= radius_km
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    dlat = coords[:, 0] - origin[0]
+    dlon = (coords[:, 1] - origin[1]) * np.cos(np.radians(origin[0] + dlat / 2))
+    return dlat * dlat + dlon * dlon <= (radius_km / KM_PER_DEGREE) ** 2
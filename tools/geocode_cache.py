@@ -0,0 +1,123 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dotenv import load_dotenv
+from .telemetry import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GEOCODE_CACHE_PATH = os.getenv('GEOCODE_CACHE_PATH', os.path.join(_ROOT_DIR, '.cache', 'geocode.sqlite3'))
+GEOCODE_CACHE_TTL = int(os.getenv('GEOCODE_CACHE_TTL', 30 * 24 * 3600))  # 30 days
+GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv('GEOCODE_CACHE_MAX_ENTRIES', 10000))
+
+
+def normalize_query(place_name: str) -> str:
+    """Normalize a geocode query so trivially different spellings share a cache key"""
+    text = unicodedata.normalize('NFKD', place_name or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+class GeocodeCache:
+    """SQLite-backed geocode cache with TTL expiry, LRU eviction and hit/miss counters"""
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH, ttl: int = GEOCODE_CACHE_TTL,
+                 max_entries: int = GEOCODE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale_hits": 0, "evictions": 0}
+        self._conn = self._connect(path)
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        try:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            return self._init_schema(sqlite3.connect(path, check_same_thread=False))
+        except (sqlite3.Error, OSError) as e:
+            # Read-only or missing disk: keep caching for the lifetime of the process
+            logger.warning("Geocode cache unavailable, using in-memory cache", extra={'path': path, 'error': str(e)})
+            return self._init_schema(sqlite3.connect(':memory:', check_same_thread=False))
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "key TEXT PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS geocode_last_access ON geocode (last_access)")
+        conn.commit()
+        return conn
+
+    def get(self, place_name: str, allow_stale: bool = False) -> tuple:
+        """Return cached (lat, lon) for a query, or None on a miss or expired entry"""
+        key = normalize_query(place_name)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lon, created_at FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            lat, lon, created_at = row
+            expired = now - created_at > self.ttl
+            if expired and not allow_stale:
+                self._stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE geocode SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._stats["stale_hits" if expired else "hits"] += 1
+            return (lat, lon)
+
+    def set(self, place_name: str, coords: tuple) -> None:
+        """Store coordinates for a query and evict least recently used entries over the limit"""
+        key = normalize_query(place_name)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (key, lat, lon, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, coords[0], coords[1], now, now)
+            )
+            size = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+            overflow = size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM geocode WHERE key IN "
+                    "(SELECT key FROM geocode ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._stats["evictions"] += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all cached entries and reset counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM geocode")
+            self._conn.commit()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["stale_hits"]
+            hit_rate = (self._stats["hits"] + self._stats["stale_hits"]) / lookups if lookups else 0.0
+            return {**self._stats, "size": size, "hit_rate": round(hit_rate, 3)}
+
+
+geocode_cache = GeocodeCache()
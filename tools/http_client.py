@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+from .telemetry import increment
+
+load_dotenv()
+
+# (connect, read) timeouts in seconds applied when a caller does not pass one
+DEFAULT_TIMEOUT = (
+    float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05)),
+    float(os.getenv('HTTP_READ_TIMEOUT', 15))
+)
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 10))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+LATENCY_SAMPLES = 200
+
+_attempts = threading.local()
+
+class _SessionRetry(Retry):
+    """
+    Retry policy of the shared session
+    Requests sent with retries=False stop after their first attempt: a failure is final and
+    no backoff or Retry-After wait is slept
+    """
+
+    def increment(self, *args, **kwargs):
+        if getattr(_attempts, 'single', False):
+            return Retry.increment(self.new(total=0), *args, **kwargs)
+        return super().increment(*args, **kwargs)
+
+def _build_session() -> requests.Session:
+    """Create a session with keep-alive pools per host and retry with backoff on 429/5xx"""
+    retry = _SessionRetry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'POST']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+_session = _build_session()
+_stats_lock = threading.Lock()
+_host_stats = {}
+
+def _record(host: str, elapsed_ms: float, failed: bool) -> None:
+    with _stats_lock:
+        stats = _host_stats.get(host)
+        if stats is None:
+            stats = _host_stats[host] = {
+                'requests': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'samples': deque(maxlen=LATENCY_SAMPLES)
+            }
+        stats['requests'] += 1
+        stats['errors'] += int(failed)
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['samples'].append(elapsed_ms)
+
+def request(method: str, url: str, retries: bool = True, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session, applying the default timeout
+    With retries=False the request is attempted once, so it takes no longer than its timeout;
+    callers working to a deadline use this and handle the failure themselves
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    failed = True
+    _attempts.single = not retries
+    try:
+        response = _session.request(method, url, **kwargs)
+        failed = response.status_code >= 400
+        return response
+    finally:
+        _attempts.single = False
+        _record(host, (time.perf_counter() - start) * 1000, failed)
+        increment('upstream_calls', host=host, outcome='error' if failed else 'ok')
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared session"""
+    return request('GET', url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    """POST through the shared session"""
+    return request('POST', url, **kwargs)
+
+def mount_adapter(prefix: str, adapter: requests.adapters.BaseAdapter) -> requests.adapters.BaseAdapter:
+    """
+    Route every shared-session request whose URL starts with prefix through adapter
+    Returns the adapter previously used for that prefix so callers (benchmarks, replay
+    transports) can restore it afterwards
+    """
+    previous = _session.get_adapter(prefix)
+    _session.mount(prefix, adapter)
+    return previous
+
+def get_host_stats() -> dict:
+    """Return request counts, error counts and latency percentiles (ms) per upstream host"""
+    summary = {}
+    with _stats_lock:
+        for host, stats in _host_stats.items():
+            samples = sorted(stats['samples'])
+            summary[host] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'avg_ms': round(stats['total_ms'] / stats['requests'], 1),
+                'p50_ms': round(samples[len(samples) // 2], 1),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+                'max_ms': round(stats['max_ms'], 1)
+            }
+    return summary
+
+def reset_host_stats() -> None:
+    """Clear all collected latency stats"""
+    with _stats_lock:
+        _host_stats.clear()
@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+class _MappingAccess:
+    """
+    Key access (place['name'], place.get('kinds', '')) for code written against the plain dicts
+    that used to flow through the pipeline. Keys are the dataclass slots plus 'point'; unset
+    optional fields behave like missing keys.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'point':
+            return self.point
+        if key not in self.__slots__:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+@dataclass(slots=True)
+class RouteLeg(_MappingAccess):
+    """Travel from one itinerary stop to the next"""
+    distance_km: float
+    travel_time_minutes: float
+    travel_time_formatted: str
+    route_steps: List = field(default_factory=list)
+    next_place: str = ""
+    # Straight-line estimate used because the latency budget ran out
+    degraded: bool = False
+
+    def to_dict(self) -> Dict:
+        leg = {
+            'distance_km': self.distance_km,
+            'travel_time_minutes': self.travel_time_minutes,
+            'travel_time_formatted': self.travel_time_formatted,
+            'route_steps': self.route_steps,
+            'next_place': self.next_place
+        }
+        if self.degraded:
+            leg['degraded'] = True
+        return leg
+
+@dataclass(slots=True)
+class Place(_MappingAccess):
+    """
+    A candidate place, enriched in place as it moves through selection, detail lookup,
+    route optimization and itinerary building
+    """
+    name: str
+    coords: Optional[Tuple[float, float]] = None
+    xid: Optional[str] = None
+    kinds: str = ""
+    visit_duration: str = "2-3 hours"
+    best_time: str = "morning"
+    description: str = ""
+    rating: float = 0
+    is_popular: bool = False
+    distance_from_center: float = 0
+    # Set once the place is on an itinerary
+    special_requirements: str = "None"
+    estimated_cost: Optional[str] = None
+    route_info: Optional[Dict] = None
+    route_to_next: Optional[RouteLeg] = None
+    # Detail lookup was cut off by the latency budget
+    degraded: bool = False
+
+    @property
+    def point(self) -> Dict:
+        """Coordinates in the OpenTripMap {'lat', 'lon'} shape; {} when unknown"""
+        if self.coords is None:
+            return {}
+        return {'lat': self.coords[0], 'lon': self.coords[1]}
+
+    def to_dict(self) -> Dict:
+        place = {'name': self.name}
+        if self.xid is not None:
+            place['xid'] = self.xid
+        place.update({
+            'point': self.point,
+            'kinds': self.kinds,
+            'visit_duration': self.visit_duration,
+            'best_time': self.best_time,
+            'description': self.description,
+            'rating': self.rating,
+            'is_popular': self.is_popular,
+            'distance_from_center': self.distance_from_center,
+            'special_requirements': self.special_requirements
+        })
+        if self.estimated_cost is not None:
+            place['estimated_cost'] = self.estimated_cost
+        if self.route_info is not None:
+            place['route_info'] = self.route_info
+        place['route_to_next'] = self.route_to_next.to_dict() if self.route_to_next is not None else {}
+        if self.degraded:
+            place['degraded'] = True
+        return place
+
+def point_coords(point: Dict) -> Optional[Tuple[float, float]]:
+    """(lat, lon) from an OpenTripMap point dict, or None when it is incomplete"""
+    if point and 'lat' in point and 'lon' in point:
+        return (point['lat'], point['lon'])
+    return None
+
+def place_coords(place) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a Place or a raw place dict, or None when it has no coordinates"""
+    if isinstance(place, Place):
+        return place.coords
+    return point_coords(place.get('point'))
+
+def to_plain(value: Any) -> Any:
+    """Recursively turn Place/RouteLeg objects into dicts, for JSON export and the UI boundary"""
+    if isinstance(value, (Place, RouteLeg)):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
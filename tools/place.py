@@ -1,11 +1,20 @@
-import requests
 import os
 import re
+import math
+from collections import defaultdict
 from difflib import SequenceMatcher
 from dotenv import load_dotenv
+from .poi_cache import get_places_in_radius
+from .models import Place, point_coords
+from .geo import haversine_km
+from .classifier import classify_place
+from .telemetry import get_logger
+from .deadline import Deadline
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 OTM_KEY = os.getenv('OPEN_TRIPMAP_API')
 
 def calculate_dynamic_radius(duration_days: int) -> int:
@@ -30,33 +39,11 @@ def calculate_dynamic_radius(duration_days: int) -> int:
 
 def get_visit_duration(place_name: str, place_type: str) -> str:
     """Determine visit duration based on place type"""
-    place_name_lower = place_name.lower()
-    place_type_lower = place_type.lower()
-    
-    if any(word in place_name_lower for word in ['museum', 'gallery', 'palace', 'castle']):
-        return "3-4 hours"
-    elif any(word in place_name_lower for word in ['park', 'garden', 'beach']):
-        return "2-3 hours"
-    elif any(word in place_name_lower for word in ['temple', 'church', 'mosque']):
-        return "1-2 hours"
-    elif any(word in place_type_lower for word in ['historic', 'cultural']):
-        return "2-3 hours"
-    else:
-        return "1-2 hours"
+    return classify_place(place_name, place_type).visit_duration
 
 def get_best_time(place_name: str, place_type: str) -> str:
     """Determine best time to visit based on place type"""
-    place_name_lower = place_name.lower()
-    place_type_lower = place_type.lower()
-    
-    if any(word in place_name_lower for word in ['beach', 'park', 'garden']):
-        return "morning"
-    elif any(word in place_name_lower for word in ['museum', 'gallery', 'palace']):
-        return "afternoon"
-    elif any(word in place_name_lower for word in ['temple', 'church', 'mosque']):
-        return "morning"
-    else:
-        return "morning"
+    return classify_place(place_name, place_type).best_time
 
 def normalize_place_name(name: str) -> str:
     """Normalize place name for better comparison"""
@@ -100,10 +87,123 @@ def is_duplicate_place(new_place_name: str, existing_places: list) -> bool:
             return True
     return False
 
-def get_places_with_dynamic_radius(destination: str, coords: tuple, duration_days: int, max_places: int = 30) -> list:
+BOUND_TOLERANCE = 1e-6
+
+class PlaceDeduplicator:
+    """
+    Incremental duplicate detection with the same result as is_duplicate_place
+    Each name is normalized once and indexed by its character bigrams. A new name is only
+    compared against accepted names that can possibly match:
+    - equality is a set lookup
+    - an accepted name inside the new one is found by looking up the new name's substrings
+    - the new name inside an accepted one must share all its bigrams, so only the posting
+      list of its rarest bigram is scanned
+    - a SequenceMatcher ratio >= threshold needs a length within [t/(2-t), (2-t)/t] of the new
+      name and, for t > 0.75, a minimum number of shared bigrams; probing enough of the new
+      name's rarest bigrams is guaranteed to reach every such name
+    Thresholds of 0.75 or lower fall back to comparing every name in the length window.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.8):
+        self.similarity_threshold = similarity_threshold
+        self._names = []
+        self._bigrams = []
+        self._matchers = []
+        self._exact = set()
+        self._by_length = defaultdict(list)
+        self._postings = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def is_duplicate(self, place_name: str) -> bool:
+        """Check a raw place name against every accepted name"""
+        return self._matches(normalize_place_name(place_name))
+
+    def add(self, place_name: str) -> bool:
+        """Accept a place name unless it duplicates an accepted one; returns True when accepted"""
+        norm = normalize_place_name(place_name)
+        if self._matches(norm):
+            return False
+        
+        index = len(self._names)
+        bigrams = frozenset(norm[i:i + 2] for i in range(len(norm) - 1))
+        self._names.append(norm)
+        self._bigrams.append(bigrams)
+        # SequenceMatcher caches its analysis of the second sequence, so keep one per accepted name
+        self._matchers.append(SequenceMatcher(None, '', norm))
+        self._exact.add(norm)
+        self._by_length[len(norm)].append(index)
+        for gram in bigrams:
+            self._postings[gram].append(index)
+        return True
+
+    def _matches(self, norm: str) -> bool:
+        if not self._names:
+            return False
+        if norm in self._exact:
+            return True
+        
+        # An accepted name contained in the new one
+        length = len(norm)
+        for size in self._by_length:
+            if size < length and any(norm[start:start + size] in self._exact for start in range(length - size + 1)):
+                return True
+        
+        # The new name contained in an accepted one
+        grams = [norm[i:i + 2] for i in range(length - 1)]
+        if grams:
+            rarest = min(grams, key=lambda gram: len(self._postings.get(gram, ())))
+            containing = self._postings.get(rarest, ())
+        else:
+            containing = range(len(self._names))
+        if any(norm in self._names[index] for index in containing):
+            return True
+        
+        threshold = self.similarity_threshold
+        candidates, needed = self._ratio_candidates(norm, grams)
+        for index in candidates:
+            if needed > 0 and len(self._names[index]) >= 3:
+                if sum(gram in self._bigrams[index] for gram in grams) < needed:
+                    continue
+            matcher = self._matchers[index]
+            matcher.set_seq1(norm)
+            if matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+                return True
+        return False
+
+    def _ratio_candidates(self, norm: str, grams: list) -> tuple:
+        """Accepted names that may reach the ratio threshold, and the shared bigram positions they need"""
+        threshold = self.similarity_threshold
+        length = len(norm)
+        # Bounds are widened by a tiny tolerance so float rounding never excludes a match
+        min_matched = threshold * length / (2 - threshold)
+        min_length = min_matched - BOUND_TOLERANCE
+        max_length = length * (2 - threshold) / threshold + BOUND_TOLERANCE
+        in_window = lambda index: min_length <= len(self._names[index]) <= max_length
+        
+        # Shared bigram positions needed for the threshold: matched characters M >= t*l/(2-t)
+        # fall into at most 1 + M(1-t)*2/t blocks, each block of k characters sharing k-1 bigrams
+        needed = 0
+        if threshold > 0.75:
+            needed = math.ceil(min_matched * (3 * threshold - 2) / threshold - 1 - BOUND_TOLERANCE)
+        
+        if length < 3 or needed < 1:
+            return [index for size, indices in self._by_length.items()
+                    if min_length <= size <= max_length for index in indices], 0
+        
+        # Names under 3 characters can reach the threshold without sharing a bigram
+        candidates = {index for size in (0, 1, 2) for index in self._by_length.get(size, ()) if in_window(index)}
+        probe = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))[:len(grams) - needed + 1]
+        for gram in set(probe):
+            candidates.update(index for index in self._postings.get(gram, ()) if in_window(index))
+        return sorted(candidates), needed
+
+def get_places_with_dynamic_radius(destination: str, coords: tuple, duration_days: int, max_places: int = 30,
+                                   deadline: Deadline = None) -> list:
     """
     Get places using dynamic radius based on trip duration
-    Longer trips get larger exploration areas
+    Longer trips get larger exploration areas. A Deadline bounds the radius query
     """
     try:
         lat, lon = coords
@@ -112,12 +212,11 @@ def get_places_with_dynamic_radius(destination: str, coords: tuple, duration_day
         # Calculate radius in km for logging
         radius_km = dynamic_radius / 1000
         
-        print(f"🔍 Exploring {destination} with {radius_km:.1f}km radius for {duration_days} day trip")
+        logger.info("Exploring destination", extra={'destination': destination, 'radius_km': round(radius_km, 1), 'days': duration_days})
         
-        places_url = f"https://api.opentripmap.com/0.1/en/places/radius?radius={dynamic_radius}&lon={lon}&lat={lat}&rate=1&format=json&apikey={OTM_KEY}"
-        
-        places_data = requests.get(places_url).json()
+        places_data = get_places_in_radius((lat, lon), dynamic_radius, deadline)
         places = []
+        deduplicator = PlaceDeduplicator()
         
         # Get more places initially to have better selection
         initial_places = min(len(places_data), max_places * 2)
@@ -125,43 +224,40 @@ def get_places_with_dynamic_radius(destination: str, coords: tuple, duration_day
         for place in places_data[:initial_places]:
             place_name = place.get('name', 'Unknown')
             
-            if is_duplicate_place(place_name, places):
+            if not deduplicator.add(place_name):
                 continue
             
-            place_details = {
-                "name": place_name,
-                "point": place.get('point', {}),
-                "kinds": place.get('kinds', ''),
-                "visit_duration": get_visit_duration(place_name, place.get('kinds', '')),
-                "best_time": get_best_time(place_name, place.get('kinds', '')),
-                "distance_from_center": calculate_distance_from_center(coords, place.get('point', {}))
-            }
-            places.append(place_details)
+            kinds = place.get('kinds', '')
+            point = place.get('point', {})
+            traits = classify_place(place_name, kinds)
+            places.append(Place(
+                name=place_name,
+                coords=point_coords(point),
+                xid=place.get('xid'),
+                kinds=kinds,
+                visit_duration=traits.visit_duration,
+                best_time=traits.best_time,
+                distance_from_center=calculate_distance_from_center(coords, point)
+            ))
         
         # Sort by distance and rating to get the best places within the radius
-        places.sort(key=lambda x: (x.get('distance_from_center', 0), -x.get('rate', 0)))
+        places.sort(key=lambda x: (x.distance_from_center, -x.rating))
         
-        print(f"📍 Found {len(places)} unique places within {radius_km:.1f}km radius")
+        logger.info("Found unique places", extra={'destination': destination, 'places': len(places), 'radius_km': round(radius_km, 1)})
         return places[:max_places]
         
     except Exception as e:
-        print(f"Error getting places for {destination}: {e}")
+        logger.error("Error getting places", extra={'destination': destination, 'error': str(e)})
         return []
 
 def calculate_distance_from_center(center_coords: tuple, place_point: dict) -> float:
     """Calculate distance from center coordinates to a place"""
     try:
-        import math
-        
         center_lat, center_lon = center_coords
         place_lat = place_point.get('lat', center_lat)
         place_lon = place_point.get('lon', center_lon)
         
-        lat_diff = place_lat - center_lat
-        lon_diff = place_lon - center_lon
-        distance_km = math.sqrt(lat_diff**2 + lon_diff**2) * 111
-        
-        return round(distance_km, 1)
+        return round(haversine_km(center_lat, center_lon, place_lat, place_lon), 1)
     except Exception:
         return 0.0
 
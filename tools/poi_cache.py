@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Dict, Tuple, Callable
+from dotenv import load_dotenv
+from . import http_client
+from .distance_matrix import place_coordinates
+from .geo import haversine_km, within_radius
+from .telemetry import span, increment
+from .deadline import Deadline
+
+load_dotenv()
+
+OTM_KEY = os.getenv('OPEN_TRIPMAP_API')
+
+POI_CACHE_TTL = int(os.getenv('POI_CACHE_TTL', 24 * 3600))
+POI_CACHE_MAX_ENTRIES = int(os.getenv('POI_CACHE_MAX_ENTRIES', 256))
+# Centers are rounded to this many decimal degrees (2 ≈ 1 km) to form cache keys
+POI_CENTER_PRECISION = int(os.getenv('POI_CENTER_PRECISION', 2))
+# OpenTripMap returns at most this many objects; a full response may be truncated
+OTM_RESULT_LIMIT = 500
+
+def fetch_places_in_radius(center: Tuple[float, float], radius_m: float, deadline: Deadline = None) -> List[Dict]:
+    """
+    Query the OpenTripMap radius endpoint directly
+    With a Deadline the query is attempted once with only the time that is left, and not at
+    all once it expired
+    """
+    lat, lon = center
+    places_url = f"https://api.opentripmap.com/0.1/en/places/radius?radius={radius_m}&lon={lon}&lat={lat}&rate=1&format=json&apikey={OTM_KEY}"
+    if deadline is not None and deadline.expired:
+        raise TimeoutError("Latency budget exhausted before the OpenTripMap radius query")
+    with span("otm.radius", radius_m=radius_m) as attributes:
+        if deadline is None:
+            response = http_client.get(places_url)
+        else:
+            # A single attempt, as retries and their backoff would run past the deadline
+            response = http_client.get(places_url, timeout=deadline.request_timeout(), retries=False)
+        if response.status_code != 200:
+            raise RuntimeError(f"OpenTripMap radius query failed with status {response.status_code}")
+        places = response.json()
+        attributes['places'] = len(places)
+        return places
+
+class PoiCache:
+    """
+    In-memory cache of OpenTripMap radius queries keyed on a quantized center and radius
+    A query is answered by any fresh entry for the same center cell whose radius covers it:
+    an equal radius returns the cached response, a larger complete one is filtered down.
+    Concurrent misses for the same area share one upstream request.
+    """
+
+    def __init__(self, fetch: Callable = fetch_places_in_radius, ttl: int = POI_CACHE_TTL,
+                 max_entries: int = POI_CACHE_MAX_ENTRIES, precision: int = POI_CENTER_PRECISION):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.precision = precision
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._stats = {"hits": 0, "filtered_hits": 0, "shared_requests": 0, "misses": 0}
+
+    def _cell(self, center: Tuple[float, float]) -> Tuple[float, float]:
+        return (round(center[0], self.precision), round(center[1], self.precision))
+
+    def _find_entry(self, center: Tuple[float, float], cell: Tuple[float, float], radius_m: float) -> Dict:
+        """Smallest fresh entry for the cell that can answer a query of radius_m around center"""
+        now = time.time()
+        best = None
+        for key in [key for key in self._entries if key[:2] == cell]:
+            entry = self._entries[key]
+            if now - entry['fetched_at'] > self.ttl:
+                del self._entries[key]
+                continue
+            if entry['radius_m'] != radius_m:
+                # A larger response only answers the query if it was not truncated and its
+                # circle still contains the whole query circle around the exact center
+                offset_m = haversine_km(*center, *entry['center']) * 1000
+                if not entry['complete'] or entry['radius_m'] < radius_m + offset_m:
+                    continue
+            if best is None or entry['radius_m'] < best['radius_m']:
+                best = entry
+        if best is not None:
+            self._entries.move_to_end(best['key'])
+        return best
+
+    def _filter(self, places: List[Dict], center: Tuple[float, float], radius_m: float) -> List[Dict]:
+        inside = within_radius(center, place_coordinates(places), radius_m / 1000)
+        return [place for place, keep in zip(places, inside) if keep]
+
+    def get_places(self, center: Tuple[float, float], radius_m: float, deadline: Deadline = None) -> List[Dict]:
+        """
+        Return OpenTripMap places within radius_m of center, from cache when possible
+        A miss fetches under the given Deadline (see fetch_places_in_radius)
+        """
+        cell = self._cell(center)
+        key = cell + (radius_m,)
+        with self._lock:
+            entry = self._find_entry(center, cell, radius_m)
+            if entry is not None:
+                if entry['radius_m'] == radius_m:
+                    self._stats["hits"] += 1
+                    increment('cache_hits', cache='poi')
+                    return list(entry['places'])
+                self._stats["filtered_hits"] += 1
+                increment('cache_hits', cache='poi', filtered=True)
+                places = entry['places']
+            else:
+                future = self._inflight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._inflight[key] = Future()
+                    self._stats["misses"] += 1
+                    increment('cache_misses', cache='poi')
+                else:
+                    self._stats["shared_requests"] += 1
+
+        if entry is not None:
+            return self._filter(places, center, radius_m)
+
+        if not owner:
+            return list(future.result())
+
+        try:
+            places = self.fetch(center, radius_m, deadline)
+            with self._lock:
+                self._entries[key] = {
+                    'key': key,
+                    'center': tuple(center),
+                    'radius_m': radius_m,
+                    'places': places,
+                    'complete': len(places) < OTM_RESULT_LIMIT,
+                    'fetched_at': time.time()
+                }
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            future.set_result(places)
+            return list(places)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached responses and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the number of cached responses"""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+poi_cache = PoiCache()
+
+def get_places_in_radius(center: Tuple[float, float], radius_m: float, deadline: Deadline = None) -> List[Dict]:
+    """Cached, deduplicated OpenTripMap radius query"""
+    return poi_cache.get_places(center, radius_m, deadline)
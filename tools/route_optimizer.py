@@ -0,0 +1,197 @@
+"""
+Route optimizer for open itineraries that begin at a fixed start location
+
+Routes are index orders over a distance matrix. The cost of a route is the distance from
+the start location to its first place plus the distance between consecutive places; the
+route does not return to the start. Construction uses nearest neighbour, which is then
+improved with 2-opt and Or-opt passes until no move helps or the time budget runs out.
+"""
+
+import os
+import time
+import numpy as np
+from typing import List, Dict, Tuple, Callable
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TIME_BUDGET_MS = float(os.getenv('ROUTE_OPTIMIZER_BUDGET_MS', 200))
+OR_OPT_SEGMENT_LENGTHS = (1, 2, 3)
+IMPROVEMENT_EPSILON = 1e-9
+
+def route_length(order: List[int], matrix: np.ndarray, start_distances: np.ndarray) -> float:
+    """Total distance of an open route including the leg from the start location"""
+    if not order:
+        return 0.0
+    nodes = np.asarray(order)
+    return float(start_distances[nodes[0]] + matrix[nodes[:-1], nodes[1:]].sum())
+
+def nearest_neighbour(matrix: np.ndarray, start_distances: np.ndarray, first: int = None) -> List[int]:
+    """Greedy construction: repeatedly visit the closest unvisited place"""
+    n = len(start_distances)
+    unvisited = np.ones(n, dtype=bool)
+    order = []
+    current = start_distances
+
+    if first is not None:
+        unvisited[first] = False
+        order.append(first)
+        current = matrix[first]
+
+    while len(order) < n:
+        nearest = int(np.argmin(np.where(unvisited, current, np.inf)))
+        unvisited[nearest] = False
+        order.append(nearest)
+        current = matrix[nearest]
+
+    return order
+
+def _edge_costs(nodes: np.ndarray, matrix: np.ndarray, start_distances: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Cost into each position (from its predecessor or the start) and out of it (0 at the end)"""
+    cost_in = np.empty(len(nodes))
+    cost_in[0] = start_distances[nodes[0]]
+    cost_in[1:] = matrix[nodes[:-1], nodes[1:]]
+    cost_out = np.append(cost_in[1:], 0.0)
+    return cost_in, cost_out
+
+def two_opt(order: List[int], matrix: np.ndarray, start_distances: np.ndarray, deadline: float) -> Tuple[List[int], int]:
+    """Reverse route segments while doing so shortens the route; returns (order, moves applied)"""
+    nodes = np.asarray(order)
+    n = len(nodes)
+    moves = 0
+    improved = True
+
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(n - 1):
+            _, cost_out = _edge_costs(nodes, matrix, start_distances)
+            from_prev = start_distances if i == 0 else matrix[nodes[i - 1]]
+            removed_in = from_prev[nodes[i]]
+
+            # Reversing nodes[i..j] replaces (prev, nodes[i]) + (nodes[j], next) with
+            # (prev, nodes[j]) + (nodes[i], next), for every j > i at once
+            js = np.arange(i + 1, n)
+            to_next = np.append(matrix[nodes[i], nodes[js[:-1] + 1]], 0.0)
+            delta = from_prev[nodes[js]] + to_next - removed_in - cost_out[js]
+
+            best = int(np.argmin(delta))
+            if delta[best] < -IMPROVEMENT_EPSILON:
+                j = js[best]
+                nodes[i:j + 1] = nodes[i:j + 1][::-1].copy()
+                moves += 1
+                improved = True
+
+            if time.perf_counter() >= deadline:
+                break
+
+    return nodes.tolist(), moves
+
+def or_opt(order: List[int], matrix: np.ndarray, start_distances: np.ndarray, deadline: float) -> Tuple[List[int], int]:
+    """Move short segments (optionally reversed) to a cheaper position; returns (order, moves applied)"""
+    nodes = list(order)
+    moves = 0
+    improved = True
+
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for length in OR_OPT_SEGMENT_LENGTHS:
+            i = 0
+            while i + length <= len(nodes) and len(nodes) > length:
+                segment = nodes[i:i + length]
+                rest = np.asarray(nodes[:i] + nodes[i + length:])
+
+                prev_cost = start_distances[segment[0]] if i == 0 else matrix[nodes[i - 1], segment[0]]
+                next_cost = matrix[segment[-1], nodes[i + length]] if i + length < len(nodes) else 0.0
+                if i == 0:
+                    bridge = start_distances[nodes[length]] if length < len(nodes) else 0.0
+                elif i + length < len(nodes):
+                    bridge = matrix[nodes[i - 1], nodes[i + length]]
+                else:
+                    bridge = 0.0
+                removal_gain = prev_cost + next_cost - bridge
+
+                # Insert between rest[k - 1] and rest[k]; k = 0 is right after the start,
+                # k = len(rest) is the end of the route
+                rest_in, _ = _edge_costs(rest, matrix, start_distances)
+                from_prev = np.concatenate(([start_distances], matrix[rest]))
+                best_gain, best_move = IMPROVEMENT_EPSILON, None
+                for reverse in (False, True):
+                    head, tail = (segment[-1], segment[0]) if reverse else (segment[0], segment[-1])
+                    added = from_prev[:, head] + np.append(matrix[tail, rest], 0.0) - np.append(rest_in, 0.0)
+                    k = int(np.argmin(added))
+                    gain = removal_gain - added[k]
+                    if gain > best_gain and not (k == i and not reverse):
+                        best_gain, best_move = gain, (k, reverse)
+
+                if best_move:
+                    k, reverse = best_move
+                    moved = segment[::-1] if reverse else segment
+                    nodes = rest[:k].tolist() + moved + rest[k:].tolist()
+                    moves += 1
+                    improved = True
+                else:
+                    i += 1
+
+                if time.perf_counter() >= deadline:
+                    return nodes, moves
+
+    return nodes, moves
+
+IMPROVEMENT_PASSES: Dict[str, Callable] = {
+    '2opt': two_opt,
+    'oropt': or_opt
+}
+
+def improve(order: List[int], matrix: np.ndarray, start_distances: np.ndarray, passes: Tuple[str, ...],
+            deadline: float) -> Tuple[List[int], int]:
+    """Alternate the improvement passes until a full round applies no move"""
+    total_moves = 0
+    while time.perf_counter() < deadline:
+        round_moves = 0
+        for name in passes:
+            order, moves = IMPROVEMENT_PASSES[name](order, matrix, start_distances, deadline)
+            round_moves += moves
+        total_moves += round_moves
+        if not round_moves:
+            break
+    return order, total_moves
+
+def optimize_order(matrix: np.ndarray, start_distances: np.ndarray, time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+                   passes: Tuple[str, ...] = ('2opt', 'oropt'), multi_start: int = 0,
+                   initial_order: List[int] = None) -> Tuple[List[int], Dict]:
+    """
+    Build and improve a route order within a wall-clock budget
+    initial_order replaces the nearest neighbour construction when the caller already has one;
+    multi_start > 0 additionally restarts construction from the next closest places to the
+    start location and keeps the shortest result
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    n = len(start_distances)
+
+    initial = list(initial_order) if initial_order is not None else nearest_neighbour(matrix, start_distances)
+    initial_length = route_length(initial, matrix, start_distances)
+    best_order, iterations = improve(initial, matrix, start_distances, passes, deadline)
+    best_length = route_length(best_order, matrix, start_distances)
+
+    first_candidates = [int(i) for i in np.argsort(start_distances)[1:multi_start + 1]] if n > 1 else []
+    restarts = 0
+    for first in first_candidates:
+        if time.perf_counter() >= deadline:
+            break
+        order, moves = improve(nearest_neighbour(matrix, start_distances, first), matrix, start_distances, passes, deadline)
+        iterations += moves
+        restarts += 1
+        length = route_length(order, matrix, start_distances)
+        if length < best_length - IMPROVEMENT_EPSILON:
+            best_order, best_length = order, length
+
+    return best_order, {
+        'strategy': '+'.join(('nearest_neighbour',) + tuple(passes)),
+        'initial_distance_km': round(initial_length, 1),
+        'optimized_distance_km': round(best_length, 1),
+        'distance_saved_km': round(initial_length - best_length, 1),
+        'iterations': iterations,
+        'restarts': restarts,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
@@ -1,66 +1,182 @@
-import requests
 import os
 from dotenv import load_dotenv
+from . import http_client
+from .geocode_cache import geocode_cache
+from .telemetry import get_logger, span, increment
+from .deadline import Deadline
+from .models import Place, place_coords
+from .geo import haversine_km
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 ORS_KEY = os.getenv('OPEN_ROUTE_API')
 if not ORS_KEY:
-    print("Warning: OPEN_ROUTE_API environment variable not set")
+    logger.warning("OPEN_ROUTE_API environment variable not set")
 
-def get_coords(place_name: str) -> tuple:
-    """Get coordinates for a place name using OpenRouteService Geocoding API"""
-    try:
-        geocoding_url = f"https://api.openrouteservice.org/geocode/search?api_key={ORS_KEY}&text={place_name}"
-        response = requests.get(geocoding_url)
-        data = response.json()
+# Directions requests accept at most this many waypoints
+ORS_MAX_WAYPOINTS = int(os.getenv('ORS_MAX_WAYPOINTS', 50))
+# ORS error code for a waypoint with no road within the search radius
+ORS_POINT_NOT_ROUTABLE = 2010
+
+class UnroutablePointError(Exception):
+    """ORS could not route a waypoint of a directions request"""
+
+def _geocode_remote(place_name: str, timeout: tuple = http_client.DEFAULT_TIMEOUT, retries: bool = True) -> tuple:
+    """Query the OpenRouteService Geocoding API, raising on transport errors"""
+    geocoding_url = f"https://api.openrouteservice.org/geocode/search?api_key={ORS_KEY}&text={place_name}"
+    response = http_client.get(geocoding_url, timeout=timeout, retries=retries)
+    data = response.json()
+    
+    if data.get('features'):
+        coords = data['features'][0]['geometry']['coordinates']
+        return (coords[1], coords[0])
+    return None
+
+def get_coords(place_name: str, deadline: Deadline = None) -> tuple:
+    """
+    Get coordinates for a place name, served from the persistent geocode cache when possible
+    With a Deadline the lookup is attempted once with only the time that is left, and not at
+    all once it expired; a failed lookup falls back to an expired cache entry
+    """
+    with span("get_coords") as attributes:
+        cached = geocode_cache.get(place_name)
+        if cached:
+            increment('cache_hits', cache='geocode')
+            attributes['cached'] = True
+            return cached
+        increment('cache_misses', cache='geocode')
         
-        if data.get('features'):
-            coords = data['features'][0]['geometry']['coordinates']
-            return (coords[1], coords[0])
+        try:
+            if deadline is None:
+                coords = _geocode_remote(place_name)
+            elif deadline.expired:
+                raise TimeoutError("Latency budget exhausted before geocoding")
+            else:
+                # A single attempt, as retries and their backoff would run past the deadline
+                coords = _geocode_remote(place_name, deadline.request_timeout(), retries=False)
+            if coords:
+                geocode_cache.set(place_name, coords)
+            return coords
+        except Exception as e:
+            logger.error("Error getting coordinates", extra={'place': place_name, 'error': str(e)})
+            # Keep planning with an expired entry rather than failing outright
+            stale = geocode_cache.get(place_name, allow_stale=True)
+            if stale:
+                increment('fallbacks', kind='stale_geocode')
+            return stale
+
+def _extract_segments(data: dict) -> list:
+    """Pull the per-leg segments out of a JSON or GeoJSON directions response"""
+    if data.get('routes'):
+        return data['routes'][0].get('segments', [])
+    if data.get('features'):
+        return data['features'][0]['properties'].get('segments', [])
+    return []
+
+def _error_code(response) -> int:
+    """The ORS error code of a failed response, None when it has none"""
+    try:
+        error = response.json().get('error')
+    except ValueError:
         return None
+    return error.get('code') if isinstance(error, dict) else None
+
+def _request_route_segments(coords_list: list, timeout: tuple = http_client.DEFAULT_TIMEOUT,
+                            retries: bool = True) -> list:
+    """
+    Send one multi-waypoint directions request and return its segments
+    Raises UnroutablePointError when ORS reports a waypoint it cannot route, and
+    requests.HTTPError for every other error response
+    """
+    route_url = f"https://api.openrouteservice.org/v2/directions/driving-car?api_key={ORS_KEY}"
+    payload = {"coordinates": [[coords[1], coords[0]] for coords in coords_list]}
+    
+    with span("ors.directions", waypoints=len(coords_list)):
+        response = http_client.post(route_url, json=payload, timeout=timeout, retries=retries)
+        if response.status_code >= 400:
+            if _error_code(response) == ORS_POINT_NOT_ROUTABLE:
+                raise UnroutablePointError(response.text)
+            response.raise_for_status()
+        return _extract_segments(response.json())
+
+def _route_chunk(chunk: list, deadline: Deadline = None) -> list:
+    """
+    Legs for one chunk of waypoints, None where a leg could not be routed
+    A chunk with a waypoint ORS cannot route is split in half and each half retried, so only
+    the legs touching that waypoint fall back. Any other failure (transport errors, error
+    responses, a wrong number of segments) fails the whole chunk once, and chunks reached
+    after the deadline expired are not requested.
+    """
+    legs = [None] * (len(chunk) - 1)
+    if deadline is not None and deadline.expired:
+        return legs
+    try:
+        if deadline is None:
+            segments = _request_route_segments(chunk)
+        else:
+            # A single attempt, as retries and their backoff would run past the deadline
+            segments = _request_route_segments(chunk, deadline.request_timeout(), retries=False)
+    except UnroutablePointError:
+        if len(legs) == 1:
+            logger.warning("Leg could not be routed", extra={'waypoints': len(chunk)})
+            return legs
+        increment('route_chunk_splits')
+        middle = len(chunk) // 2
+        return _route_chunk(chunk[:middle + 1], deadline) + _route_chunk(chunk[middle:], deadline)
     except Exception as e:
-        print(f"Error getting coordinates for {place_name}: {e}")
-        return None
+        logger.error("Error getting route", extra={'waypoints': len(chunk), 'error': str(e)})
+        return legs
+    
+    if len(segments) != len(legs):
+        logger.error("Unexpected directions response", extra={'waypoints': len(chunk), 'segments': len(segments)})
+        return legs
+    return [
+        {
+            "distance": segment['distance'] / 1000,
+            "duration": segment['duration'] / 60,
+            "steps": segment.get('steps', [])
+        }
+        for segment in segments
+    ]
+
+def iter_route_legs(coords_list: list, deadline: Deadline = None):
+    """
+    Yield (first leg index, legs) as each ORS directions request completes
+    Waypoints are chunked at ORS_MAX_WAYPOINTS; legs that could not be routed are None (see
+    _route_chunk). With a Deadline, each request is attempted once with only the time that is
+    left, and chunks reached after it expires yield None legs without a request
+    """
+    leg_count = max(0, len(coords_list) - 1)
+    step = ORS_MAX_WAYPOINTS - 1
+    
+    for chunk_start in range(0, leg_count, step):
+        yield chunk_start, _route_chunk(coords_list[chunk_start:chunk_start + step + 1], deadline)
+
+def get_route_legs(coords_list: list) -> list:
+    """
+    Get routes for every consecutive pair of coordinates in as few ORS requests as possible
+    Waypoints are sent in one directions request (chunked at ORS_MAX_WAYPOINTS) and the
+    response segments are split back into one entry per leg; failed legs are None
+    """
+    legs = [None] * max(0, len(coords_list) - 1)
+    for chunk_start, chunk_legs in iter_route_legs(coords_list):
+        legs[chunk_start:chunk_start + len(chunk_legs)] = chunk_legs
+    return legs
 
 def get_route(start_coords: tuple, end_coords: tuple) -> dict:
     """Get route between two coordinates using OpenRouteService"""
-    try:
-        route_url = f"https://api.openrouteservice.org/v2/directions/driving-car?api_key={ORS_KEY}"
-        
-        payload = {
-            "coordinates": [
-                [start_coords[1], start_coords[0]],
-                [end_coords[1], end_coords[0]]
-            ]
-        }
-        
-        response = requests.post(route_url, json=payload)
-        data = response.json()
-        
-        if data.get('features'):
-            route = data['features'][0]['properties']['segments'][0]
-            return {
-                "distance": route['distance'] / 1000,
-                "duration": route['duration'] / 60,
-                "steps": route['steps']
-            }
-        return None
-    except Exception as e:
-        print(f"Error getting route: {e}")
-        return None
+    with span("get_route"):
+        return get_route_legs([start_coords, end_coords])[0]
 
 def calculate_distance_between_places(place1_coords: tuple, place2_coords: tuple) -> dict:
-    """Simple distance calculation using basic math"""
+    """Straight-line (great-circle) distance with a rough travel time estimate"""
     try:
-        import math
-        
         lat1, lon1 = place1_coords
         lat2, lon2 = place2_coords
         
-        lat_diff = lat2 - lat1
-        lon_diff = lon2 - lon1
-        distance_km = math.sqrt(lat_diff**2 + lon_diff**2) * 111
+        distance_km = haversine_km(lat1, lon1, lat2, lon2)
         
         travel_time_minutes = distance_km * 5
         
@@ -70,25 +186,22 @@ def calculate_distance_between_places(place1_coords: tuple, place2_coords: tuple
             "travel_time_formatted": f"{int(travel_time_minutes)} min"
         }
     except Exception as e:
-        print(f"Error calculating distance: {e}")
+        logger.error("Error calculating distance", extra={'error': str(e)})
         return {"distance_km": 0, "travel_time_minutes": 0, "travel_time_formatted": "Unknown"}
 
 def get_places_with_distances(places: list) -> list:
-    """Add simple distance information between consecutive places"""
+    """Add simple distance information between consecutive places, returned as plain dicts"""
     enhanced_places = []
     
     for i, place in enumerate(places):
-        enhanced_place = place.copy()
+        enhanced_place = place.to_dict() if isinstance(place, Place) else place.copy()
         
         if i < len(places) - 1:
-            current_coords = place.get('point', {})
-            next_coords = places[i + 1].get('point', {})
+            current_coords = place_coords(place)
+            next_coords = place_coords(places[i + 1])
             
-            if current_coords and next_coords and 'lat' in current_coords and 'lat' in next_coords:
-                distance_info = calculate_distance_between_places(
-                    (current_coords['lat'], current_coords['lon']),
-                    (next_coords['lat'], next_coords['lon'])
-                )
+            if current_coords and next_coords:
+                distance_info = calculate_distance_between_places(current_coords, next_coords)
                 enhanced_place['distance_to_next'] = distance_info
         
         enhanced_places.append(enhanced_place)
@@ -0,0 +1,175 @@
+"""
+Day scheduler for an ordered itinerary
+
+The itinerary is already in route order, so each day is a contiguous run of it. A day's load
+is the visit time of its places plus the travel between them; the leg out of a day's last
+place is not travelled that day. Days start at DAY_START_HOUR, and each visit falls into the
+time slot its start time lies in.
+
+The best split is found by dynamic programming over all contiguous partitions, which for n
+places and d days is d vectorized passes over an (n + 1) x (n + 1) day-cost table. The cost
+of a day is, in order of weight: hours beyond the day budget (plus their square, so that
+unavoidable overtime is shared out instead of piling onto one day), visits scheduled outside
+their preferred best_time, and the square of the day's load, which spreads places evenly.
+When the time budget runs out the scheduler falls back to filling days greedily. Neither
+strategy drops places: if the trip cannot fit, the overtime is reported in the stats.
+"""
+
+import os
+import re
+import time
+import numpy as np
+from typing import Dict, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DAY_HOURS = float(os.getenv('DAY_HOURS', 8))
+DAY_START_HOUR = float(os.getenv('DAY_START_HOUR', 9))
+DEFAULT_TIME_BUDGET_MS = float(os.getenv('SCHEDULER_BUDGET_MS', 100))
+DEFAULT_VISIT_HOURS = 2.0
+
+# Hour of the day at which each slot begins
+TIME_SLOTS = (("morning", 0), ("afternoon", 12), ("evening", 17))
+
+OVERTIME_WEIGHT = 1000.0
+SLOT_MISS_WEIGHT = 1.0
+BALANCE_WEIGHT = 0.05
+
+_DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:-\s*(\d+(?:\.\d+)?))?\s*(h|min)', re.IGNORECASE)
+_SLOT_STARTS = np.array([start for _, start in TIME_SLOTS], dtype=float)
+_SLOT_INDEX = {name: i for i, (name, _) in enumerate(TIME_SLOTS)}
+
+def parse_visit_hours(visit_duration: str) -> float:
+    """Midpoint of a visit duration such as "2-3 hours" or "45 min"; DEFAULT_VISIT_HOURS when unreadable"""
+    match = _DURATION_PATTERN.search(visit_duration or "")
+    if not match:
+        return DEFAULT_VISIT_HOURS
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    hours = (low + high) / 2
+    return hours / 60 if match.group(3).lower() == 'min' else hours
+
+def slot_for_hour(hour: float) -> str:
+    """Name of the time slot an hour of the day falls into"""
+    return TIME_SLOTS[int(np.searchsorted(_SLOT_STARTS, hour, side='right')) - 1][0]
+
+def format_clock(minutes: float) -> str:
+    """Minutes after midnight as HH:MM"""
+    minutes = int(round(minutes))
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+def _travel_minutes(place) -> float:
+    leg = place.get('route_to_next') or {}
+    return float(leg.get('travel_time_minutes') or 0)
+
+def _day_costs(visit: np.ndarray, travel: np.ndarray, preferred: np.ndarray,
+               day_hours: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (cost, load, misses) tables where entry [i, j] describes a day visiting places i..j-1
+    offsets[k] is the time from the itinerary's first visit to the start of place k if
+    every place were visited back to back; within a day starting at place i, place k starts
+    offsets[k] - offsets[i] minutes after DAY_START_HOUR
+    """
+    n = len(visit)
+    offsets = np.concatenate(([0.0], np.cumsum(visit + travel)))
+    travel_into_end = np.concatenate(([0.0], travel))
+
+    load = offsets[np.newaxis, :] - offsets[:, np.newaxis] - travel_into_end[np.newaxis, :]
+    np.fill_diagonal(load, 0.0)
+
+    start_hours = DAY_START_HOUR + (offsets[np.newaxis, :n] - offsets[:n, np.newaxis]) / 60
+    slots = np.searchsorted(_SLOT_STARTS, start_hours, side='right') - 1
+    missed = (slots != preferred[np.newaxis, :]) & (preferred[np.newaxis, :] >= 0)
+    missed &= np.triu(np.ones((n, n), dtype=bool))
+    misses = np.zeros((n + 1, n + 1))
+    misses[:n, 1:] = np.cumsum(missed, axis=1)
+
+    load_hours = load / 60
+    overtime = np.maximum(load_hours - day_hours, 0.0)
+    cost = (OVERTIME_WEIGHT * (overtime + overtime ** 2)
+            + SLOT_MISS_WEIGHT * misses + BALANCE_WEIGHT * load_hours ** 2)
+    cost[np.tril_indices(n + 1, -1)] = np.inf
+    return cost, load, misses
+
+def _partition_dp(cost: np.ndarray, days: int, deadline: float) -> List[Tuple[int, int]]:
+    """Contiguous (start, end) ranges for at most days days minimizing total cost; None past the deadline"""
+    n = cost.shape[0] - 1
+    best = cost[0].copy()
+    back = []
+    for _ in range(days - 1):
+        if time.perf_counter() >= deadline:
+            return None
+        totals = best[:, np.newaxis] + cost
+        back.append(np.argmin(totals, axis=0))
+        best = totals[back[-1], np.arange(n + 1)]
+
+    ranges = []
+    end = n
+    for choice in reversed(back):
+        start = int(choice[end])
+        ranges.append((start, end))
+        end = start
+    ranges.append((0, end))
+    return [(start, end) for start, end in reversed(ranges) if end > start]
+
+def _partition_greedy(load: np.ndarray, days: int, day_hours: float) -> List[Tuple[int, int]]:
+    """
+    Fill each day until the next place would exceed its share of the trip; the last day takes
+    the rest. The share is the day budget, or an equal split of the total when that is longer
+    """
+    n = load.shape[0] - 1
+    share = max(day_hours, load[0, n] / 60 / days)
+    ranges = []
+    start = 0
+    for end in range(1, n + 1):
+        if end - start > 1 and load[start, end] / 60 > share and len(ranges) < days - 1:
+            ranges.append((start, end - 1))
+            start = end - 1
+    ranges.append((start, n))
+    return ranges
+
+def schedule_days(places: List[Dict], days: int, day_hours: float = DAY_HOURS,
+                  time_budget_ms: float = DEFAULT_TIME_BUDGET_MS) -> Tuple[List[List[Dict]], Dict]:
+    """
+    Split an ordered itinerary into at most days days
+    Returns one list per non-empty day of {'index', 'start_minutes', 'slot'} visits, where index
+    points into places and start_minutes is the visit's start in minutes after midnight,
+    together with the scheduling statistics
+    """
+    started = time.perf_counter()
+    n = len(places)
+    if not n:
+        return [], {}
+    days = max(1, min(int(days), n))
+
+    visit = np.array([parse_visit_hours(place.get('visit_duration', '')) * 60 for place in places])
+    travel = np.array([_travel_minutes(place) for place in places])
+    travel[-1] = 0.0
+    preferred = np.array([_SLOT_INDEX.get(place.get('best_time'), -1) for place in places])
+
+    cost, load, misses = _day_costs(visit, travel, preferred, day_hours)
+    ranges = _partition_dp(cost, days, started + time_budget_ms / 1000)
+    strategy = 'dp'
+    if ranges is None:
+        ranges = _partition_greedy(load, days, day_hours)
+        strategy = 'greedy'
+
+    day_start = DAY_START_HOUR * 60
+    schedule = []
+    for start, end in ranges:
+        visits = []
+        for k in range(start, end):
+            start_minutes = day_start + (load[start, k] + travel[k - 1] if k > start else 0.0)
+            visits.append({'index': k, 'start_minutes': float(start_minutes), 'slot': slot_for_hour(start_minutes / 60)})
+        schedule.append(visits)
+
+    day_hours_used = [float(load[start, end]) / 60 for start, end in ranges]
+    return schedule, {
+        'strategy': strategy,
+        'days_used': len(ranges),
+        'max_day_hours': round(max(day_hours_used), 2),
+        'overtime_hours': round(sum(max(0.0, hours - day_hours) for hours in day_hours_used), 2),
+        'slot_misses': int(sum(misses[start, end] for start, end in ranges)),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
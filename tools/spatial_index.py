@@ -0,0 +1,108 @@
+import math
+import numpy as np
+from collections import defaultdict
+from typing import List, Dict, Tuple
+from .distance_matrix import place_coordinates, distances_from
+from .geo import KM_PER_DEGREE
+
+DEFAULT_CELL_KM = 2.0
+
+# Distances are rounded to 0.1 km, so a point slightly outside a radius can still compare equal to it
+ROUNDING_MARGIN_KM = 0.05
+
+class SpatialIndex:
+    """
+    Uniform latitude/longitude grid over place coordinates
+    Built once per trip in O(n); radius and k-nearest queries only visit the grid cells
+    that can contain a match. Distances come from distances_from so results agree with
+    the distance matrix used by the route optimizer.
+    """
+
+    def __init__(self, coords: np.ndarray, cell_km: float = DEFAULT_CELL_KM):
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        self.cell_km = cell_km
+        self._cell_deg = cell_km / KM_PER_DEGREE
+        self._cells = defaultdict(list)
+        self._active = np.isfinite(self.coords).all(axis=1)
+
+        for i in np.flatnonzero(self._active):
+            self._cells[self._key(*self.coords[i])].append(int(i))
+
+        if self._active.any():
+            valid = self.coords[self._active]
+            self._bounds = (valid.min(axis=0), valid.max(axis=0))
+        else:
+            self._bounds = None
+
+    @classmethod
+    def from_places(cls, places: List[Dict], cell_km: float = DEFAULT_CELL_KM) -> 'SpatialIndex':
+        """Index the 'point' of each place; places without coordinates are never returned"""
+        return cls(place_coordinates(places), cell_km)
+
+    def __len__(self) -> int:
+        return int(self._active.sum())
+
+    def _key(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self._cell_deg), math.floor(lon / self._cell_deg))
+
+    def _candidates(self, point: Tuple[float, float], radius_km: float) -> np.ndarray:
+        """Indices of active points in every cell that may lie within radius_km of point"""
+        lat, lon = point
+        radius_km += ROUNDING_MARGIN_KM
+        lat_span = math.ceil(radius_km / self.cell_km)
+        # A kilometre spans more longitude away from the equator; widen the search accordingly
+        widest_lat = min(89.0, abs(lat) + radius_km / KM_PER_DEGREE)
+        lon_span = math.ceil(radius_km / (self.cell_km * math.cos(math.radians(widest_lat))))
+        center_row, center_col = self._key(lat, lon)
+
+        found = []
+        if (2 * lat_span + 1) * (2 * lon_span + 1) > len(self._cells):
+            for (row, col), members in self._cells.items():
+                if abs(row - center_row) <= lat_span and abs(col - center_col) <= lon_span:
+                    found.extend(members)
+        else:
+            for row in range(center_row - lat_span, center_row + lat_span + 1):
+                for col in range(center_col - lon_span, center_col + lon_span + 1):
+                    found.extend(self._cells.get((row, col), ()))
+
+        candidates = np.array(sorted(found), dtype=int)
+        return candidates[self._active[candidates]] if len(candidates) else candidates
+
+    def within(self, point: Tuple[float, float], radius_km: float, strict: bool = False) -> List[int]:
+        """Indices of points within radius_km of point, nearest first (ties by index)"""
+        candidates = self._candidates(point, radius_km)
+        if not len(candidates):
+            return []
+        distances = distances_from(point, self.coords[candidates])
+        mask = distances < radius_km if strict else distances <= radius_km
+        candidates, distances = candidates[mask], distances[mask]
+        return candidates[np.argsort(distances, kind='stable')].tolist()
+
+    def nearest(self, point: Tuple[float, float], k: int = 1) -> List[int]:
+        """Indices of the k points closest to point, nearest first (ties by index)"""
+        if self._bounds is None or not self._active.any():
+            return []
+        # Farthest any indexed point can be: walking the largest latitude offset along a meridian
+        # and then the largest longitude offset along a parallel is never shorter than the great circle
+        low, high = self._bounds
+        max_dlat = max(abs(high[0] - point[0]), abs(point[0] - low[0]))
+        max_dlon = max(abs(high[1] - point[1]), abs(point[1] - low[1]))
+        max_radius = KM_PER_DEGREE * (max_dlat + max_dlon)
+
+        radius = self.cell_km
+        while True:
+            found = self.within(point, radius)
+            if len(found) >= k or radius > max_radius:
+                return found[:k]
+            radius *= 2
+
+    def remove(self, index: int) -> None:
+        """Exclude a point from future queries"""
+        self._active[index] = False
+
+    def neighbour_counts(self, radius_km: float, strict: bool = True) -> np.ndarray:
+        """For every indexed point, how many other points lie within radius_km of it"""
+        counts = np.zeros(len(self.coords), dtype=int)
+        for i in np.flatnonzero(self._active):
+            counts[i] = len(self.within(tuple(self.coords[i]), radius_km, strict)) - 1
+        return counts
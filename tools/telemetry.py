@@ -0,0 +1,250 @@
+"""
+Lightweight tracing, metrics and logging for the planning pipeline
+
+- span(name, **attributes) times a block; durations are kept per span name in memory
+  (count, errors, avg/p50/p95/max) and mirrored to OpenTelemetry and Prometheus when enabled
+- increment(name, **labels) counts events such as upstream calls, cache hits and fallbacks;
+  a counter is exported to Prometheus with the label names declared for it in COUNTER_LABELS
+- get_logger(name) returns a logger under the "travelagent" namespace, configured once from
+  LOG_LEVEL (default INFO) and LOG_FORMAT ("text" or "json"); keyword data passed through
+  extra={...} is appended to text lines and included as fields in JSON lines
+
+Exporters are optional and only used when their package is installed:
+- TELEMETRY_OTEL=1 sends spans to the globally configured OpenTelemetry tracer provider
+- PROMETHEUS_PORT=9464 serves counters and span histograms on that port via prometheus_client
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+TELEMETRY_OTEL = os.getenv('TELEMETRY_OTEL', '0').lower() in ('1', 'true', 'yes')
+PROMETHEUS_PORT = os.getenv('PROMETHEUS_PORT')
+
+LOGGER_NAMESPACE = 'travelagent'
+SPAN_SAMPLES = 500
+METRIC_PREFIX = 'travelagent_'
+# Label names of every counter, fixed up front because Prometheus counters cannot change them;
+# labels a call leaves out are exported empty, and counters not listed here stay in-process
+COUNTER_LABELS = {
+    'upstream_calls': ('host', 'outcome'),
+    'cache_hits': ('cache', 'filtered', 'stale'),
+    'cache_misses': ('cache',),
+    'fallbacks': ('kind',),
+    'route_chunk_splits': ()
+}
+
+# Attributes of a standard LogRecord; anything else on a record came from extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        payload.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+_configure_lock = threading.Lock()
+_configured = False
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT) -> None:
+    """Attach one handler to the package logger; later calls only change the level"""
+    global _configured
+    root = logging.getLogger(LOGGER_NAMESPACE)
+    root.setLevel(level)
+    with _configure_lock:
+        if _configured:
+            return
+        handler = logging.StreamHandler()
+        if log_format == 'json':
+            handler.setFormatter(_JsonFormatter())
+        else:
+            handler.setFormatter(_TextFormatter('%(asctime)s %(levelname)s %(name)s: %(message)s', '%H:%M:%S'))
+        root.addHandler(handler)
+        root.propagate = False
+        _configured = True
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module, e.g. get_logger(__name__)"""
+    configure_logging()
+    return logging.getLogger(f"{LOGGER_NAMESPACE}.{name}")
+
+logger = get_logger(__name__)
+
+class _Exporters:
+    """OpenTelemetry tracer and Prometheus metrics, created on first use when enabled"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.tracer = None
+        self.prometheus = None
+        self._counters = {}
+        self._histogram = None
+
+    def _initialize(self) -> None:
+        if TELEMETRY_OTEL:
+            try:
+                from opentelemetry import trace
+                self.tracer = trace.get_tracer(LOGGER_NAMESPACE)
+            except ImportError:
+                logger.warning("TELEMETRY_OTEL is set but opentelemetry is not installed")
+        if PROMETHEUS_PORT:
+            try:
+                import prometheus_client
+                prometheus_client.start_http_server(int(PROMETHEUS_PORT))
+                self.prometheus = prometheus_client
+                self._histogram = prometheus_client.Histogram(
+                    f"{METRIC_PREFIX}span_duration_seconds", "Duration of instrumented spans", ['span', 'status']
+                )
+                self._counters = {
+                    name: prometheus_client.Counter(f"{METRIC_PREFIX}{name}", name.replace('_', ' '), label_names)
+                    for name, label_names in COUNTER_LABELS.items()
+                }
+            except ImportError:
+                logger.warning("PROMETHEUS_PORT is set but prometheus_client is not installed")
+            except OSError as e:
+                logger.warning("Could not start the Prometheus exporter", extra={'port': PROMETHEUS_PORT, 'error': str(e)})
+        self._initialized = True
+
+    def ensure(self) -> '_Exporters':
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._initialize()
+        return self
+
+    def otel_span(self, name: str, attributes: dict):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.start_as_current_span(name, attributes=_otel_attributes(attributes))
+
+    def observe(self, name: str, seconds: float, failed: bool) -> None:
+        if self._histogram is not None:
+            self._histogram.labels(span=name, status='error' if failed else 'ok').observe(seconds)
+
+    def count(self, name: str, value: float, labels: dict) -> None:
+        counter = self._counters.get(name)
+        if counter is None:
+            return
+        label_names = COUNTER_LABELS[name]
+        if label_names:
+            counter.labels(**{key: str(labels.get(key, '')) for key in label_names}).inc(value)
+        else:
+            counter.inc(value)
+
+def _otel_attributes(attributes: dict) -> dict:
+    return {key: value if isinstance(value, (str, bool, int, float)) else str(value) for key, value in attributes.items()}
+
+_exporters = _Exporters()
+_metrics_lock = threading.Lock()
+_span_stats = {}
+_counters = {}
+
+def _record_span(name: str, elapsed_ms: float, failed: bool) -> None:
+    with _metrics_lock:
+        stats = _span_stats.get(name)
+        if stats is None:
+            stats = _span_stats[name] = {
+                'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'samples': deque(maxlen=SPAN_SAMPLES)
+            }
+        stats['count'] += 1
+        stats['errors'] += int(failed)
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['samples'].append(elapsed_ms)
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a block of work under a span name
+    Yields the attributes dict, so the block can add results (e.g. a result count) that are
+    attached to the exported span and the debug log line
+    """
+    exporters = _exporters.ensure()
+    failed = False
+    started = time.perf_counter()
+    with exporters.otel_span(name, attributes) as otel_span:
+        try:
+            yield attributes
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            _record_span(name, elapsed * 1000, failed)
+            exporters.observe(name, elapsed, failed)
+            if otel_span is not None and attributes:
+                otel_span.set_attributes(_otel_attributes(attributes))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("span", extra={'span': name, 'duration_ms': round(elapsed * 1000, 1), 'failed': failed, **attributes})
+
+def traced(name: str = None):
+    """Decorator form of span(); the span name defaults to the function name"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """Add to a counter; each distinct label set is counted separately"""
+    key = (name, tuple(sorted(labels.items())))
+    with _metrics_lock:
+        _counters[key] = _counters.get(key, 0) + value
+    _exporters.ensure().count(name, value, labels)
+
+def get_metrics() -> dict:
+    """Snapshot of span timings (ms) and counters"""
+    with _metrics_lock:
+        spans = {}
+        for name, stats in _span_stats.items():
+            samples = sorted(stats['samples'])
+            spans[name] = {
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'avg_ms': round(stats['total_ms'] / stats['count'], 1),
+                'p50_ms': round(samples[len(samples) // 2], 1),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+                'max_ms': round(stats['max_ms'], 1)
+            }
+        counters = {}
+        for (name, labels), value in _counters.items():
+            label_text = ','.join(f"{key}={label}" for key, label in labels)
+            counters[f"{name}{{{label_text}}}" if label_text else name] = value
+    return {'spans': spans, 'counters': counters}
+
+def reset_metrics() -> None:
+    """Clear in-process span timings and counters (exported metrics are unaffected)"""
+    with _metrics_lock:
+        _span_stats.clear()
+        _counters.clear()
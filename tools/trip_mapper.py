@@ -1,13 +1,30 @@
-import requests
 import os
 import math
-from typing import List, Dict, Tuple, Any
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Any, Iterator
 from dotenv import load_dotenv
-from .routes import get_route, calculate_distance_between_places
+from .poi_cache import get_places_in_radius
+from .distance_matrix import places_distance_matrix, distances_from
+from .spatial_index import SpatialIndex
+from .route_optimizer import optimize_order, DEFAULT_TIME_BUDGET_MS
+from .clustering import cluster_places
+from .scheduler import parse_visit_hours
+from .routes import iter_route_legs, calculate_distance_between_places
+from .telemetry import get_logger, span, increment
+from .deadline import Deadline
+from .models import Place, RouteLeg, place_coords
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 ORS_KEY = os.getenv('OPEN_ROUTE_API')
+# Daily zones optimized concurrently by optimize_route_by_zone
+ZONE_OPTIMIZER_WORKERS = int(os.getenv('ZONE_OPTIMIZER_WORKERS', 4))
+# Hours added to each place's visit time when filling zones, for travel between places
+ZONE_TRAVEL_ALLOWANCE_HOURS = float(os.getenv('ZONE_TRAVEL_ALLOWANCE_HOURS', 0.5))
 
 def calculate_total_distance(places: List[Dict]) -> float:
     """Calculate total distance of the trip route"""
@@ -30,99 +47,210 @@ def calculate_total_distance(places: List[Dict]) -> float:
     
     return round(total_distance, 1)
 
-def optimize_route(places: List[Dict], start_location: Tuple[float, float] = None) -> List[Dict]:
-    """Optimize route using nearest neighbor algorithm"""
+def _nearest_neighbour_order(coords: np.ndarray, start_location: Tuple[float, float]) -> List[int]:
+    """Nearest neighbour construction answered by the spatial index instead of full matrix scans"""
+    index = SpatialIndex(coords)
+    order = []
+    current = start_location
+    for _ in range(len(coords)):
+        nearest = index.nearest(current, k=1)[0]
+        index.remove(nearest)
+        order.append(nearest)
+        current = tuple(coords[nearest])
+    return order
+
+def optimize_route_with_stats(places: List[Dict], start_location: Tuple[float, float] = None,
+                              time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+                              passes: Tuple[str, ...] = ('2opt', 'oropt'),
+                              multi_start: int = 0) -> Tuple[List[Dict], Dict[str, Any]]:
+    """Optimize route order and return it together with the optimizer statistics"""
     if not places:
-        return places
+        return places, {}
     
     if not start_location:
-        first_place = places[0]
-        start_location = (first_place['point']['lat'], first_place['point']['lon'])
+        # Start from the first place that can be located
+        start_location = next((coords for coords in map(place_coords, places) if coords), None)
+        if start_location is None:
+            return places, {}
+    
+    with span("optimize_route", places=len(places)):
+        coords, matrix = places_distance_matrix(places)
+        start_distances = distances_from(start_location, coords)
+        
+        # Places without coordinates cannot be routed and keep their relative order at the end
+        routable = np.flatnonzero(np.isfinite(start_distances))
+        order, stats = optimize_order(
+            matrix[np.ix_(routable, routable)], start_distances[routable],
+            time_budget_ms=time_budget_ms, passes=passes, multi_start=multi_start,
+            initial_order=_nearest_neighbour_order(coords[routable], start_location)
+        )
+    unroutable = np.flatnonzero(~np.isfinite(start_distances))
+    indices = [int(routable[k]) for k in order] + unroutable.tolist()
     
-    unvisited = places.copy()
     optimized_route = []
-    current_location = start_location
+    previous_idx = None
+    for idx in indices:
+        distance = float(start_distances[idx] if previous_idx is None else matrix[previous_idx, idx])
+        place = places[idx]
+        if np.isfinite(distance):
+            place['route_info'] = {
+                'distance_from_previous': distance,
+                'travel_time_minutes': distance * 5,
+                'travel_time_formatted': f"{int(distance * 5)} min"
+            }
+        optimized_route.append(place)
+        previous_idx = idx
     
-    while unvisited:
-        nearest_idx = 0
-        min_distance = float('inf')
-        
-        for i, place in enumerate(unvisited):
-            if 'point' not in place or 'lat' not in place['point'] or 'lon' not in place['point']:
-                continue
-                
-            place_coords = (place['point']['lat'], place['point']['lon'])
-            try:
-                distance_info = calculate_distance_between_places(current_location, place_coords)
-                if distance_info['distance_km'] < min_distance:
-                    min_distance = distance_info['distance_km']
-                    nearest_idx = i
-            except Exception:
-                continue
+    return optimized_route, stats
+
+def optimize_route(places: List[Dict], start_location: Tuple[float, float] = None, **optimizer_options) -> List[Dict]:
+    """Optimize route with nearest neighbour construction improved by 2-opt and Or-opt"""
+    return optimize_route_with_stats(places, start_location, **optimizer_options)[0]
+
+def optimize_route_by_zone(places: List[Dict], zones: int, start_location: Tuple[float, float] = None,
+                           zone_hours: float = None, max_workers: int = ZONE_OPTIMIZER_WORKERS,
+                           **optimizer_options) -> Tuple[List[Dict], List[List[Dict]], Dict[str, Any]]:
+    """
+    Cluster places into compact zones (one per day) and optimize each zone's route on its own
+    zone_hours caps the hours per zone, counting each place's visit time plus
+    ZONE_TRAVEL_ALLOWANCE_HOURS (see tools.clustering); otherwise zones get an equal number
+    of places. Returns the places in visiting order, the ordered places of each zone and the
+    combined optimizer statistics. The first zone starts from start_location and every later
+    zone from the centroid of the zone before it, so the zones are independent and run
+    concurrently.
+    """
+    if not places:
+        return places, [], {}
+    
+    if not start_location:
+        # Start from the first place that can be located, as optimize_route_with_stats does
+        start_location = next((coords for coords in map(place_coords, places) if coords), None)
+    
+    started = time.perf_counter()
+    with span("optimize_route_by_zone", places=len(places), zones=zones):
+        weights = None
+        if zone_hours:
+            weights = [parse_visit_hours(place.get('visit_duration', '')) + ZONE_TRAVEL_ALLOWANCE_HOURS for place in places]
+        zone_indices = cluster_places(places, zones, start_location, weights, zone_hours)
+        zone_places = [[places[i] for i in zone] for zone in zone_indices]
+        starts = [start_location]
+        for zone in zone_places[:-1]:
+            located = [place_coords(place) for place in zone if _has_point(place)]
+            starts.append(tuple(np.mean(located, axis=0)) if located else starts[-1])
         
-        nearest_place = unvisited.pop(nearest_idx)
-        nearest_place['route_info'] = {
-            'distance_from_previous': min_distance,
-            'travel_time_minutes': min_distance * 5,
-            'travel_time_formatted': f"{int(min_distance * 5)} min"
-        }
-        optimized_route.append(nearest_place)
-        current_location = (nearest_place['point']['lat'], nearest_place['point']['lon'])
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(zone_places))),
+                                thread_name_prefix="zones") as executor:
+            results = list(executor.map(
+                lambda zone, start: optimize_route_with_stats(zone, start, **optimizer_options),
+                zone_places, starts
+            ))
+    
+    zone_routes = [route for route, _ in results]
+    zone_stats = [stats for _, stats in results if stats]
+    stats = {
+        'strategy': 'kmeans+' + (zone_stats[0]['strategy'] if zone_stats else 'none'),
+        'zones': len(zone_routes)
+    }
+    for key in ('initial_distance_km', 'optimized_distance_km', 'distance_saved_km'):
+        stats[key] = round(sum(zone[key] for zone in zone_stats), 1)
+    for key in ('iterations', 'restarts'):
+        stats[key] = sum(zone[key] for zone in zone_stats)
+    stats['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return [place for route in zone_routes for place in route], zone_routes, stats
+
+def _has_point(place: Place) -> bool:
+    return place_coords(place) is not None
+
+def _build_route_to_next(route_info: Dict, current_coords: Tuple[float, float],
+                         next_coords: Tuple[float, float], next_name: str, degraded: bool = False) -> RouteLeg:
+    """
+    Shape an ORS leg into route_to_next, falling back to the straight-line estimate
+    degraded marks an estimate used because the latency budget ran out
+    """
+    if route_info and 'distance' in route_info and 'duration' in route_info:
+        return RouteLeg(
+            distance_km=route_info['distance'],
+            travel_time_minutes=route_info['duration'],
+            travel_time_formatted=f"{int(route_info['duration'])} min",
+            route_steps=route_info.get('steps', []),
+            next_place=next_name
+        )
     
-    return optimized_route
+    increment('fallbacks', kind='route_deadline' if degraded else 'route_estimate')
+    distance_info = calculate_distance_between_places(current_coords, next_coords)
+    return RouteLeg(
+        distance_km=distance_info['distance_km'],
+        travel_time_minutes=distance_info['travel_time_minutes'],
+        travel_time_formatted=distance_info['travel_time_formatted'],
+        next_place=next_name,
+        degraded=degraded
+    )
 
-def get_detailed_route_info(places: List[Dict]) -> List[Dict]:
-    """Get detailed route information between all places"""
+def iter_detailed_route_info(places: List[Place], deadline: Deadline = None) -> Iterator[Place]:
+    """
+    Yield each place with its route to the next place (set as route_to_next on the place
+    itself) as soon as that leg is known
+    Each run of consecutive places with coordinates becomes one multi-waypoint request, issued
+    lazily when the first place of the run is reached; stopping early skips unneeded requests.
+    With a Deadline, legs still missing once it expires use the straight-line estimate and
+    their route_to_next is marked degraded
+    """
     if len(places) < 2:
-        return places
+        yield from places
+        return
     
-    enhanced_places = []
+    legs = [None] * (len(places) - 1)
+    pending = {}
+    run_start = None
+    for i in range(len(places) + 1):
+        if i < len(places) and _has_point(places[i]):
+            if run_start is None:
+                run_start = i
+            continue
+        
+        if run_start is not None and i - run_start >= 2:
+            run_coords = [place_coords(place) for place in places[run_start:i]]
+            run = (run_start, iter_route_legs(run_coords, deadline))
+            for leg in range(run_start, i - 1):
+                pending[leg] = run
+        run_start = None
     
     for i, place in enumerate(places):
-        enhanced_place = place.copy()
-        
-        if i < len(places) - 1:
-            if ('point' not in place or 'lat' not in place['point'] or 'lon' not in place['point'] or
-                'point' not in places[i + 1] or 'lat' not in places[i + 1]['point'] or 'lon' not in places[i + 1]['point']):
-                continue
+        # A place without coordinates, or before one, is still yielded, just without a leg
+        if i < len(places) - 1 and _has_point(place) and _has_point(places[i + 1]):
+            while i in pending:
+                offset, run = pending[i]
+                try:
+                    chunk_start, chunk_legs = next(run)
+                except Exception:
+                    pending.pop(i)
+                    break
+                for leg_offset, leg in enumerate(chunk_legs):
+                    legs[offset + chunk_start + leg_offset] = leg
+                    pending.pop(offset + chunk_start + leg_offset, None)
                 
-            current_coords = (place['point']['lat'], place['point']['lon'])
             next_place = places[i + 1]
-            next_coords = (next_place['point']['lat'], next_place['point']['lon'])
-            
-            try:
-                route_info = get_route(current_coords, next_coords)
-                
-                if route_info and 'distance' in route_info and 'duration' in route_info:
-                    enhanced_place['route_to_next'] = {
-                        'distance_km': route_info['distance'],
-                        'travel_time_minutes': route_info['duration'],
-                        'travel_time_formatted': f"{int(route_info['duration'])} min",
-                        'route_steps': route_info.get('steps', []),
-                        'next_place': next_place['name']
-                    }
-                else:
-                    distance_info = calculate_distance_between_places(current_coords, next_coords)
-                    enhanced_place['route_to_next'] = {
-                        'distance_km': distance_info['distance_km'],
-                        'travel_time_minutes': distance_info['travel_time_minutes'],
-                        'travel_time_formatted': distance_info['travel_time_formatted'],
-                        'route_steps': [],
-                        'next_place': next_place['name']
-                    }
-            except Exception:
-                distance_info = calculate_distance_between_places(current_coords, next_coords)
-                enhanced_place['route_to_next'] = {
-                    'distance_km': distance_info['distance_km'],
-                    'travel_time_minutes': distance_info['travel_time_minutes'],
-                    'travel_time_formatted': distance_info['travel_time_formatted'],
-                    'route_steps': [],
-                    'next_place': next_place['name']
-                }
+            degraded = legs[i] is None and deadline is not None and deadline.expired
+            place['route_to_next'] = _build_route_to_next(
+                legs[i], place_coords(place), place_coords(next_place), next_place['name'], degraded
+            )
         
-        enhanced_places.append(enhanced_place)
-    
-    return enhanced_places
+        yield place
+
+def route_leg(place: Place, next_place: Place, deadline: Deadline = None) -> RouteLeg:
+    """
+    Route from one place to another with a single directions request, for itineraries that
+    drop the place a leg from iter_detailed_route_info led to; None without coordinates
+    """
+    if not _has_point(place) or not _has_point(next_place):
+        return None
+    _, legs = next(iter_route_legs([place_coords(place), place_coords(next_place)], deadline))
+    degraded = legs[0] is None and deadline is not None and deadline.expired
+    return _build_route_to_next(legs[0], place_coords(place), place_coords(next_place), next_place['name'], degraded)
+
+def get_detailed_route_info(places: List[Place], deadline: Deadline = None) -> List[Place]:
+    """Get detailed route information between all places with batched ORS requests"""
+    return list(iter_detailed_route_info(places, deadline))
 
 def find_nearby_places(center_coords: Tuple[float, float], radius_km: float = 5) -> List[Dict]:
     """Find nearby places within a radius"""
@@ -131,34 +259,29 @@ def find_nearby_places(center_coords: Tuple[float, float], radius_km: float = 5)
         if not OTM_KEY:
             return []
         
-        lat, lon = center_coords
-        places_url = f"https://api.opentripmap.com/0.1/en/places/radius?radius={radius_km*1000}&lon={lon}&lat={lat}&rate=1&format=json&apikey={OTM_KEY}"
+        places_data = [place for place in get_places_in_radius(center_coords, radius_km * 1000) if place.get('point')]
         
-        response = requests.get(places_url)
-        if response.status_code == 200:
-            places_data = response.json()
-            
-            nearby_places = []
-            for place in places_data[:10]:
-                place_coords = (place['point']['lat'], place['point']['lon'])
-                distance_info = calculate_distance_between_places(center_coords, place_coords)
-                
-                nearby_places.append({
-                    'name': place.get('name', 'Unknown'),
-                    'kinds': place.get('kinds', ''),
-                    'distance_km': distance_info['distance_km'],
-                    'point': place['point']
-                })
+        # The 10 closest results, found through the spatial index rather than sorting everything
+        index = SpatialIndex.from_places(places_data)
+        nearby_places = []
+        for i in index.nearest(center_coords, k=10):
+            place = places_data[i]
+            place_coords = (place['point']['lat'], place['point']['lon'])
+            distance_info = calculate_distance_between_places(center_coords, place_coords)
             
-            nearby_places.sort(key=lambda x: x['distance_km'])
-            return nearby_places
+            nearby_places.append({
+                'name': place.get('name', 'Unknown'),
+                'kinds': place.get('kinds', ''),
+                'distance_km': distance_info['distance_km'],
+                'point': place['point']
+            })
         
-        return []
+        return nearby_places
     except Exception as e:
-        print(f"Error finding nearby places: {e}")
+        logger.error("Error finding nearby places", extra={'error': str(e)})
         return []
 
-def create_trip_summary(places: List[Dict]) -> Dict[str, Any]:
+def create_trip_summary(places: List[Dict], optimization_stats: Dict[str, Any] = None) -> Dict[str, Any]:
     """Create a comprehensive trip summary"""
     if not places:
         return {}
@@ -180,7 +303,7 @@ def create_trip_summary(places: List[Dict]) -> Dict[str, Any]:
     end_location = places[-1]['name'] if places else "Unknown"
     avg_distance = total_distance / max(1, total_places - 1)
     
-    return {
+    summary = {
         'total_distance_km': total_distance,
         'total_travel_time_minutes': total_travel_time,
         'total_travel_time_formatted': f"{int(total_travel_time)} min",
@@ -190,6 +313,11 @@ def create_trip_summary(places: List[Dict]) -> Dict[str, Any]:
         'average_distance_between_places': round(avg_distance, 1),
         'route_efficiency': "Optimized" if total_places > 1 else "Single Destination"
     }
+    
+    if optimization_stats:
+        summary['optimization'] = optimization_stats
+    
+    return summary
 
 def generate_route_map_data(places: List[Dict]) -> Dict[str, Any]:
     """Generate data for creating a route map"""
@@ -241,27 +369,10 @@ def analyze_route_efficiency(places: List[Dict]) -> Dict[str, Any]:
         suggestions.append("Many destinations - consider splitting into multiple days")
     
     nearby_groups = []
+    nearby_counts = SpatialIndex.from_places(places).neighbour_counts(2)
+    
     for i, place in enumerate(places):
-        if 'point' not in place or 'lat' not in place['point'] or 'lon' not in place['point']:
-            continue
-            
-        place_coords = (place['point']['lat'], place['point']['lon'])
-        nearby_count = 0
-        
-        for j, other_place in enumerate(places):
-            if i != j:
-                if 'point' not in other_place or 'lat' not in other_place['point'] or 'lon' not in other_place['point']:
-                    continue
-                    
-                other_coords = (other_place['point']['lat'], other_place['point']['lon'])
-                try:
-                    distance = calculate_distance_between_places(place_coords, other_coords)['distance_km']
-                    if distance < 2:
-                        nearby_count += 1
-                except Exception:
-                    continue
-        
-        if nearby_count >= 2:
+        if nearby_counts[i] >= 2:
             nearby_groups.append(place['name'])
     
     if nearby_groups:
@@ -1,28 +1,48 @@
-import requests
 import os
 from dotenv import load_dotenv
+from . import http_client
+from .weather_cache import weather_cache, weather_key
+from .telemetry import get_logger, span
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 OWM_KEY = os.getenv('OPENWEATHER_API')
 
-def get_weather(city: str) -> dict:
-    """Get current weather for a city"""
-    try:
+def _fetch_weather(city: str = None, coords: tuple = None) -> dict:
+    """Query OpenWeather for current conditions; raises on any failure"""
+    if coords is not None:
+        lat, lon = coords
+        weather_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OWM_KEY}&units=metric"
+    else:
         weather_url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={OWM_KEY}&units=metric"
-        response = requests.get(weather_url)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                'temp': data['main']['temp'],
-                'weather': data['weather'][0]['main'],
-                'description': data['weather'][0]['description'],
-                'humidity': data['main']['humidity'],
-                'wind_speed': data['wind']['speed']
-            }
-        else:
-            return {}
-    except Exception as e:
-        print(f"Error getting weather for {city}: {e}")
-        return {}
+    response = http_client.get(weather_url)
+    if response.status_code != 200:
+        raise RuntimeError(f"OpenWeather query failed with status {response.status_code}")
+
+    data = response.json()
+    return {
+        'temp': data['main']['temp'],
+        'weather': data['weather'][0]['main'],
+        'description': data['weather'][0]['description'],
+        'humidity': data['main']['humidity'],
+        'wind_speed': data['wind']['speed']
+    }
+
+def get_weather_with_age(city: str, coords: tuple = None) -> tuple:
+    """
+    Get current weather for a city (or coordinates, when given) together with its age
+    Returns (weather, seconds since it was fetched); ({}, None) when no weather is available
+    """
+    with span("get_weather"):
+        try:
+            return weather_cache.get(weather_key(city, coords), lambda: _fetch_weather(city, coords))
+        except Exception as e:
+            logger.error("Error getting weather", extra={'city': city, 'error': str(e)})
+            return {}, None
+
+def get_weather(city: str, coords: tuple = None) -> dict:
+    """Get current weather for a city"""
+    weather, _ = get_weather_with_age(city, coords)
+    return weather
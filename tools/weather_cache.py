@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple, Callable
+from dotenv import load_dotenv
+from .geocode_cache import normalize_query
+from .telemetry import get_logger, increment
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+WEATHER_CACHE_TTL = int(os.getenv('WEATHER_CACHE_TTL', 10 * 60))  # 10 minutes
+# Past the TTL an entry is still served for this long while a background refresh runs
+WEATHER_CACHE_STALE_TTL = int(os.getenv('WEATHER_CACHE_STALE_TTL', 60 * 60))
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv('WEATHER_CACHE_MAX_ENTRIES', 1024))
+# Coordinates are rounded to this many decimal degrees (2 ≈ 1 km) to form cache keys
+WEATHER_COORD_PRECISION = int(os.getenv('WEATHER_COORD_PRECISION', 2))
+
+def weather_key(city: str = None, coords: Tuple[float, float] = None) -> str:
+    """Cache key for a weather query: rounded coordinates when given, otherwise the normalized city"""
+    if coords is not None:
+        lat, lon = coords
+        return f"{round(lat, WEATHER_COORD_PRECISION)},{round(lon, WEATHER_COORD_PRECISION)}"
+    return normalize_query(city)
+
+class WeatherCache:
+    """
+    In-memory cache of current weather with stale-while-revalidate
+    Fresh entries are returned directly. Entries past the TTL but within the stale window are
+    returned immediately while one background thread refreshes them. Older entries are
+    refreshed synchronously, and if the upstream fails the last good value is returned
+    whatever its age.
+    """
+
+    def __init__(self, ttl: int = WEATHER_CACHE_TTL, stale_ttl: int = WEATHER_CACHE_STALE_TTL,
+                 max_entries: int = WEATHER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "fallbacks": 0, "errors": 0}
+
+    def _store(self, key: str, weather: Dict) -> None:
+        with self._lock:
+            self._entries[key] = {'weather': weather, 'fetched_at': time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _refresh(self, key: str, fetch: Callable) -> None:
+        try:
+            self._store(key, fetch())
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            logger.warning("Background weather refresh failed", extra={'key': key, 'error': str(e)})
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key: str, fetch: Callable) -> Tuple[Dict, float]:
+        """
+        Return (weather, age in seconds) for a key, calling fetch() when the cache cannot answer
+        fetch must raise on failure; the age is None when nothing could be returned
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                age = now - entry['fetched_at']
+                if age <= self.ttl:
+                    self._stats["hits"] += 1
+                    increment('cache_hits', cache='weather')
+                    return dict(entry['weather']), age
+                if age <= self.ttl + self.stale_ttl:
+                    self._stats["stale_hits"] += 1
+                    increment('cache_hits', cache='weather', stale=True)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._stats["refreshes"] += 1
+                        threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                    return dict(entry['weather']), age
+            self._stats["misses"] += 1
+        increment('cache_misses', cache='weather')
+
+        try:
+            weather = fetch()
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+                entry = self._entries.get(key)
+                if entry is None:
+                    raise
+                self._stats["fallbacks"] += 1
+                increment('fallbacks', kind='last_good_weather')
+                return dict(entry['weather']), time.time() - entry['fetched_at']
+
+        self._store(key, weather)
+        return dict(weather), 0.0
+
+    def age(self, key: str) -> float:
+        """Seconds since the cached value for key was fetched, or None if it is not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else time.time() - entry['fetched_at']
+
+    def clear(self) -> None:
+        """Drop all cached weather and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the number of cached locations"""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+weather_cache = WeatherCache()